@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.appointments.services import available_new_appointments_filter_for_master
+from apps.chat.unread import get_unread_total
+
+from .models import MasterStats, RoleChoices, User
+
+ACTIVE_STATUSES = (
+    AppointmentStatusChoices.NEW,
+    AppointmentStatusChoices.IN_REVIEW,
+    AppointmentStatusChoices.AWAITING_PAYMENT,
+    AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED,
+    AppointmentStatusChoices.PAID,
+    AppointmentStatusChoices.IN_PROGRESS,
+)
+
+# Summary cache keys embed version tokens instead of being deleted one by one:
+# bumping a version makes every dependent key unreachable at once.
+_USER_VERSION_KEY = "dashboard:version:user:{user_id}"
+_QUEUE_VERSION_KEY = "dashboard:version:queue"
+_ADMIN_VERSION_KEY = "dashboard:version:admin"
+
+
+def _version(key: str) -> str:
+    value = cache.get(key)
+    if value is None:
+        value = str(time.time_ns())
+        cache.set(key, value, timeout=None)
+    return str(value)
+
+
+def _bump(keys: Iterable[str]) -> None:
+    token = str(time.time_ns())
+    cache.set_many({key: token for key in keys}, timeout=None)
+
+
+def invalidate_dashboard_summaries(*, user_ids: Iterable[int | None] = (), queue: bool = False, admin: bool = False) -> None:
+    keys = [_USER_VERSION_KEY.format(user_id=user_id) for user_id in dict.fromkeys(user_ids) if user_id]
+    if queue:
+        keys.append(_QUEUE_VERSION_KEY)
+    if admin:
+        keys.append(_ADMIN_VERSION_KEY)
+    if keys:
+        # After commit: a reader between the bump and the commit would cache the old counts
+        # under the new version.
+        transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_for_appointment(appointment: Appointment) -> None:
+    # _loaded_values still holds the pre-save columns here: accounts' receivers run before
+    # the appointments app re-snapshots them (INSTALLED_APPS order).
+    loaded = getattr(appointment, "_loaded_values", None) or {}
+    previous_status = loaded.get("status", appointment.status)
+    previous_master_id = loaded.get("assigned_master_id", appointment.assigned_master_id)
+    affects_queue = (
+        appointment.assigned_master_id is None
+        or AppointmentStatusChoices.NEW in (appointment.status, previous_status)
+        or previous_master_id != appointment.assigned_master_id
+    )
+    invalidate_dashboard_summaries(
+        user_ids=(appointment.client_id, appointment.assigned_master_id, previous_master_id),
+        queue=affects_queue,
+        admin=True,
+    )
+
+
+def _cached_counts(cache_key: str, builder: Callable[[], dict]) -> dict:
+    ttl = settings.DASHBOARD_SUMMARY_CACHE_SECONDS
+    if ttl <= 0:
+        return builder()
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = builder()
+        cache.set(cache_key, counts, timeout=ttl)
+    return counts
+
+
+def _build_client_counts(user: User) -> dict:
+    queryset = Appointment.objects.filter(client=user)
+    counts = queryset.aggregate(
+        appointments_total=Count("id"),
+        appointments_active=Count("id", filter=Q(status__in=ACTIVE_STATUSES)),
+        awaiting_payment=Count("id", filter=Q(status=AppointmentStatusChoices.AWAITING_PAYMENT)),
+        completed=Count("id", filter=Q(status=AppointmentStatusChoices.COMPLETED)),
+        declined=Count("id", filter=Q(status=AppointmentStatusChoices.DECLINED_BY_MASTER)),
+    )
+    counts["unread_total"] = get_unread_total(user, queryset)
+    return counts
+
+
+def _build_master_counts(user: User) -> dict:
+    own = Q(assigned_master=user)
+    own_active = own & Q(status__in=ACTIVE_STATUSES)
+    new_available = available_new_appointments_filter_for_master(user)
+    scope = own if new_available is None else own | new_available
+
+    aggregates = {
+        "active_total": Count("id", filter=own_active),
+        "awaiting_client_payment": Count("id", filter=own & Q(status=AppointmentStatusChoices.AWAITING_PAYMENT)),
+        "awaiting_payment_confirmation": Count(
+            "id",
+            filter=own & Q(status=AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED),
+        ),
+        "in_progress": Count("id", filter=own & Q(status=AppointmentStatusChoices.IN_PROGRESS)),
+        "completed_total": Count("id", filter=own & Q(status=AppointmentStatusChoices.COMPLETED)),
+    }
+    if new_available is not None:
+        aggregates["new_available"] = Count("id", filter=new_available)
+    counts = Appointment.objects.filter(scope).aggregate(**aggregates)
+    counts.setdefault("new_available", 0)
+
+    counts["unread_total"] = get_unread_total(user, Appointment.objects.filter(own_active))
+    master_score = MasterStats.objects.filter(user=user).values_list("master_score", flat=True).first()
+    if master_score is None:
+        from .services import recalculate_master_stats
+
+        master_score = recalculate_master_stats(user).master_score
+    counts["master_score"] = master_score
+    return counts
+
+
+def _build_admin_counts() -> dict:
+    user_counts = User.objects.aggregate(
+        users_total=Count("id"),
+        clients_total=Count("id", filter=Q(role=RoleChoices.CLIENT)),
+        masters_total=Count("id", filter=Q(role=RoleChoices.MASTER)),
+        admins_total=Count("id", filter=Q(role=RoleChoices.ADMIN) | Q(is_superuser=True)),
+    )
+    appointment_counts = Appointment.objects.aggregate(
+        appointments_total=Count("id"),
+        appointments_new=Count("id", filter=Q(status=AppointmentStatusChoices.NEW)),
+        appointments_active=Count("id", filter=Q(status__in=ACTIVE_STATUSES)),
+        payments_waiting_confirmation=Count("id", filter=Q(status=AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED)),
+        appointments_completed=Count("id", filter=Q(status=AppointmentStatusChoices.COMPLETED)),
+    )
+    return {**user_counts, **appointment_counts}
+
+
+def _build_wholesale_portal_counts(user: User, queryset) -> dict:
+    counts = queryset.order_by().aggregate(
+        orders_total=Count("id"),
+        orders_active=Count("id", filter=Q(status__in=ACTIVE_STATUSES)),
+        orders_completed=Count("id", filter=Q(status=AppointmentStatusChoices.COMPLETED)),
+        orders_problematic=Count("id", filter=Q(sla_breached=True)),
+        awaiting_payment=Count("id", filter=Q(status=AppointmentStatusChoices.AWAITING_PAYMENT)),
+    )
+    counts["unread_total"] = get_unread_total(user, queryset)
+    return counts
+
+
+def get_client_dashboard_counts(user: User) -> dict:
+    cache_key = f"dashboard:summary:client:{user.id}:{_version(_USER_VERSION_KEY.format(user_id=user.id))}"
+    return _cached_counts(cache_key, lambda: _build_client_counts(user))
+
+
+def get_master_dashboard_counts(user: User) -> dict:
+    cache_key = (
+        f"dashboard:summary:master:{user.id}:"
+        f"{_version(_USER_VERSION_KEY.format(user_id=user.id))}:{_version(_QUEUE_VERSION_KEY)}"
+    )
+    return _cached_counts(cache_key, lambda: _build_master_counts(user))
+
+
+def get_admin_dashboard_counts() -> dict:
+    cache_key = f"dashboard:summary:admin:{_version(_ADMIN_VERSION_KEY)}"
+    return _cached_counts(cache_key, _build_admin_counts)
+
+
+def get_wholesale_portal_counts(user: User, queryset) -> dict:
+    cache_key = f"dashboard:summary:wholesale:{user.id}:{_version(_USER_VERSION_KEY.format(user_id=user.id))}"
+    return _cached_counts(cache_key, lambda: _build_wholesale_portal_counts(user, queryset))
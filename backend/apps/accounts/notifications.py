@@ -67,6 +67,41 @@ def notify_masters_about_new_appointment(appointment: Appointment) -> int:
     return sent
 
 
+_BATCH_NOTIFICATION_PREVIEW_LIMIT = 10
+
+
+def notify_masters_about_new_appointments_batch(appointment_ids: list[int]) -> int:
+    # One Telegram message per master for the whole batch instead of one per device.
+    appointments = list(Appointment.objects.filter(id__in=appointment_ids).order_by("id"))
+    if not appointments:
+        return 0
+    masters = User.objects.filter(
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+        is_banned=False,
+        telegram_id__isnull=False,
+    ).exclude(telegram_id=0)
+    if any(appointment.is_wholesale_request for appointment in appointments):
+        masters = masters.exclude(master_level=MasterLevelChoices.TRAINEE)
+
+    lines = [f"Новые заявки для мастеров: {len(appointments)} шт."]
+    lines.extend(
+        f"#{appointment.id} • {appointment.brand} {appointment.model} • {appointment.lock_type}"
+        for appointment in appointments[:_BATCH_NOTIFICATION_PREVIEW_LIMIT]
+    )
+    if len(appointments) > _BATCH_NOTIFICATION_PREVIEW_LIMIT:
+        lines.append(f"…и ещё {len(appointments) - _BATCH_NOTIFICATION_PREVIEW_LIMIT}")
+    lines.append("Откройте раздел «Новые заявки» в кабинете.")
+    text = "\n".join(lines)
+
+    sent = 0
+    for master in masters:
+        if send_telegram_message(master.telegram_id, text):
+            sent += 1
+    return sent
+
+
 def notify_client_about_status_change(
     appointment: Appointment,
     *,
@@ -93,3 +128,42 @@ def notify_client_about_status_change(
         lines.append(f"Открыть заявку: {base}/appointments/{appointment.id}")
 
     return send_telegram_message(int(client.telegram_id), "\n".join(lines))
+
+
+def notify_clients_about_bulk_update(
+    appointment_ids: list[int],
+    *,
+    from_status: str,
+    to_status: str,
+    note: str = "",
+    message_text: str = "",
+) -> int:
+    # One Telegram message per client instead of one per appointment.
+    appointments = (
+        Appointment.objects.filter(id__in=appointment_ids, client__telegram_id__isnull=False)
+        .exclude(client__telegram_id=0)
+        .select_related("client")
+        .order_by("client_id", "id")
+    )
+    by_client: dict[int, list[Appointment]] = {}
+    for appointment in appointments:
+        by_client.setdefault(appointment.client_id, []).append(appointment)
+
+    status_map = dict(AppointmentStatusChoices.choices)
+    base = settings.TELEGRAM_CLIENT_BOT_FRONTEND_URL.rstrip("/") if settings.TELEGRAM_CLIENT_BOT_FRONTEND_URL else ""
+
+    sent = 0
+    for items in by_client.values():
+        lines = ["Обновление по заявкам: " + ", ".join(f"#{item.id}" for item in items)]
+        if to_status:
+            from_label = status_map.get(from_status, from_status or "—")
+            lines.append(f"Статус: {from_label} -> {status_map.get(to_status, to_status)}")
+        if note:
+            lines.append(f"Комментарий: {note}")
+        if message_text:
+            lines.append(f"Сообщение мастера: {message_text}")
+        if base:
+            lines.extend(f"Открыть заявку: {base}/appointments/{item.id}" for item in items)
+        if send_telegram_message(int(items[0].client.telegram_id), "\n".join(lines)):
+            sent += 1
+    return sent
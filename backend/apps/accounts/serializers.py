@@ -9,7 +9,7 @@ from django.utils import timezone
 from rest_framework import serializers
 
 from apps.appointments.models import Appointment, AppointmentStatusChoices
-from apps.chat.models import Message, ReadState
+from apps.chat.serializers import UnreadCountListSerializer, resolve_unread_count
 from apps.common.secure_media import build_user_media_url
 from apps.reviews.models import Review, ReviewTypeChoices
 
@@ -429,10 +429,11 @@ class ClientProfileDetailSerializer(serializers.ModelSerializer):
 class WholesalePortalOrderSerializer(serializers.ModelSerializer):
     master_username = serializers.CharField(source="assigned_master.username", read_only=True)
     unread_count = serializers.SerializerMethodField()
-    latest_message_text = serializers.SerializerMethodField()
+    latest_message_text = serializers.CharField(source="last_message_preview", read_only=True)
 
     class Meta:
         model = Appointment
+        list_serializer_class = UnreadCountListSerializer
         fields = (
             "id",
             "brand",
@@ -450,23 +451,7 @@ class WholesalePortalOrderSerializer(serializers.ModelSerializer):
         )
 
     def get_unread_count(self, obj: Appointment) -> int:
-        request = self.context.get("request")
-        user = getattr(request, "user", None)
-        if not user or not user.is_authenticated:
-            return 0
-
-        state = ReadState.objects.filter(appointment=obj, user=user).first()
-        last_read_id = state.last_read_message_id if state else 0
-        return obj.messages.filter(id__gt=last_read_id, is_deleted=False).exclude(sender=user).count()
-
-    def get_latest_message_text(self, obj: Appointment) -> str:
-        latest = (
-            Message.objects.filter(appointment=obj, is_deleted=False)
-            .order_by("-id")
-            .values_list("text", flat=True)
-            .first()
-        )
-        return (latest or "").strip()
+        return resolve_unread_count(self, obj)
 
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
@@ -1,10 +1,39 @@
-﻿from django.db.models.signals import post_save
+﻿from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import ClientStats, RoleChoices, User
+from .dashboard import invalidate_dashboard_summaries, invalidate_for_appointment
+from .models import ClientStats, MasterStats, RoleChoices, User
 
 
 @receiver(post_save, sender=User)
 def ensure_client_stats(sender, instance: User, created: bool, **kwargs):
     if instance.role == RoleChoices.CLIENT:
         ClientStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_dashboards(sender, instance: User, **kwargs):
+    invalidate_dashboard_summaries(user_ids=(instance.id,), admin=True)
+
+
+@receiver(post_save, sender=MasterStats)
+def invalidate_master_stats_dashboard(sender, instance: MasterStats, **kwargs):
+    invalidate_dashboard_summaries(user_ids=(instance.user_id,))
+
+
+@receiver(post_save, sender="appointments.Appointment")
+@receiver(post_delete, sender="appointments.Appointment")
+def invalidate_appointment_dashboards(sender, instance, **kwargs):
+    invalidate_for_appointment(instance)
+
+
+@receiver(post_save, sender="chat.Message")
+def invalidate_message_dashboards(sender, instance, **kwargs):
+    appointment = instance.appointment
+    invalidate_dashboard_summaries(user_ids=(appointment.client_id, appointment.assigned_master_id))
+
+
+@receiver(post_save, sender="chat.ReadState")
+def invalidate_read_state_dashboards(sender, instance, **kwargs):
+    invalidate_dashboard_summaries(user_ids=(instance.user_id,))
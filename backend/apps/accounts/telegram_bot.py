@@ -15,6 +15,7 @@ from apps.appointments.client_actions import (
     create_client_signal,
     repeat_client_appointment,
 )
+from apps.appointments.dispatch import dispatch_new_appointment
 from apps.appointments.models import Appointment
 from apps.appointments.services import initialize_response_deadline
 from apps.chat.models import Message
@@ -23,7 +24,6 @@ from apps.chat.text_moderation import ChatMessageRejected, validate_client_chat_
 from apps.platform.services import create_notification, emit_event
 
 from .models import RoleChoices, User
-from .notifications import notify_masters_about_new_appointment
 
 logger = logging.getLogger(__name__)
 
@@ -447,7 +447,7 @@ class ClientTelegramBot:
                 actor=user,
                 payload={"status": appointment.status, "created_via": "telegram_bot"},
             )
-            notify_masters_about_new_appointment(appointment)
+            dispatch_new_appointment(appointment)
             self.create_states.pop(chat_id, None)
             self.active_appointments[chat_id] = appointment.id
             self.send_message(
@@ -46,11 +46,14 @@ from .models import (
 )
 from .auth_security import clear_failed_login, ensure_login_not_locked, register_failed_login
 from .permissions import IsAuthenticatedAndNotBanned
-from .services import recalculate_master_stats
+from .dashboard import (
+    get_admin_dashboard_counts,
+    get_client_dashboard_counts,
+    get_master_dashboard_counts,
+    get_wholesale_portal_counts,
+)
 from apps.platform.services import create_notification, emit_event
 from apps.appointments.models import Appointment, AppointmentStatusChoices
-from apps.appointments.services import get_available_new_appointments_queryset_for_master
-from apps.chat.models import ReadState
 from apps.common.secure_media import build_user_media_url
 from .serializers import (
     BootstrapAdminSerializer,
@@ -1512,26 +1515,11 @@ class WholesalePortalSummaryView(APIView):
         if request.user.role != RoleChoices.CLIENT:
             return Response({"detail": "Только для клиентов"}, status=status.HTTP_403_FORBIDDEN)
 
-        active_statuses = (
-            AppointmentStatusChoices.NEW,
-            AppointmentStatusChoices.IN_REVIEW,
-            AppointmentStatusChoices.AWAITING_PAYMENT,
-            AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED,
-            AppointmentStatusChoices.PAID,
-            AppointmentStatusChoices.IN_PROGRESS,
-        )
         queryset = get_wholesale_portal_queryset(request.user)
         latest_order = queryset.first()
         payload = {
             "wholesale": serialize_wholesale_status(request.user, request=request),
-            "counts": {
-                "orders_total": queryset.count(),
-                "orders_active": queryset.filter(status__in=active_statuses).count(),
-                "orders_completed": queryset.filter(status=AppointmentStatusChoices.COMPLETED).count(),
-                "orders_problematic": queryset.filter(sla_breached=True).count(),
-                "awaiting_payment": queryset.filter(status=AppointmentStatusChoices.AWAITING_PAYMENT).count(),
-                "unread_total": calculate_unread_total(queryset, request.user),
-            },
+            "counts": get_wholesale_portal_counts(request.user, queryset),
             "latest_order": WholesalePortalOrderSerializer(latest_order, context={"request": request}).data if latest_order else None,
         }
         return Response(payload, status=status.HTTP_200_OK)
@@ -1575,25 +1563,10 @@ class WholesalePortalProfileView(APIView):
         )
 
 
-def calculate_unread_total(appointments_queryset, user: User) -> int:
-    appointment_ids = list(appointments_queryset.values_list("id", flat=True))
-    if not appointment_ids:
-        return 0
-
-    states = ReadState.objects.filter(user=user, appointment_id__in=appointment_ids).values("appointment_id", "last_read_message_id")
-    last_read_map = {row["appointment_id"]: row["last_read_message_id"] for row in states}
-
-    unread_total = 0
-    for appointment in appointments_queryset:
-        last_read_id = last_read_map.get(appointment.id, 0)
-        unread_total += appointment.messages.filter(id__gt=last_read_id, is_deleted=False).exclude(sender=user).count()
-    return unread_total
-
-
 def get_wholesale_portal_queryset(user: User):
     return (
-        Appointment.objects.filter(client=user, is_wholesale_request=True)
-        .select_related("assigned_master")
+        Appointment.objects.for_listing(user, RoleChoices.CLIENT)
+        .filter(client=user, is_wholesale_request=True)
         .order_by("-updated_at")
     )
 
@@ -1603,71 +1576,19 @@ class DashboardSummaryView(APIView):
 
     def get(self, request):
         user = request.user
-        active_statuses = (
-            AppointmentStatusChoices.NEW,
-            AppointmentStatusChoices.IN_REVIEW,
-            AppointmentStatusChoices.AWAITING_PAYMENT,
-            AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED,
-            AppointmentStatusChoices.PAID,
-            AppointmentStatusChoices.IN_PROGRESS,
-        )
 
         if user.role == RoleChoices.CLIENT:
-            queryset = Appointment.objects.filter(client=user)
-            payload = {
-                "role": user.role,
-                "counts": {
-                    "appointments_total": queryset.count(),
-                    "appointments_active": queryset.filter(status__in=active_statuses).count(),
-                    "awaiting_payment": queryset.filter(status=AppointmentStatusChoices.AWAITING_PAYMENT).count(),
-                    "completed": queryset.filter(status=AppointmentStatusChoices.COMPLETED).count(),
-                    "declined": queryset.filter(status=AppointmentStatusChoices.DECLINED_BY_MASTER).count(),
-                    "unread_total": calculate_unread_total(queryset, user),
-                },
-            }
+            payload = {"role": user.role, "counts": get_client_dashboard_counts(user)}
             return Response(payload, status=status.HTTP_200_OK)
 
         if user.role == RoleChoices.MASTER:
-            master_stats = recalculate_master_stats(user)
-            new_available_queryset = get_available_new_appointments_queryset_for_master(user)
-            own_queryset = Appointment.objects.filter(assigned_master=user)
-            own_active_queryset = own_queryset.filter(status__in=active_statuses)
-            payload = {
-                "role": user.role,
-                "counts": {
-                    "new_available": new_available_queryset.count(),
-                    "active_total": own_active_queryset.count(),
-                    "awaiting_client_payment": own_queryset.filter(status=AppointmentStatusChoices.AWAITING_PAYMENT).count(),
-                    "awaiting_payment_confirmation": own_queryset.filter(status=AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED).count(),
-                    "in_progress": own_queryset.filter(status=AppointmentStatusChoices.IN_PROGRESS).count(),
-                    "completed_total": own_queryset.filter(status=AppointmentStatusChoices.COMPLETED).count(),
-                    "unread_total": calculate_unread_total(own_active_queryset, user),
-                    "master_score": master_stats.master_score,
-                },
-            }
+            payload = {"role": user.role, "counts": get_master_dashboard_counts(user)}
             return Response(payload, status=status.HTTP_200_OK)
 
         is_admin = user.role == RoleChoices.ADMIN or user.is_superuser
         if is_admin:
-            admin_accounts_count = User.objects.filter(role=RoleChoices.ADMIN).count() + User.objects.filter(is_superuser=True).exclude(role=RoleChoices.ADMIN).count()
-            appointments_queryset = Appointment.objects.all()
-            payload = {
-                "role": "admin",
-                "counts": {
-                    "users_total": User.objects.count(),
-                    "clients_total": User.objects.filter(role=RoleChoices.CLIENT).count(),
-                    "masters_total": User.objects.filter(role=RoleChoices.MASTER).count(),
-                    "admins_total": admin_accounts_count,
-                    "appointments_total": appointments_queryset.count(),
-                    "appointments_new": appointments_queryset.filter(status=AppointmentStatusChoices.NEW).count(),
-                    "appointments_active": appointments_queryset.filter(status__in=active_statuses).count(),
-                    "payments_waiting_confirmation": appointments_queryset.filter(status=AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED).count(),
-                    "appointments_completed": appointments_queryset.filter(status=AppointmentStatusChoices.COMPLETED).count(),
-                },
-            }
+            payload = {"role": "admin", "counts": get_admin_dashboard_counts()}
             return Response(payload, status=status.HTTP_200_OK)
 
         # Defensive fallback for unknown role values.
         return Response({"role": user.role, "counts": {}}, status=status.HTTP_200_OK)
-
-
@@ -10,6 +10,7 @@ from apps.accounts.models import (
     WholesalePriorityChoices,
 )
 from apps.accounts.serializers import ClientStatsSerializer, MasterStatsSerializer
+from apps.appointments.archive import appointment_events_queryset
 from apps.appointments.models import Appointment, AppointmentEvent, AppointmentEventType, PaymentMethodChoices
 from apps.common.secure_media import build_appointment_media_url, build_user_media_url
 
@@ -221,9 +222,12 @@ class AdminPaymentRegistryRowSerializer(serializers.ModelSerializer):
 
     def get_history(self, obj: Appointment) -> list[dict]:
         events = getattr(obj, "payment_history_events", None)
-        if events is None:
+        if events is not None:
+            # Archived appointments keep their history in the cold table.
+            events = events + getattr(obj, "archived_payment_history_events", [])
+        else:
             events = (
-                obj.events.filter(
+                appointment_events_queryset(obj).filter(
                     event_type__in=(
                         AppointmentEventType.PAYMENT_PROOF_UPLOADED,
                         AppointmentEventType.PAYMENT_MARKED,
@@ -15,6 +15,7 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions, status
 from rest_framework.exceptions import PermissionDenied
@@ -36,11 +37,19 @@ from apps.appointments.models import (
     AppointmentEvent,
     AppointmentEventType,
     AppointmentStatusChoices,
+    ArchivedAppointmentEvent,
     PaymentMethodChoices,
 )
+from apps.appointments.fast_render import appointment_list_renderer
+from apps.appointments.projection import resolve_appointment_projection
 from apps.appointments.serializers import AppointmentSerializer
 from apps.appointments.views import ConfirmPaymentMixin
-from apps.common.api_limits import BoundedListAPIView, resolve_list_window
+from apps.common.api_limits import (
+    BoundedListAPIView,
+    paginate_list_window,
+    render_bounded_list_response,
+    resolve_list_window,
+)
 from apps.common.ops_state import (
     get_deploy_lock_state,
     get_job_statuses,
@@ -48,6 +57,7 @@ from apps.common.ops_state import (
     get_release_state,
     get_rollback_inventory,
 )
+from apps.common.projection import PROJECTION_CONTEXT_KEY
 from apps.common.secure_media import build_appointment_media_url
 from apps.platform.services import create_notification, emit_event
 
@@ -80,8 +90,8 @@ def _can_view_staff_tools(user) -> bool:
 
 def _scoped_appointments_for_report(user):
     if user.is_superuser or user.role == RoleChoices.ADMIN:
-        return Appointment.objects.all()
-    return Appointment.objects.filter(assigned_master=user)
+        return Appointment.objects.defer_encrypted()
+    return Appointment.objects.defer_encrypted().filter(assigned_master=user)
 
 
 PAYMENT_HISTORY_EVENT_TYPES = (
@@ -102,7 +112,14 @@ def _payment_registry_queryset(user, query_params):
                 .select_related("actor")
                 .order_by("-id"),
                 to_attr="payment_history_events",
-            )
+            ),
+            Prefetch(
+                "archived_events",
+                queryset=ArchivedAppointmentEvent.objects.filter(event_type__in=PAYMENT_HISTORY_EVENT_TYPES)
+                .select_related("actor")
+                .order_by("-id"),
+                to_attr="archived_payment_history_events",
+            ),
         )
     )
 
@@ -188,9 +205,11 @@ class AdminPaymentRegistryView(APIView):
             max_offset=settings.API_LIST_MAX_OFFSET,
         )
 
-        total = queryset.count()
-        rows = queryset[window.offset : window.offset + window.limit]
-        serializer = AdminPaymentRegistryRowSerializer(rows, many=True, context={"request": request})
+        total = queryset.count() if window.include_meta or not window.cursor_mode else None
+        page = paginate_list_window(queryset, window)
+        serializer = AdminPaymentRegistryRowSerializer(page.items, many=True, context={"request": request})
+        if window.cursor_mode:
+            return render_bounded_list_response(serializer.data, window=window, total=total, page=page)
         return Response(
             {
                 "count": total,
@@ -278,8 +297,24 @@ class AdminAppointmentListView(BoundedListAPIView):
     default_list_limit = settings.ADMIN_API_LIST_LIMIT
     max_list_limit = settings.ADMIN_API_MAX_LIST_LIMIT
 
+    @cached_property
+    def field_projection(self):
+        return resolve_appointment_projection(self.request)
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), PROJECTION_CONTEXT_KEY: self.field_projection}
+
+    def get_fast_renderer(self):
+        if not settings.FAST_LIST_RENDERING:
+            return None
+        return appointment_list_renderer(self.get_serializer_context())
+
     def get_queryset(self):
-        return Appointment.objects.select_related("client", "assigned_master", "payment_confirmed_by").all()
+        return Appointment.objects.for_listing(
+            self.request.user,
+            RoleChoices.ADMIN,
+            projection=self.field_projection,
+        )
 
 
 class AdminConfirmPaymentView(APIView, ConfirmPaymentMixin):
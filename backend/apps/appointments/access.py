@@ -1,4 +1,5 @@
-﻿from django.shortcuts import get_object_or_404
+﻿from django.db.models import Q
+from django.shortcuts import get_object_or_404
 
 from apps.accounts.models import RoleChoices
 
@@ -15,6 +16,20 @@ def can_access_appointment(user, appointment: Appointment) -> bool:
     return False
 
 
+def appointment_access_filter(user, *, prefix: str = "") -> Q:
+    """Queryset counterpart of ``can_access_appointment``.
+
+    ``prefix`` points at the appointment from a related model, e.g. ``"appointment__"``.
+    """
+    if user.is_superuser or user.role == RoleChoices.ADMIN:
+        return Q()
+    if user.role == RoleChoices.CLIENT:
+        return Q(**{f"{prefix}client_id": user.id})
+    if user.role == RoleChoices.MASTER:
+        return Q(**{f"{prefix}assigned_master_id": user.id}) | Q(**{f"{prefix}status": AppointmentStatusChoices.NEW})
+    return Q(**{f"{prefix}pk__in": []})
+
+
 def get_appointment_for_user(user, appointment_id: int) -> Appointment:
     appointment = get_object_or_404(
         Appointment.objects.select_related("client", "assigned_master", "payment_confirmed_by"),
@@ -5,3 +5,6 @@ class AppointmentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.appointments"
     verbose_name = "Заявки"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.chat.models import ArchivedMessage, Message
+
+from .models import Appointment, AppointmentEvent, AppointmentStatusChoices, ArchivedAppointmentEvent
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = (
+    AppointmentStatusChoices.COMPLETED,
+    AppointmentStatusChoices.CANCELLED,
+    AppointmentStatusChoices.DECLINED_BY_MASTER,
+)
+
+# (hot model, cold model). The appointment row itself stays hot: reviews, read
+# states and stats reference it, and it is one row per order. The per-order
+# history tables are what grows without bound.
+_HISTORY_TABLES = (
+    (AppointmentEvent, ArchivedAppointmentEvent),
+    (Message, ArchivedMessage),
+)
+
+
+# Rows read, inserted and deleted per round, so one appointment with a very long
+# chat never has to fit in memory at once.
+_MOVE_CHUNK_SIZE = 500
+
+
+def _move_rows(source_model, target_model, appointment_ids: list[int]) -> int:
+    fields = target_model._meta.concrete_fields
+    attnames = [field.attname for field in fields]
+    source = source_model._base_manager.filter(appointment_id__in=appointment_ids).order_by("id")
+    moved = 0
+    last_id = 0
+    while True:
+        rows = list(source.filter(id__gt=last_id).values(*attnames)[:_MOVE_CHUNK_SIZE])
+        if not rows:
+            return moved
+        # raw=True inserts the values as read: auto_now/auto_now_add on the hot models
+        # would otherwise restamp created_at/updated_at on restore.
+        target_model._base_manager._insert([target_model(**row) for row in rows], fields=fields, raw=True)
+        last_id = rows[-1]["id"]
+        source_model._base_manager.filter(id__in=[row["id"] for row in rows]).delete()
+        moved += len(rows)
+
+
+def archivable_appointments(*, older_than_days: int, now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    return Appointment.objects.filter(
+        status__in=ARCHIVABLE_STATUSES,
+        archived_at__isnull=True,
+        updated_at__lt=cutoff,
+    )
+
+
+def archive_appointment_batch(appointment_ids: list[int], *, older_than_days: int, now=None) -> dict:
+    now = now or timezone.now()
+    with transaction.atomic():
+        locked_ids = list(
+            archivable_appointments(older_than_days=older_than_days, now=now)
+            .filter(id__in=appointment_ids)
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)
+        )
+        if not locked_ids:
+            return {"appointments": 0, "events": 0, "messages": 0}
+        events, messages = [_move_rows(hot, cold, locked_ids) for hot, cold in _HISTORY_TABLES]
+        Appointment.objects.filter(id__in=locked_ids).update(archived_at=now)
+    return {"appointments": len(locked_ids), "events": events, "messages": messages}
+
+
+def archive_closed_appointments(
+    *,
+    older_than_days: int | None = None,
+    batch_size: int = 200,
+    now=None,
+    on_batch: Callable[[dict], None] | None = None,
+) -> dict:
+    """Move history of closed appointments older than N days to the archive tables in batches."""
+    if older_than_days is None:
+        older_than_days = settings.APPOINTMENT_ARCHIVE_AFTER_DAYS
+    now = now or timezone.now()
+    totals = {"appointments": 0, "events": 0, "messages": 0}
+    last_id = 0
+    while True:
+        batch_ids = list(
+            archivable_appointments(older_than_days=older_than_days, now=now)
+            .filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not batch_ids:
+            break
+        last_id = batch_ids[-1]
+        moved = archive_appointment_batch(batch_ids, older_than_days=older_than_days, now=now)
+        for key, value in moved.items():
+            totals[key] += value
+        if on_batch is not None:
+            on_batch({**totals, "last_id": last_id})
+
+    logger.info(
+        "appointment archive finished appointments=%s events=%s messages=%s",
+        totals["appointments"],
+        totals["events"],
+        totals["messages"],
+    )
+    return totals
+
+
+def restore_archived_appointment(appointment: Appointment) -> bool:
+    """Move an archived appointment's history back to the hot tables before it is written to again."""
+    with transaction.atomic():
+        locked = (
+            Appointment.objects.select_for_update()
+            .filter(id=appointment.id, archived_at__isnull=False)
+            .values_list("id", flat=True)
+            .first()
+        )
+        if locked is None:
+            appointment.archived_at = None
+            return False
+        for hot_model, cold_model in _HISTORY_TABLES:
+            _move_rows(cold_model, hot_model, [appointment.id])
+        Appointment.objects.filter(id=appointment.id).update(archived_at=None)
+    appointment.archived_at = None
+    return True
+
+
+def appointment_events_queryset(appointment: Appointment):
+    """Read-through: archived appointments serve their history from the cold table."""
+    if appointment.archived_at is not None:
+        return appointment.archived_events.all()
+    return appointment.events.all()
+
+
+def appointment_messages_queryset(appointment: Appointment):
+    if appointment.archived_at is not None:
+        return appointment.archived_messages.all()
+    return appointment.messages.all()
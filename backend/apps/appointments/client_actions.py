@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from apps.accounts.notifications import notify_masters_about_new_appointment
 from apps.appointments.models import (
     Appointment,
     AppointmentEventType,
     AppointmentStatusChoices,
 )
+from apps.appointments.dispatch import dispatch_new_appointment
 from apps.appointments.services import add_event, initialize_response_deadline
 from apps.platform.services import create_notification, emit_event
 
@@ -107,5 +107,5 @@ def repeat_client_appointment(*, source: Appointment, client_user) -> Appointmen
             "created_via": "repeat",
         },
     )
-    notify_masters_about_new_appointment(repeated)
+    dispatch_new_appointment(repeated)
     return repeated
@@ -4,6 +4,7 @@ from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 
 from apps.appointments.access import can_access_appointment
+from apps.appointments.deltas import visible_delta
 from apps.appointments.models import Appointment
 from apps.platform.realtime import appointment_events_group_name, master_queue_group_name
 
@@ -45,6 +46,9 @@ class AppointmentEventsConsumer(AsyncJsonWebsocketConsumer):
     async def appointment_event(self, event):
         await self.send_json(event["payload"])
 
+    async def appointment_delta(self, event):
+        await self.send_json(visible_delta(event["payload"], self.scope["user"]))
+
 
 class MasterQueueConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import FileField
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+
+from apps.accounts.models import RoleChoices
+from apps.common.crypto_fields import encrypted_field_names
+from apps.common.projection import PROJECTION_CONTEXT_KEY
+from apps.platform.realtime import broadcast_appointment_delta, realtime_enabled
+
+from .models import Appointment, AppointmentStatusChoices
+
+DELTA_KIND = "appointment_delta"
+
+# Output fields computed by SerializerMethodField, keyed by the column they read.
+_METHOD_FIELDS_BY_COLUMN = {
+    "photo_lock_screen": ("photo_lock_screen_url", "photo_lock_screen_thumb_url", "photo_lock_screen_preview_url"),
+    "payment_proof": ("payment_proof_url", "payment_proof_thumb_url", "payment_proof_preview_url"),
+    "photo_lock_screen_derivatives_ready": ("photo_lock_screen_thumb_url", "photo_lock_screen_preview_url"),
+    "payment_proof_derivatives_ready": ("payment_proof_thumb_url", "payment_proof_preview_url"),
+}
+# Never pushed: subscribers with client access refetch the detail instead.
+_PRIVATE_OUTPUT_FIELDS = frozenset({"rustdesk_id", "rustdesk_password"})
+
+
+@lru_cache(maxsize=1)
+def _output_fields_by_column() -> dict[str, tuple[str, ...]]:
+    from .serializers import AppointmentSerializer
+
+    mapping: dict[str, list[str]] = {}
+    for name, field in AppointmentSerializer().fields.items():
+        if field.write_only or isinstance(field, serializers.SerializerMethodField):
+            continue
+        mapping.setdefault(field.source.split(".")[0], []).append(name)
+    for column, names in _METHOD_FIELDS_BY_COLUMN.items():
+        mapping.setdefault(column, []).extend(names)
+    return {column: tuple(names) for column, names in mapping.items()}
+
+
+@lru_cache(maxsize=1)
+def _tracked_fields() -> tuple:
+    encrypted = set(encrypted_field_names(Appointment))
+    return tuple(
+        field
+        for field in Appointment._meta.concrete_fields
+        if not field.primary_key and field.name != "version" and field.name not in encrypted
+    )
+
+
+def _comparable(field, value):
+    if isinstance(field, FileField):
+        # Unset files load as "" and are assigned as None or an empty FieldFile.
+        return (value.name if isinstance(value, FieldFile) else value) or None
+    return value
+
+
+def snapshot_loaded_values(instance: Appointment) -> None:
+    loaded = {}
+    for field in (*_tracked_fields(), *(Appointment._meta.get_field(name) for name in encrypted_field_names(Appointment))):
+        if field.attname in instance.__dict__:
+            loaded[field.attname] = instance.__dict__[field.attname]
+    instance._loaded_values = loaded
+
+
+def changed_columns(instance: Appointment, update_fields=None) -> tuple[list[str], list[str]]:
+    """Columns changed by the save that just happened: (pushed, stale)."""
+    loaded = getattr(instance, "_loaded_values", None) or {}
+    candidates = set(update_fields) if update_fields is not None else None
+    changed = []
+    for field in _tracked_fields():
+        if candidates is not None and field.name not in candidates and field.attname not in candidates:
+            continue
+        if field.attname not in instance.__dict__:
+            continue
+        if field.attname in loaded and _comparable(field, instance.__dict__[field.attname]) == _comparable(
+            field, loaded[field.attname]
+        ):
+            continue
+        changed.append(field.name)
+
+    stale = []
+    for name in encrypted_field_names(Appointment):
+        if candidates is not None:
+            if name in candidates:
+                stale.append(name)
+        elif name in instance.__dict__ and instance.__dict__[name] is not loaded.get(name):
+            # The lazy proxy was replaced, so the value may have been reassigned.
+            stale.append(name)
+    return changed, stale
+
+
+def render_delta(instance: Appointment, columns, stale=()) -> dict:
+    from .serializers import AppointmentSerializer
+
+    by_column = _output_fields_by_column()
+    outputs = {name for column in columns for name in by_column.get(column, ())}
+    changes = {}
+    if outputs:
+        context = {"include_client_access": False, "unread_counts": {instance.id: 0}, PROJECTION_CONTEXT_KEY: frozenset(outputs)}
+        changes = dict(AppointmentSerializer(instance, context=context).data)
+        changes.pop("id", None)
+        # DRF omits dotted sources behind a NULL relation; a delta has to clear them.
+        for name in outputs - changes.keys() - {"id"}:
+            changes[name] = None
+    return {
+        "kind": DELTA_KIND,
+        "appointment_id": instance.id,
+        "version": instance.version,
+        "changes": changes,
+        "stale_fields": sorted(name for name in stale if name in _PRIVATE_OUTPUT_FIELDS),
+        # Stripped per subscriber by visible_delta().
+        "audience": {
+            "client_id": instance.client_id,
+            "assigned_master_id": instance.assigned_master_id,
+            "status": instance.status,
+        },
+    }
+
+
+def visible_delta(payload: dict, user) -> dict:
+    """Filter a delta for one subscriber, mirroring ``can_access_appointment``."""
+    audience = payload.get("audience") or {}
+    delta = {key: value for key, value in payload.items() if key != "audience"}
+    if user.is_superuser or user.role == RoleChoices.ADMIN:
+        return delta
+    if user.role == RoleChoices.CLIENT and audience.get("client_id") == user.id:
+        return delta
+    if user.role == RoleChoices.MASTER:
+        if audience.get("assigned_master_id") == user.id:
+            return delta
+        if audience.get("status") == AppointmentStatusChoices.NEW and audience.get("assigned_master_id") is None:
+            # Unassigned masters see the card, never the client access fields.
+            return {**delta, "stale_fields": []}
+    # Subscribed while the appointment was open to them, e.g. a master watching a NEW card.
+    return {
+        "kind": DELTA_KIND,
+        "appointment_id": payload.get("appointment_id"),
+        "version": payload.get("version"),
+        "changes": {},
+        "stale_fields": [],
+        "access_revoked": True,
+    }
+
+
+def publish_appointment_delta(instance: Appointment, columns, stale=()) -> None:
+    if not (columns or stale) or not realtime_enabled():
+        return
+    payload = render_delta(instance, columns, stale)
+    transaction.on_commit(lambda: broadcast_appointment_delta(instance.id, payload))
+
+
+def _broadcast_current_state(appointment_ids: list[int], columns: tuple[str, ...]) -> None:
+    appointments = (
+        Appointment.objects.defer_encrypted().filter(id__in=appointment_ids).select_related("client", "assigned_master")
+    )
+    for appointment in appointments:
+        broadcast_appointment_delta(appointment.id, render_delta(appointment, columns))
+
+
+def publish_appointment_deltas(appointment_ids, columns) -> None:
+    """Deltas for ``queryset.update()`` writers, rendered from the committed rows.
+
+    A row the update skipped is sent with its unchanged version, which
+    subscribers ignore.
+    """
+    ids = list(dict.fromkeys(int(item) for item in appointment_ids))
+    if not ids or not columns or not realtime_enabled():
+        return
+    columns = tuple(columns)
+    transaction.on_commit(lambda: _broadcast_current_state(ids, columns))
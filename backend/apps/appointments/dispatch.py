@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import PermissionDenied
+
+from apps.accounts.models import MasterLevelChoices, RoleChoices, User
+from apps.common.background import submit_after_commit
+from apps.platform.models import NotificationType
+from apps.platform.services import create_notification, emit_event
+
+from .models import Appointment, AppointmentStatusChoices
+
+logger = logging.getLogger(__name__)
+
+# Dispatch state lives in the shared cache (Redis in production) so every
+# worker sees the same lease; each offer ranks the remaining candidates in SQL.
+_STATE_KEY = "appointments:dispatch:{appointment_id}"
+_SWEEP_LOCK_KEY = "appointments:dispatch:sweep-lock"
+_STATE_TTL_SECONDS = 24 * 60 * 60
+
+_LEVEL_RANK = {
+    MasterLevelChoices.LEAD: 4,
+    MasterLevelChoices.SENIOR: 3,
+    MasterLevelChoices.MIDDLE: 2,
+    MasterLevelChoices.JUNIOR: 1,
+    MasterLevelChoices.TRAINEE: 0,
+}
+
+
+def dispatch_enabled() -> bool:
+    return settings.APPOINTMENT_DISPATCH_ENABLED
+
+
+def _state_key(appointment_id: int) -> str:
+    return _STATE_KEY.format(appointment_id=appointment_id)
+
+
+def get_dispatch_state(appointment_id: int) -> dict | None:
+    return cache.get(_state_key(appointment_id))
+
+
+def _save_state(appointment_id: int, state: dict) -> None:
+    cache.set(_state_key(appointment_id), state, timeout=_STATE_TTL_SECONDS)
+
+
+def _best_candidate(appointment: Appointment, exclude_ids) -> User | None:
+    masters = User.objects.filter(
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+        is_banned=False,
+    ).exclude(id__in=list(exclude_ids))
+    if appointment.is_wholesale_request:
+        masters = masters.exclude(master_level=MasterLevelChoices.TRAINEE)
+    masters = masters.filter(
+        Q(master_stats__isnull=True) | Q(master_stats__active_workload__lt=settings.APPOINTMENT_DISPATCH_MAX_WORKLOAD)
+    )
+    # Ranked in SQL, one row back: best score, lightest workload, senior level first.
+    return (
+        masters.annotate(
+            dispatch_score=Coalesce("master_stats__master_score", Value(0)),
+            dispatch_workload=Coalesce("master_stats__active_workload", Value(0)),
+            dispatch_level=Case(
+                *(When(master_level=level, then=Value(rank)) for level, rank in _LEVEL_RANK.items()),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by("-dispatch_score", "dispatch_workload", "-dispatch_level", "id")
+        .first()
+    )
+
+
+def _notify_offer(appointment_id: int, master_id: int, lease_seconds: int) -> None:
+    from apps.accounts.notifications import send_telegram_message
+
+    master = User.objects.filter(id=master_id).first()
+    if master is None or not master.telegram_id:
+        return
+    send_telegram_message(
+        int(master.telegram_id),
+        f"Вам предложена заявка #{appointment_id}. Возьмите её в течение {lease_seconds} сек., "
+        "иначе она уйдёт следующему мастеру.",
+    )
+
+
+def _broadcast(appointment: Appointment, state: dict) -> None:
+    from apps.accounts.notifications import notify_masters_about_new_appointment
+
+    state.update({"master_id": None, "lease_until": None, "broadcast": True})
+    _save_state(appointment.id, state)
+    submit_after_commit(notify_masters_about_new_appointment, appointment)
+
+
+def _offer_next(appointment: Appointment, state: dict) -> User | None:
+    offered = state.setdefault("offered", [])
+    if len(offered) >= settings.APPOINTMENT_DISPATCH_MAX_OFFERS:
+        _broadcast(appointment, state)
+        return None
+    master = _best_candidate(appointment, offered)
+    if master is None:
+        _broadcast(appointment, state)
+        return None
+
+    lease_seconds = settings.APPOINTMENT_DISPATCH_LEASE_SECONDS
+    offered.append(master.id)
+    state.update({"master_id": master.id, "lease_until": time.time() + lease_seconds, "broadcast": False})
+    _save_state(appointment.id, state)
+
+    create_notification(
+        user=master,
+        type=NotificationType.APPOINTMENT,
+        title=f"Вам предложена заявка #{appointment.id}",
+        message=f"{appointment.brand} {appointment.model}. Предложение действует {lease_seconds} сек.",
+        payload={"appointment_id": appointment.id, "lease_seconds": lease_seconds},
+    )
+    emit_event(
+        "appointment.dispatch_offered",
+        appointment,
+        payload={"master_id": master.id, "attempt": len(offered), "lease_seconds": lease_seconds},
+    )
+    submit_after_commit(_notify_offer, appointment.id, master.id, lease_seconds)
+    return master
+
+
+def dispatch_new_appointment(appointment: Appointment) -> None:
+    """Offer a new appointment to the best master, or broadcast when dispatch is off."""
+    if not dispatch_enabled():
+        from apps.accounts.notifications import notify_masters_about_new_appointment
+
+        notify_masters_about_new_appointment(appointment)
+        return
+    _offer_next(appointment, {"started_at": time.time(), "offered": []})
+
+
+def dispatch_new_appointments(appointment_ids: list[int]) -> None:
+    """Offer each appointment of a bulk-created batch like a single create would."""
+    appointments = Appointment.objects.filter(id__in=appointment_ids, status=AppointmentStatusChoices.NEW).order_by("id")
+    for appointment in appointments:
+        dispatch_new_appointment(appointment)
+
+
+def active_lease_master_id(appointment_id: int) -> int | None:
+    state = get_dispatch_state(appointment_id)
+    if not state or not state.get("master_id") or not state.get("lease_until"):
+        return None
+    if state["lease_until"] <= time.time():
+        return None
+    return state["master_id"]
+
+
+def assert_dispatch_allows_take(appointment_id: int, master: User) -> None:
+    # Checked before the status UPDATE so masters without the lease get 403, not a lost race (409).
+    leased_to = active_lease_master_id(appointment_id)
+    if leased_to is not None and leased_to != master.id:
+        raise PermissionDenied("Заявка сейчас предложена другому мастеру")
+
+
+def complete_dispatch(appointment: Appointment, master: User) -> dict:
+    """Clear dispatch state on take and return latency fields for the take event."""
+    state = get_dispatch_state(appointment.id)
+    if not state:
+        return {}
+    cache.delete(_state_key(appointment.id))
+    latency_ms = int((time.time() - state["started_at"]) * 1000)
+    via_offer = state.get("master_id") == master.id
+    logger.info(
+        "appointment dispatch completed appointment_id=%s master_id=%s latency_ms=%s via_offer=%s attempts=%s",
+        appointment.id,
+        master.id,
+        latency_ms,
+        via_offer,
+        len(state.get("offered", [])),
+    )
+    return {
+        "dispatch_latency_ms": latency_ms,
+        "dispatch_via_offer": via_offer,
+        "dispatch_attempts": len(state.get("offered", [])),
+    }
+
+
+def advance_expired_offers(*, force: bool = False) -> int:
+    """Move expired leases to the next candidate; throttled when called from polling views."""
+    if not dispatch_enabled():
+        return 0
+    if not force and not cache.add(_SWEEP_LOCK_KEY, "1", timeout=settings.APPOINTMENT_DISPATCH_SWEEP_SECONDS):
+        return 0
+
+    now = time.time()
+    open_ids = list(
+        Appointment.objects.filter(
+            status=AppointmentStatusChoices.NEW,
+            assigned_master__isnull=True,
+        ).values_list("id", flat=True)
+    )
+    states = cache.get_many([_state_key(appointment_id) for appointment_id in open_ids])
+    expired_ids = [
+        appointment_id
+        for appointment_id in open_ids
+        if (state := states.get(_state_key(appointment_id)))
+        and not state.get("broadcast")
+        and not (state.get("lease_until") and state["lease_until"] > now)
+    ]
+    advanced = 0
+    for appointment in Appointment.objects.filter(id__in=expired_ids).select_related("client"):
+        _offer_next(appointment, states[_state_key(appointment.id)])
+        advanced += 1
+    return advanced
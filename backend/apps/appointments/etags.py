@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.db.models import IntegerField, Max, OuterRef, Subquery
+
+from apps.common.conditional import build_etag, request_query_fingerprint
+
+from .access import can_access_appointment
+from .models import Appointment
+
+# Version lookups for conditional GETs. Each one is a single indexed query that
+# also re-checks access, so a 304 is never served to someone who would get 403.
+_ACCESS_FIELDS = ("client_id", "assigned_master_id", "status")
+
+
+def _visibility_variant(user) -> str:
+    return f"{user.role}:{user.id}:{int(user.is_superuser)}"
+
+
+def _media_url_bucket() -> int:
+    # Payloads embed signed media URLs; rotate the tag before they expire.
+    return int(time.time() // max(settings.SECURE_MEDIA_URL_TTL_SECONDS // 2, 1))
+
+
+def _accessible_version_row(user, appointment_id: int, queryset, *fields) -> dict | None:
+    row = queryset.filter(id=appointment_id).values(*_ACCESS_FIELDS, *fields).first()
+    if row is None:
+        return None
+    probe = Appointment(id=appointment_id, **{field: row[field] for field in _ACCESS_FIELDS})
+    if not can_access_appointment(user, probe):
+        return None
+    return row
+
+
+def appointment_detail_etag(request, appointment_id: int) -> str | None:
+    from apps.chat.models import ReadState
+
+    unread = ReadState.objects.filter(appointment_id=OuterRef("pk"), user_id=request.user.id).values("unread_count")[:1]
+    row = _accessible_version_row(
+        request.user,
+        appointment_id,
+        Appointment.objects.annotate(viewer_unread=Subquery(unread, output_field=IntegerField())),
+        "updated_at",
+        "version",
+        "last_message_id",
+        "viewer_unread",
+        "client__updated_at",
+        "client__client_stats__updated_at",
+        "assigned_master__updated_at",
+    )
+    if row is None:
+        return None
+    return build_etag(
+        "appointment",
+        appointment_id,
+        _visibility_variant(request.user),
+        _media_url_bucket(),
+        request_query_fingerprint(request),
+        *row.values(),
+    )
+
+
+def appointment_events_etag(request, appointment_id: int) -> str | None:
+    row = _accessible_version_row(
+        request.user,
+        appointment_id,
+        Appointment.objects.annotate(events_max_id=Max("events__id")),
+        "events_max_id",
+        "archived_at",
+    )
+    if row is None:
+        return None
+    return build_etag(
+        "events",
+        appointment_id,
+        _visibility_variant(request.user),
+        request_query_fingerprint(request),
+        row["events_max_id"],
+        row["archived_at"],
+    )
+
+
+def appointment_messages_etag(request, appointment_id: int) -> str | None:
+    # Soft deletes keep the id but bump updated_at, so both are tracked. Archived
+    # history is read-only, so archived_at alone versions it.
+    row = _accessible_version_row(
+        request.user,
+        appointment_id,
+        Appointment.objects.annotate(
+            messages_max_id=Max("messages__id"),
+            messages_changed_at=Max("messages__updated_at"),
+        ),
+        "messages_max_id",
+        "messages_changed_at",
+        "archived_at",
+    )
+    if row is None:
+        return None
+    return build_etag(
+        "messages",
+        appointment_id,
+        _visibility_variant(request.user),
+        _media_url_bucket(),
+        request_query_fingerprint(request),
+        row["messages_max_id"],
+        row["messages_changed_at"],
+        row["archived_at"],
+    )
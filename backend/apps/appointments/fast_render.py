@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from apps.accounts.models import WholesalePriorityChoices, WholesaleStatusChoices
+from apps.chat.unread import UNREAD_COUNT_ANNOTATION, get_unread_counts
+from apps.common.fast_render import (
+    CompiledRenderer,
+    FastListRenderer,
+    RenderContext,
+    constant,
+    field_file,
+    iso_datetime,
+    plain,
+)
+from apps.common.media_derivatives import PREVIEW_SIZE, THUMBNAIL_SIZE, derivatives_ready_field
+from apps.common.projection import PROJECTION_CONTEXT_KEY, readable_field_names
+from apps.common.secure_media import MEDIA_SCOPE_APPOINTMENT, build_media_access_url
+
+from .models import Appointment
+
+_PLAIN_COLUMNS = (
+    "id",
+    "brand",
+    "model",
+    "lock_type",
+    "has_pc",
+    "contact_phone",
+    "description",
+    "status",
+    "total_price",
+    "wholesale_base_price",
+    "wholesale_discount_percent_applied",
+    "is_wholesale_request",
+    "currency",
+    "payment_method",
+    "payment_requisites_note",
+    "payment_confirmed_by",
+    "client",
+    "assigned_master",
+    "sla_breached",
+    "platform_tags",
+    "version",
+)
+_DATETIME_COLUMNS = (
+    "payment_marked_at",
+    "payment_confirmed_at",
+    "taken_at",
+    "started_at",
+    "completed_at",
+    "response_deadline_at",
+    "completion_deadline_at",
+    "created_at",
+    "updated_at",
+)
+_RENAMED_COLUMNS = {
+    "client_username": "client__username",
+    "master_username": "assigned_master__username",
+    "latest_message_text": "last_message_preview",
+    "latest_message_sender_username": "last_message_sender_username",
+    "latest_message_sender_role": "last_message_sender_role",
+}
+
+
+def _media_url(field_name: str, variant: int | None):
+    def render(row: dict, ctx: RenderContext):
+        name = row[field_name]
+        if not name:
+            return None
+        return build_media_access_url(
+            file_field=field_file(Appointment, field_name, name),
+            scope=MEDIA_SCOPE_APPOINTMENT,
+            object_id=row["id"],
+            field_name=field_name,
+            request=ctx.request,
+            variant=variant,
+            derivatives_ready=row[derivatives_ready_field(field_name)],
+        )
+
+    return render
+
+
+def _can_see_client_risk(row: dict, ctx: RenderContext) -> bool:
+    user = ctx.user
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_superuser or user.role == "admin":
+        return True
+    return user.role == "master" and row["assigned_master"] == user.id
+
+
+def _client_risk(column: str):
+    return lambda row, ctx: row[column] if _can_see_client_risk(row, ctx) else None
+
+
+def _unread_count(row: dict, ctx: RenderContext) -> int:
+    annotated = row.get(UNREAD_COUNT_ANNOTATION)
+    if annotated is not None:
+        return annotated
+    return ctx.extra["unread_counts"].get(row["id"], 0)
+
+
+def _service_center_pro(row: dict, ctx: RenderContext) -> bool:
+    return bool(row["client__is_service_center"] and row["client__wholesale_status"] == WholesaleStatusChoices.APPROVED)
+
+
+def _wholesale_priority(row: dict, ctx: RenderContext) -> str:
+    return row["client__wholesale_priority"] or WholesalePriorityChoices.STANDARD
+
+
+def _field_spec(name: str):
+    """(columns read, renderer) for one ``AppointmentSerializer`` output field."""
+    if name in _PLAIN_COLUMNS:
+        return (name,), plain(name)
+    if name in _DATETIME_COLUMNS:
+        return (name,), iso_datetime(name)
+    if name in _RENAMED_COLUMNS:
+        return (_RENAMED_COLUMNS[name],), plain(_RENAMED_COLUMNS[name])
+    if name == "latest_message_created_at":
+        return ("last_message_at",), iso_datetime("last_message_at")
+    if name in {"rustdesk_id", "rustdesk_password"}:
+        # Listings never expose client access; see AppointmentSerializer._can_see_client_access.
+        return (), constant("")
+    for field_name in ("photo_lock_screen", "payment_proof"):
+        for suffix, variant in (("_url", None), ("_thumb_url", THUMBNAIL_SIZE), ("_preview_url", PREVIEW_SIZE)):
+            if name == f"{field_name}{suffix}":
+                return ("id", field_name, derivatives_ready_field(field_name)), _media_url(field_name, variant)
+    if name in {"client_risk_score", "client_risk_level"}:
+        column = f"client__client_stats__{name.removeprefix('client_')}"
+        return ("assigned_master", column), _client_risk(column)
+    if name == "client_service_center_pro":
+        return ("client__is_service_center", "client__wholesale_status"), _service_center_pro
+    if name == "client_wholesale_priority":
+        return ("client__wholesale_priority",), _wholesale_priority
+    if name == "unread_count":
+        return ("id",), _unread_count
+    raise KeyError(name)
+
+
+@lru_cache(maxsize=64)
+def compile_appointment_renderer(projection: frozenset[str] | None) -> CompiledRenderer:
+    from .serializers import AppointmentSerializer
+
+    names = [name for name in readable_field_names(AppointmentSerializer) if projection is None or name in projection]
+    columns: list[str] = ["id"]
+    fields = []
+    for name in names:
+        field_columns, render = _field_spec(name)
+        columns.extend(field_columns)
+        fields.append((name, render))
+    optional = (UNREAD_COUNT_ANNOTATION,) if "unread_count" in names else ()
+    return CompiledRenderer(columns, fields, optional_annotations=optional, omit_when_none=("master_username",))
+
+
+def _prepare_unread_counts(rows: list[dict], ctx: RenderContext) -> None:
+    precomputed = ctx.extra.get("unread_counts") or {}
+    missing = [
+        row["id"] for row in rows if row.get(UNREAD_COUNT_ANNOTATION) is None and row["id"] not in precomputed
+    ]
+    ctx.extra["unread_counts"] = {**precomputed, **get_unread_counts(ctx.user, missing)}
+
+
+def appointment_list_renderer(serializer_context: dict) -> FastListRenderer | None:
+    """Fast path equivalent of ``AppointmentSerializer(many=True)`` for list pages.
+
+    Returns ``None`` when the context asks for client access, which only
+    detail views render.
+    """
+    if serializer_context.get("include_client_access"):
+        return None
+    projection = serializer_context.get(PROJECTION_CONTEXT_KEY)
+    compiled = compile_appointment_renderer(projection)
+    prepare = _prepare_unread_counts if projection is None or "unread_count" in projection else None
+    return FastListRenderer(compiled, RenderContext.from_serializer_context(serializer_context), prepare=prepare)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.appointments.archive import archive_closed_appointments
+
+
+class Command(BaseCommand):
+    help = "Переносит события и сообщения закрытых заявок старше N дней в архивные таблицы."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.APPOINTMENT_ARCHIVE_AFTER_DAYS,
+            help="Архивировать заявки, закрытые больше N дней назад.",
+        )
+        parser.add_argument("--batch-size", type=int, default=200, help="Сколько заявок переносить за транзакцию.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size должен быть больше нуля")
+        if options["older_than_days"] < 1:
+            raise CommandError("--older-than-days должен быть больше нуля")
+
+        def report(progress):
+            self.stdout.write(
+                "up to id={last_id}: archived {appointments} appointments, "
+                "{events} events, {messages} messages".format(**progress)
+            )
+
+        summary = archive_closed_appointments(
+            older_than_days=options["older_than_days"],
+            batch_size=batch_size,
+            on_batch=report,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Archived {appointments} appointments ({events} events, {messages} messages)".format(**summary)
+            )
+        )
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.models import User
+from apps.appointments.fast_render import appointment_list_renderer
+from apps.appointments.models import Appointment
+from apps.appointments.serializers import AppointmentSerializer
+from apps.chat.fast_render import message_list_renderer
+from apps.chat.models import Message
+from apps.chat.serializers import MessageSerializer
+
+
+def _rate(rows: int, elapsed: float) -> float:
+    return round(rows / elapsed, 1) if elapsed else float(rows)
+
+
+class Command(BaseCommand):
+    help = "Сравнивает скорость DRF-сериализаторов и быстрого рендера на страницах заявок и сообщений (только чтение)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200, help="Размер страницы.")
+        parser.add_argument("--rounds", type=int, default=5, help="Сколько раз рендерить каждую страницу.")
+        parser.add_argument("--username", default="", help="От чьего имени считать unread и риск клиента.")
+
+    def handle(self, *args, **options):
+        rows, rounds = options["rows"], options["rounds"]
+        if rows < 1 or rounds < 1:
+            raise CommandError("--rows и --rounds должны быть больше нуля")
+        user = None
+        if options["username"]:
+            user = User.objects.filter(username=options["username"]).first()
+            if user is None:
+                raise CommandError(f"Пользователь {options['username']} не найден")
+
+        appointment_context = {"request": None, "include_client_access": False}
+        appointments = Appointment.objects.for_listing(user).order_by("-id")[:rows]
+        self._compare(
+            "appointments",
+            lambda: AppointmentSerializer(list(appointments), many=True, context=appointment_context).data,
+            lambda: self._render_fast(appointment_list_renderer(appointment_context), appointments),
+            rounds=rounds,
+        )
+
+        messages = Message.objects.select_related("sender").order_by("-id")[:rows]
+        self._compare(
+            "messages",
+            lambda: MessageSerializer(list(messages), many=True, context={"request": None}).data,
+            lambda: self._render_fast(message_list_renderer({"request": None}), messages),
+            rounds=rounds,
+        )
+
+    @staticmethod
+    def _render_fast(renderer, queryset):
+        return renderer.render(list(renderer.values(queryset)))
+
+    def _compare(self, label: str, drf_page, fast_page, *, rounds: int) -> None:
+        results = {}
+        for name, render in (("drf", drf_page), ("fast", fast_page)):
+            rendered = 0
+            started = time.monotonic()
+            for _ in range(rounds):
+                rendered += len(render())
+            results[name] = (rendered, time.monotonic() - started)
+
+        drf_rate = _rate(*results["drf"])
+        fast_rate = _rate(*results["fast"])
+        speedup = round(fast_rate / drf_rate, 1) if drf_rate else 0.0
+        self.stdout.write(
+            f"{label}: {results['fast'][0] // rounds} rows/page, drf {drf_rate} rows/s, "
+            f"fast {fast_rate} rows/s ({speedup}x)"
+        )
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.appointments.dispatch import advance_expired_offers, dispatch_enabled
+
+
+class Command(BaseCommand):
+    help = "Передаёт просроченные предложения новых заявок следующему мастеру."
+
+    def handle(self, *args, **options):
+        if not dispatch_enabled():
+            self.stdout.write("APPOINTMENT_DISPATCH_ENABLED is off, nothing to do")
+            return
+        advanced = advance_expired_offers(force=True)
+        self.stdout.write(self.style.SUCCESS(f"Advanced {advanced} dispatch offers"))
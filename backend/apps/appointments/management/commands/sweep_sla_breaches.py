@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.appointments.services import sweep_sla_breaches
+
+
+class Command(BaseCommand):
+    help = "Отмечает просроченные по SLA заявки и создаёт события sla.breached пачками."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Сколько заявок обрабатывать за транзакцию.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size должен быть больше нуля")
+        summary = sweep_sla_breaches(batch_size=batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Flagged {flagged} SLA breaches (response={response_timeout}, completion={completion_timeout}), "
+                "avg latency {avg_breach_latency_seconds}s, max {max_breach_latency_seconds}s".format(**summary)
+            )
+        )
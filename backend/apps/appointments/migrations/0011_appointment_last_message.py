@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:37
+
+from django.db import migrations, models
+from django.db.models import Max
+
+_BACKFILL_FIELDS = [
+    "last_message_id",
+    "last_message_preview",
+    "last_message_at",
+    "last_message_sender_username",
+    "last_message_sender_role",
+]
+
+
+def backfill_last_message(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+    Message = apps.get_model("chat", "Message")
+    db_alias = schema_editor.connection.alias
+
+    latest_ids = (
+        Message.objects.using(db_alias)
+        .filter(is_deleted=False)
+        .order_by()
+        .values("appointment_id")
+        .annotate(last_id=Max("id"))
+        .values_list("last_id", flat=True)
+    )
+    batch = []
+    for message in Message.objects.using(db_alias).filter(id__in=latest_ids).select_related("sender").iterator(chunk_size=500):
+        text = (message.text or "").strip()
+        batch.append(
+            Appointment(
+                id=message.appointment_id,
+                last_message_id=message.id,
+                last_message_preview=(text or ("Файл" if message.file else ""))[:255],
+                last_message_at=message.created_at,
+                last_message_sender_username=message.sender.username,
+                last_message_sender_role=message.sender.role,
+            )
+        )
+        if len(batch) >= 500:
+            Appointment.objects.using(db_alias).bulk_update(batch, _BACKFILL_FIELDS)
+            batch = []
+    if batch:
+        Appointment.objects.using(db_alias).bulk_update(batch, _BACKFILL_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0010_encrypt_rustdesk_credentials'),
+        ('chat', '0006_readstate_unread_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='last_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='last_message_preview',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='last_message_sender_role',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='last_message_sender_username',
+            field=models.CharField(blank=True, max_length=150),
+        ),
+        migrations.RunPython(backfill_last_message, migrations.RunPython.noop),
+    ]
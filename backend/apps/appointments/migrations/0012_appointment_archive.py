@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0011_appointment_last_message'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedAppointmentEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('status_changed', 'Status changed'), ('price_set', 'Price set'), ('payment_proof_uploaded', 'Payment proof uploaded'), ('payment_marked', 'Payment marked'), ('payment_confirmed', 'Payment confirmed'), ('message_deleted', 'Message deleted'), ('client_signal', 'Client signal')], max_length=40)),
+                ('from_status', models.CharField(blank=True, max_length=40)),
+                ('to_status', models.CharField(blank=True, max_length=40)),
+                ('note', models.TextField(blank=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to='appointments.appointment')),
+            ],
+            options={
+                'ordering': ('-id',),
+            },
+        ),
+    ]
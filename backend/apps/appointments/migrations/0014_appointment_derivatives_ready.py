@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0013_appointment_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='payment_proof_derivatives_ready',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='photo_lock_screen_derivatives_ready',
+            field=models.BooleanField(default=False),
+        ),
+    ]
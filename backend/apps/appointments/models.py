@@ -3,7 +3,7 @@
 from django.conf import settings
 from django.db import models
 
-from apps.common.crypto_fields import EncryptedTextField
+from apps.common.crypto_fields import EncryptedFieldsQuerySet, EncryptedTextField
 from apps.common.models import TimeStampedModel
 from apps.common.upload_security import image_upload_policy, payment_proof_upload_policy, validate_upload
 
@@ -20,6 +20,28 @@ def validate_payment_proof(value):
     validate_upload(value, payment_proof_upload_policy(settings.PAYMENT_PROOF_MAX_UPLOAD_MB * 1024 * 1024))
 
 
+class AppointmentQuerySet(EncryptedFieldsQuerySet):
+    def for_listing(self, user, role: str | None = None, *, projection: frozenset[str] | None = None):
+        """Joins and annotations ``AppointmentSerializer`` needs for a list page.
+
+        Callers still apply their own filters and ordering. The page renders in
+        a fixed number of queries whatever its size. Clients never see the client
+        risk block, so only staff listings join ``client_stats``.
+        """
+        from apps.chat.unread import UNREAD_COUNT_ANNOTATION, unread_count_annotation
+
+        from .projection import project_appointment_queryset
+
+        role = role or getattr(user, "role", "")
+        related = ["client", "assigned_master"]
+        if role != "client":
+            related.append("client__client_stats")
+        queryset = project_appointment_queryset(self.select_related(*related), projection)
+        if getattr(user, "is_authenticated", False) and (projection is None or "unread_count" in projection):
+            queryset = queryset.annotate(**{UNREAD_COUNT_ANNOTATION: unread_count_annotation(user)})
+        return queryset
+
+
 class LockTypeChoices(models.TextChoices):
     GOOGLE = "GOOGLE", "GOOGLE"
     HUAWEI_ID = "HUAWEI_ID", "HUAWEI_ID"
@@ -74,6 +96,8 @@ class Appointment(TimeStampedModel):
         blank=True,
         validators=[validate_image_file],
     )
+    # Set once the WebP thumbnail/preview of photo_lock_screen are stored (apps.common.media_derivatives).
+    photo_lock_screen_derivatives_ready = models.BooleanField(default=False)
 
     status = models.CharField(
         max_length=40,
@@ -100,6 +124,7 @@ class Appointment(TimeStampedModel):
         blank=True,
         validators=[validate_payment_proof],
     )
+    payment_proof_derivatives_ready = models.BooleanField(default=False)
     payment_marked_at = models.DateTimeField(null=True, blank=True)
     payment_confirmed_at = models.DateTimeField(null=True, blank=True)
     payment_confirmed_by = models.ForeignKey(
@@ -118,9 +143,73 @@ class Appointment(TimeStampedModel):
     sla_breached = models.BooleanField(default=False, db_index=True)
     platform_tags = models.JSONField(default=list, blank=True)
 
+    # Denormalized latest visible chat message, maintained by apps.chat.previews.
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=255, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_sender_username = models.CharField(max_length=150, blank=True)
+    last_message_sender_role = models.CharField(max_length=20, blank=True)
+
+    # Set once the closed appointment's events and messages moved to the archive tables.
+    archived_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    # Bumped by every write; realtime deltas carry it so subscribers can detect gaps.
+    version = models.PositiveBigIntegerField(default=1)
+
+    objects = AppointmentQuerySet.as_manager()
+
     class Meta:
         ordering = ("-created_at",)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Loaded column values, diffed on save to build field-level deltas.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        from .deltas import snapshot_loaded_values
+
+        previous = getattr(self, "_loaded_values", None) or {}
+        snapshot_loaded_values(self)
+        if fields is not None:
+            # Deferred-field loads refresh one column; keep the rest of the baseline.
+            refreshed = {self._meta.get_field(name).attname for name in fields}
+            self._loaded_values = {
+                **{key: value for key, value in previous.items() if key not in refreshed},
+                **{key: value for key, value in self._loaded_values.items() if key in refreshed},
+            }
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        bump = not self._state.adding and not kwargs.get("force_insert") and (update_fields is None or update_fields)
+        if bump:
+            loaded_version = self.__dict__.get("version")
+            # The instance's own version + 1 is what the UPDATE writes unless a queryset.update()
+            # writer bumped the row since it was loaded; save() overwrites the other columns
+            # from the same stale copy anyway, so no extra SELECT is spent to find out.
+            self._saved_version = loaded_version + 1 if isinstance(loaded_version, int) else None
+            # Still incremented in SQL so the column stays monotonic next to those writers.
+            self.version = models.F("version") + 1
+            if update_fields is not None:
+                kwargs["update_fields"] = [*update_fields, "version"]
+        super().save(*args, **kwargs)
+        self.sync_version()
+
+    def sync_version(self) -> None:
+        """Replace a pending ``F("version") + 1`` with the value it wrote.
+
+        post_save receivers run before ``save()`` returns, so they call this too.
+        Only an instance loaded without ``version`` has to read it back.
+        """
+        if isinstance(self.version, models.expressions.Combinable):
+            saved_version = self.__dict__.pop("_saved_version", None)
+            if saved_version is None:
+                saved_version = type(self)._base_manager.filter(pk=self.pk).values_list("version", flat=True).get()
+            self.version = saved_version
+
 
 class AppointmentEventType(models.TextChoices):
     STATUS_CHANGED = "status_changed", "Status changed"
@@ -153,3 +242,31 @@ class AppointmentEvent(TimeStampedModel):
 
     class Meta:
         ordering = ("-id",)
+
+
+class ArchivedAppointmentEvent(models.Model):
+    """Cold copy of an ``AppointmentEvent`` of an archived appointment; ids are preserved."""
+
+    id = models.BigIntegerField(primary_key=True)
+    appointment = models.ForeignKey(
+        "appointments.Appointment",
+        on_delete=models.CASCADE,
+        related_name="archived_events",
+    )
+    actor = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    event_type = models.CharField(max_length=40, choices=AppointmentEventType.choices)
+    from_status = models.CharField(max_length=40, blank=True)
+    to_status = models.CharField(max_length=40, blank=True)
+    note = models.TextField(blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-id",)
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.accounts.models import MasterLevelChoices, User, WholesalePriorityChoices
+from apps.common.media_derivatives import PREVIEW_SIZE, THUMBNAIL_SIZE
+from apps.common.secure_media import MEDIA_SCOPE_APPOINTMENT, build_media_access_url
+
+from .models import Appointment, AppointmentStatusChoices
+
+logger = logging.getLogger(__name__)
+
+# Read model for the master "new appointments" queue: two sorted sets of
+# appointment ids (all / retail-only for trainees) scored by priority and a
+# hash of pre-rendered cards. Redis is optional; callers fall back to SQL.
+QUEUE_ALL_KEY = "appointments:new_queue:all"
+QUEUE_RETAIL_KEY = "appointments:new_queue:retail"
+QUEUE_CARDS_KEY = "appointments:new_queue:cards"
+QUEUE_READY_KEY = "appointments:new_queue:ready"
+QUEUE_REBUILD_LOCK_KEY = "appointments:new_queue:rebuild-lock"
+
+_PRIORITY_TIERS = {
+    WholesalePriorityChoices.CRITICAL: 0,
+    WholesalePriorityChoices.PRIORITY: 1,
+    WholesalePriorityChoices.STANDARD: 2,
+}
+_TIER_WIDTH = 10**11
+_STANDARD_TIER = _PRIORITY_TIERS[WholesalePriorityChoices.STANDARD]
+
+# Card media URL key -> derivative size (None is the original upload).
+CARD_MEDIA_VARIANTS = {
+    "photo_lock_screen_url": None,
+    "photo_lock_screen_thumb_url": THUMBNAIL_SIZE,
+    "photo_lock_screen_preview_url": PREVIEW_SIZE,
+}
+
+_client = None
+
+
+def _get_client():
+    global _client
+    if not settings.REDIS_URL:
+        return None
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+            decode_responses=True,
+        )
+    return _client
+
+
+def _queue_is_open(appointment: Appointment) -> bool:
+    return appointment.status == AppointmentStatusChoices.NEW and appointment.assigned_master_id is None
+
+
+def _priority_tier(appointment: Appointment) -> int:
+    if not appointment.is_wholesale_request or appointment.client is None:
+        return _STANDARD_TIER
+    return _PRIORITY_TIERS.get(appointment.client.wholesale_priority, _STANDARD_TIER)
+
+
+def queue_score(appointment: Appointment) -> float:
+    due_at = appointment.response_deadline_at or appointment.created_at
+    return float(_priority_tier(appointment) * _TIER_WIDTH + int(due_at.timestamp()))
+
+
+def order_by_queue_priority(queryset):
+    """Apply the read model's ordering to a SQL queryset (used by the fallback)."""
+    tier = Case(
+        *[
+            When(is_wholesale_request=True, client__wholesale_priority=priority, then=Value(rank))
+            for priority, rank in _PRIORITY_TIERS.items()
+        ],
+        default=Value(_STANDARD_TIER),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(
+        queue_tier=tier,
+        queue_due_at=Coalesce("response_deadline_at", "created_at"),
+    ).order_by("queue_tier", "queue_due_at", "id")
+
+
+def render_queue_card(appointment: Appointment) -> dict:
+    from .serializers import AppointmentSerializer
+
+    # Every master sees the same card; messages in an unassigned appointment
+    # are all unread for them, so the count is stored instead of computed.
+    unread_count = appointment.messages.filter(is_deleted=False).count()
+    context = {"include_client_access": False, "unread_counts": {appointment.id: unread_count}}
+    card = dict(AppointmentSerializer(appointment, context=context).data)
+    card["photo_lock_screen_url"] = None
+    card["photo_lock_screen_thumb_url"] = None
+    card["photo_lock_screen_preview_url"] = None
+    card["_photo_lock_screen_name"] = appointment.photo_lock_screen.name if appointment.photo_lock_screen else ""
+    card["_photo_lock_screen_derivatives_ready"] = appointment.photo_lock_screen_derivatives_ready
+    return card
+
+
+def _card_json(appointment: Appointment) -> str:
+    return json.dumps(render_queue_card(appointment), cls=JSONEncoder)
+
+
+def _write_entry(pipe, appointment: Appointment, *, all_key: str, retail_key: str, cards_key: str) -> None:
+    score = queue_score(appointment)
+    member = str(appointment.id)
+    pipe.zadd(all_key, {member: score})
+    if appointment.is_wholesale_request:
+        pipe.zrem(retail_key, member)
+    else:
+        pipe.zadd(retail_key, {member: score})
+    pipe.hset(cards_key, member, _card_json(appointment))
+
+
+def _remove_entries(pipe, appointment_ids) -> None:
+    members = [str(appointment_id) for appointment_id in appointment_ids]
+    if not members:
+        return
+    pipe.zrem(QUEUE_ALL_KEY, *members)
+    pipe.zrem(QUEUE_RETAIL_KEY, *members)
+    pipe.hdel(QUEUE_CARDS_KEY, *members)
+
+
+def sync_queue_entries(appointment_ids) -> None:
+    client = _get_client()
+    if client is None:
+        return
+    ids = list(dict.fromkeys(int(item) for item in appointment_ids))
+    if not ids:
+        return
+    try:
+        open_appointments = [
+            appointment
+            for appointment in Appointment.objects.defer_encrypted().filter(id__in=ids).select_related("client")
+            if _queue_is_open(appointment)
+        ]
+        open_ids = {appointment.id for appointment in open_appointments}
+        pipe = client.pipeline()
+        _remove_entries(pipe, [appointment_id for appointment_id in ids if appointment_id not in open_ids])
+        for appointment in open_appointments:
+            _write_entry(pipe, appointment, all_key=QUEUE_ALL_KEY, retail_key=QUEUE_RETAIL_KEY, cards_key=QUEUE_CARDS_KEY)
+        pipe.execute()
+    except Exception as exc:
+        # A stale read model is worse than none: drop it and let the next read rebuild.
+        logger.warning("New appointment queue sync failed: %s", exc)
+        invalidate_queue()
+
+
+def remove_queue_entries(appointment_ids) -> None:
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline()
+        _remove_entries(pipe, appointment_ids)
+        pipe.execute()
+    except Exception as exc:
+        logger.warning("New appointment queue removal failed: %s", exc)
+        invalidate_queue()
+
+
+def schedule_queue_sync(appointment_ids) -> None:
+    ids = list(appointment_ids)
+    if ids and settings.REDIS_URL:
+        transaction.on_commit(lambda: sync_queue_entries(ids))
+
+
+def schedule_queue_removal(appointment_ids) -> None:
+    ids = list(appointment_ids)
+    if ids and settings.REDIS_URL:
+        transaction.on_commit(lambda: remove_queue_entries(ids))
+
+
+def invalidate_queue() -> None:
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        client.delete(QUEUE_READY_KEY)
+    except Exception as exc:
+        logger.warning("New appointment queue invalidation failed: %s", exc)
+
+
+def rebuild_queue() -> bool:
+    client = _get_client()
+    if client is None:
+        return False
+    if not client.set(QUEUE_REBUILD_LOCK_KEY, "1", nx=True, ex=30):
+        return False
+    try:
+        staging = {key: f"{key}:staging" for key in (QUEUE_ALL_KEY, QUEUE_RETAIL_KEY, QUEUE_CARDS_KEY)}
+        pipe = client.pipeline()
+        pipe.delete(*staging.values())
+        queryset = (
+            Appointment.objects.defer_encrypted()
+            .filter(status=AppointmentStatusChoices.NEW, assigned_master__isnull=True)
+            .select_related("client")
+        )
+        for appointment in queryset.iterator(chunk_size=500):
+            _write_entry(
+                pipe,
+                appointment,
+                all_key=staging[QUEUE_ALL_KEY],
+                retail_key=staging[QUEUE_RETAIL_KEY],
+                cards_key=staging[QUEUE_CARDS_KEY],
+            )
+        pipe.execute()
+
+        swap = client.pipeline(transaction=True)
+        for key, staging_key in staging.items():
+            swap.delete(key)
+            if client.exists(staging_key):
+                swap.rename(staging_key, key)
+        swap.set(QUEUE_READY_KEY, "1")
+        swap.execute()
+        return True
+    finally:
+        client.delete(QUEUE_REBUILD_LOCK_KEY)
+
+
+def _sign_card_media(card: dict, request, *, sign_media: bool = True) -> dict:
+    photo_name = card.pop("_photo_lock_screen_name", "")
+    derivatives_ready = bool(card.pop("_photo_lock_screen_derivatives_ready", False))
+    if photo_name and sign_media:
+        field = Appointment._meta.get_field("photo_lock_screen")
+        for key, variant in CARD_MEDIA_VARIANTS.items():
+            card[key] = build_media_access_url(
+                file_field=field.attr_class(None, field, photo_name),
+                scope=MEDIA_SCOPE_APPOINTMENT,
+                object_id=card["id"],
+                field_name="photo_lock_screen",
+                request=request,
+                variant=variant,
+                derivatives_ready=derivatives_ready,
+            )
+    return card
+
+
+def read_queue_page(
+    master: User,
+    *,
+    offset: int,
+    limit: int,
+    request=None,
+    sign_media: bool = True,
+) -> tuple[list[dict], int] | None:
+    """Return ``(cards, total)`` from the read model, or ``None`` to use SQL."""
+    client = _get_client()
+    if client is None:
+        return None
+    key = QUEUE_RETAIL_KEY if master.master_level == MasterLevelChoices.TRAINEE else QUEUE_ALL_KEY
+    try:
+        if not client.exists(QUEUE_READY_KEY) and not rebuild_queue():
+            return None
+        pipe = client.pipeline()
+        pipe.zrange(key, offset, offset + limit - 1)
+        pipe.zcard(key)
+        members, total = pipe.execute()
+        payloads = client.hmget(QUEUE_CARDS_KEY, members) if members else []
+    except Exception as exc:
+        logger.warning("New appointment queue read failed, using database: %s", exc)
+        return None
+    if any(payload is None for payload in payloads):
+        invalidate_queue()
+        return None
+    cards = [_sign_card_media(json.loads(payload), request, sign_media=sign_media) for payload in payloads]
+    return cards, int(total)
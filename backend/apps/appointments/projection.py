@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from apps.common.projection import resolve_field_projection
+
+# Output field -> relation it reads. Only projected relations are joined.
+_RELATED_FOR_FIELD = {
+    "client_username": "client",
+    "client_service_center_pro": "client",
+    "client_wholesale_priority": "client",
+    "client_risk_score": "client__client_stats",
+    "client_risk_level": "client__client_stats",
+    "master_username": "assigned_master",
+}
+
+# Output field -> column that is only loaded for it (encrypted or long text).
+_DEFERRABLE_FOR_FIELD = {
+    "rustdesk_id": "rustdesk_id",
+    "rustdesk_password": "rustdesk_password",
+    "description": "description",
+    "payment_requisites_note": "payment_requisites_note",
+}
+
+
+def resolve_appointment_projection(request) -> frozenset[str] | None:
+    from .serializers import AppointmentSerializer
+
+    return resolve_field_projection(request, AppointmentSerializer)
+
+
+def project_appointment_queryset(queryset, projection: frozenset[str] | None):
+    """Join and load only what the projected ``AppointmentSerializer`` fields read.
+
+    Listings never expose client access, so encrypted columns are skipped even
+    without a projection.
+    """
+    if projection is None:
+        return queryset.defer_encrypted()
+    related = sorted({_RELATED_FOR_FIELD[name] for name in projection if name in _RELATED_FOR_FIELD})
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    deferred = [column for name, column in _DEFERRABLE_FOR_FIELD.items() if name not in projection]
+    return queryset.defer(*deferred) if deferred else queryset
+
+
+def project_rendered_card(card: dict, projection: frozenset[str] | None) -> dict:
+    if projection is None:
+        return card
+    return {name: value for name, value in card.items() if name in projection}
+
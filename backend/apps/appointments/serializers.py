@@ -1,12 +1,15 @@
 ﻿from __future__ import annotations
 
-from datetime import datetime
+import csv
+import io
 
 from django.conf import settings
 from rest_framework import serializers
 
 from apps.accounts.models import WholesalePriorityChoices, WholesaleStatusChoices
-from apps.chat.models import Message, ReadState
+from apps.chat.serializers import UnreadCountListSerializer, resolve_unread_count
+from apps.common.media_derivatives import PREVIEW_SIZE, THUMBNAIL_SIZE
+from apps.common.projection import ProjectedFieldsMixin
 from apps.common.secure_media import build_appointment_media_url
 from apps.common.upload_security import image_upload_policy, payment_proof_upload_policy, sanitize_upload
 
@@ -19,25 +22,30 @@ from .models import (
 )
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(ProjectedFieldsMixin, serializers.ModelSerializer):
     unread_count = serializers.SerializerMethodField()
     client_username = serializers.CharField(source="client.username", read_only=True)
     master_username = serializers.CharField(source="assigned_master.username", read_only=True)
     rustdesk_id = serializers.SerializerMethodField()
     rustdesk_password = serializers.SerializerMethodField()
     photo_lock_screen_url = serializers.SerializerMethodField()
+    photo_lock_screen_thumb_url = serializers.SerializerMethodField()
+    photo_lock_screen_preview_url = serializers.SerializerMethodField()
     payment_proof_url = serializers.SerializerMethodField()
+    payment_proof_thumb_url = serializers.SerializerMethodField()
+    payment_proof_preview_url = serializers.SerializerMethodField()
     client_risk_score = serializers.SerializerMethodField()
     client_risk_level = serializers.SerializerMethodField()
-    latest_message_text = serializers.SerializerMethodField()
-    latest_message_created_at = serializers.SerializerMethodField()
-    latest_message_sender_username = serializers.SerializerMethodField()
-    latest_message_sender_role = serializers.SerializerMethodField()
+    latest_message_text = serializers.CharField(source="last_message_preview", read_only=True)
+    latest_message_created_at = serializers.DateTimeField(source="last_message_at", read_only=True)
+    latest_message_sender_username = serializers.CharField(source="last_message_sender_username", read_only=True)
+    latest_message_sender_role = serializers.CharField(source="last_message_sender_role", read_only=True)
     client_service_center_pro = serializers.SerializerMethodField()
     client_wholesale_priority = serializers.SerializerMethodField()
 
     class Meta:
         model = Appointment
+        list_serializer_class = UnreadCountListSerializer
         fields = (
             "id",
             "brand",
@@ -50,6 +58,8 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "rustdesk_password",
             "photo_lock_screen",
             "photo_lock_screen_url",
+            "photo_lock_screen_thumb_url",
+            "photo_lock_screen_preview_url",
             "status",
             "total_price",
             "wholesale_base_price",
@@ -60,6 +70,8 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "payment_requisites_note",
             "payment_proof",
             "payment_proof_url",
+            "payment_proof_thumb_url",
+            "payment_proof_preview_url",
             "payment_marked_at",
             "payment_confirmed_at",
             "payment_confirmed_by",
@@ -83,6 +95,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "sla_breached",
             "platform_tags",
             "unread_count",
+            "version",
             "created_at",
             "updated_at",
         )
@@ -101,6 +114,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "sla_breached",
             "platform_tags",
             "unread_count",
+            "version",
             "created_at",
             "updated_at",
         )
@@ -110,21 +124,26 @@ class AppointmentSerializer(serializers.ModelSerializer):
         }
 
     def get_unread_count(self, obj: Appointment) -> int:
-        request = self.context.get("request")
-        user = getattr(request, "user", None)
-        if not user or not user.is_authenticated:
-            return 0
-
-        state = ReadState.objects.filter(appointment=obj, user=user).first()
-        last_read_id = state.last_read_message_id if state else 0
-        return obj.messages.filter(id__gt=last_read_id, is_deleted=False).exclude(sender=user).count()
+        return resolve_unread_count(self, obj)
 
     def get_photo_lock_screen_url(self, obj: Appointment) -> str | None:
         return build_appointment_media_url(self.context.get("request"), obj, "photo_lock_screen")
 
+    def get_photo_lock_screen_thumb_url(self, obj: Appointment) -> str | None:
+        return build_appointment_media_url(self.context.get("request"), obj, "photo_lock_screen", variant=THUMBNAIL_SIZE)
+
+    def get_photo_lock_screen_preview_url(self, obj: Appointment) -> str | None:
+        return build_appointment_media_url(self.context.get("request"), obj, "photo_lock_screen", variant=PREVIEW_SIZE)
+
     def get_payment_proof_url(self, obj: Appointment) -> str | None:
         return build_appointment_media_url(self.context.get("request"), obj, "payment_proof")
 
+    def get_payment_proof_thumb_url(self, obj: Appointment) -> str | None:
+        return build_appointment_media_url(self.context.get("request"), obj, "payment_proof", variant=THUMBNAIL_SIZE)
+
+    def get_payment_proof_preview_url(self, obj: Appointment) -> str | None:
+        return build_appointment_media_url(self.context.get("request"), obj, "payment_proof", variant=PREVIEW_SIZE)
+
     def _can_see_client_access(self, obj: Appointment) -> bool:
         if not self.context.get("include_client_access"):
             return False
@@ -173,56 +192,6 @@ class AppointmentSerializer(serializers.ModelSerializer):
         stats = getattr(obj.client, "client_stats", None)
         return getattr(stats, "risk_level", None)
 
-    def _get_latest_message(self, obj: Appointment):
-        if hasattr(obj, "_latest_message_cached"):
-            return getattr(obj, "_latest_message_cached")
-        latest = (
-            Message.objects.filter(appointment=obj, is_deleted=False)
-            .select_related("sender")
-            .order_by("-id")
-            .first()
-        )
-        setattr(obj, "_latest_message_cached", latest)
-        return latest
-
-    def get_latest_message_text(self, obj: Appointment) -> str:
-        annotated = getattr(obj, "latest_message_text", None)
-        if annotated is not None:
-            return annotated
-        latest = self._get_latest_message(obj)
-        if not latest:
-            return ""
-        if (latest.text or "").strip():
-            return latest.text
-        if latest.file:
-            return "Файл"
-        return ""
-
-    def get_latest_message_created_at(self, obj: Appointment) -> datetime | None:
-        annotated = getattr(obj, "latest_message_created_at", None)
-        if annotated is not None:
-            return annotated
-        latest = self._get_latest_message(obj)
-        return getattr(latest, "created_at", None)
-
-    def get_latest_message_sender_username(self, obj: Appointment) -> str:
-        annotated = getattr(obj, "latest_message_sender_username", None)
-        if annotated:
-            return annotated
-        latest = self._get_latest_message(obj)
-        if not latest:
-            return ""
-        return getattr(latest.sender, "username", "") if latest.sender_id else ""
-
-    def get_latest_message_sender_role(self, obj: Appointment) -> str:
-        annotated = getattr(obj, "latest_message_sender_role", None)
-        if annotated:
-            return annotated
-        latest = self._get_latest_message(obj)
-        if not latest or not latest.sender_id:
-            return ""
-        return getattr(latest.sender, "role", "") or ""
-
     def get_client_service_center_pro(self, obj: Appointment) -> bool:
         client = getattr(obj, "client", None)
         if not client:
@@ -307,6 +276,58 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
         )
 
 
+class WholesaleBatchItemSerializer(AppointmentCreateSerializer):
+    class Meta(AppointmentCreateSerializer.Meta):
+        fields = (
+            "brand",
+            "model",
+            "lock_type",
+            "has_pc",
+            "contact_phone",
+            "description",
+            "rustdesk_id",
+            "rustdesk_password",
+        )
+
+
+class WholesaleBatchCreateSerializer(serializers.Serializer):
+    items = WholesaleBatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, value):
+        max_items = settings.WHOLESALE_BATCH_MAX_ITEMS
+        if len(value) > max_items:
+            raise serializers.ValidationError(f"За один раз можно отправить не больше {max_items} устройств.")
+        return value
+
+
+_BATCH_CSV_TRUE_VALUES = {"1", "true", "yes", "да", "y", "+"}
+
+
+def parse_wholesale_batch_csv(file_obj) -> list[dict]:
+    """Read batch rows from a CSV upload; the header row names the item fields."""
+    try:
+        content = file_obj.read().decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise serializers.ValidationError({"file": "CSV должен быть в кодировке UTF-8."}) from exc
+    try:
+        dialect = csv.Sniffer().sniff(content.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    rows = []
+    for row in csv.DictReader(io.StringIO(content), dialect=dialect):
+        item = {
+            (key or "").strip(): (value or "").strip()
+            for key, value in row.items()
+            if (key or "").strip() in WholesaleBatchItemSerializer.Meta.fields
+        }
+        if not any(item.values()):
+            continue
+        if "has_pc" in item:
+            item["has_pc"] = item["has_pc"].lower() in _BATCH_CSV_TRUE_VALUES
+        rows.append(item)
+    return rows
+
+
 class SetPriceSerializer(serializers.Serializer):
     total_price = serializers.IntegerField(min_value=1)
 
@@ -3,18 +3,23 @@
 from datetime import timedelta
 
 from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from apps.accounts.models import MasterLevelChoices, RoleChoices, User
+from apps.common.background import submit_after_commit
 from apps.platform.services import emit_event
 
+from .deltas import publish_appointment_deltas
+from .dispatch import assert_dispatch_allows_take, complete_dispatch, dispatch_enabled, dispatch_new_appointments
 from .models import (
     Appointment,
     AppointmentEvent,
     AppointmentEventType,
     AppointmentStatusChoices,
 )
+from .transitions import FIRST_ENTRY_TIMESTAMPS, bulk_compare_and_set_status, compare_and_set_status
 
 
 def add_event(
@@ -53,11 +58,74 @@ def initialize_response_deadline(appointment: Appointment) -> None:
     appointment.save(update_fields=["response_deadline_at", "updated_at"])
 
 
-def _set_completion_deadline_from_paid(appointment: Appointment) -> None:
+@transaction.atomic
+def create_wholesale_batch(client: User, items: list[dict]) -> list[Appointment]:
+    """Create many wholesale appointments in one INSERT with deadlines precomputed.
+
+    bulk_create skips post_save, so queue sync, dashboard invalidation and master
+    notification are done here: with dispatch enabled every appointment is offered
+    through the dispatcher after commit, otherwise masters get one aggregated message.
+    Each appointment still gets its own ``appointment.created`` event (one bulk
+    INSERT), so rules written for single creates fire for batch rows too.
+    """
+    from apps.accounts.dashboard import invalidate_dashboard_summaries
+    from apps.accounts.models import SiteSettings
+    from apps.accounts.notifications import notify_masters_about_new_appointments_batch
+    from apps.platform.models import PlatformEvent
+    from apps.platform.realtime import broadcast_platform_event
+    from apps.platform.rules import process_event_rules
+
+    from .new_queue import schedule_queue_sync
+
+    now = timezone.now()
+    response_deadline_at = now + timedelta(minutes=max(1, SiteSettings.load().sla_response_minutes))
+    appointments = Appointment.objects.bulk_create(
+        [
+            Appointment(
+                client=client,
+                is_wholesale_request=True,
+                response_deadline_at=response_deadline_at,
+                **item,
+            )
+            for item in items
+        ]
+    )
+    appointment_ids = [appointment.id for appointment in appointments]
+    events = PlatformEvent.objects.bulk_create(
+        [
+            PlatformEvent(
+                event_type="appointment.created",
+                entity_type=Appointment.__name__,
+                entity_id=str(appointment.id),
+                actor=client,
+                payload={"status": appointment.status, "batch": True},
+            )
+            for appointment in appointments
+        ]
+    )
+    for event in events:
+        process_event_rules(event)
+        broadcast_platform_event(event)
+    emit_event(
+        "appointment.batch_created",
+        client,
+        actor=client,
+        payload={"appointment_ids": appointment_ids, "count": len(appointment_ids)},
+    )
+    invalidate_dashboard_summaries(user_ids=[client.id], queue=True, admin=True)
+    schedule_queue_sync(appointment_ids)
+    if dispatch_enabled():
+        submit_after_commit(dispatch_new_appointments, appointment_ids)
+    else:
+        submit_after_commit(notify_masters_about_new_appointments_batch, appointment_ids)
+    return appointments
+
+
+def _completion_deadline_from_paid():
     from apps.accounts.models import SiteSettings
 
     settings_obj = SiteSettings.load()
-    appointment.completion_deadline_at = timezone.now() + timedelta(hours=max(1, settings_obj.sla_completion_hours))
+    return timezone.now() + timedelta(hours=max(1, settings_obj.sla_completion_hours))
 
 
 def mark_sla_breach(appointment: Appointment, actor: User | None, reason: str, metadata: dict | None = None) -> None:
@@ -86,22 +154,133 @@ def evaluate_completion_sla(appointment: Appointment, actor: User | None) -> Non
         mark_sla_breach(appointment, actor, reason="completion_timeout", metadata={"overtime_seconds": overtime_seconds})
 
 
-def get_available_new_appointments_queryset_for_master(master: User):
+_SLA_SWEEP_STATUSES = {
+    "response_timeout": (AppointmentStatusChoices.NEW,),
+    "completion_timeout": (AppointmentStatusChoices.PAID, AppointmentStatusChoices.IN_PROGRESS),
+}
+
+
+def _overdue_sla_filter(now) -> Q:
+    return Q(
+        status__in=_SLA_SWEEP_STATUSES["response_timeout"],
+        response_deadline_at__lt=now,
+    ) | Q(
+        status__in=_SLA_SWEEP_STATUSES["completion_timeout"],
+        completion_deadline_at__lt=now,
+    )
+
+
+def _flag_sla_batch(appointment_ids: list[int], now) -> list[dict]:
+    with transaction.atomic():
+        rows = list(
+            Appointment.objects.select_for_update(skip_locked=True)
+            .filter(id__in=appointment_ids, sla_breached=False)
+            .filter(_overdue_sla_filter(now))
+            .values("id", "status", "client_id", "assigned_master_id", "response_deadline_at", "completion_deadline_at")
+        )
+        if not rows:
+            return []
+        flagged_ids = [row["id"] for row in rows]
+        Appointment.objects.filter(id__in=flagged_ids).update(sla_breached=True, updated_at=now, version=F("version") + 1)
+        publish_appointment_deltas(flagged_ids, ("sla_breached", "updated_at"))
+
+        breaches = []
+        for row in rows:
+            reason = "response_timeout" if row["status"] in _SLA_SWEEP_STATUSES["response_timeout"] else "completion_timeout"
+            deadline = row["response_deadline_at"] if reason == "response_timeout" else row["completion_deadline_at"]
+            breaches.append(
+                {
+                    "appointment_id": row["id"],
+                    "reason": reason,
+                    "breach_latency_seconds": max(int((now - deadline).total_seconds()), 0),
+                }
+            )
+
+        from apps.platform.models import PlatformEvent
+        from apps.platform.realtime import broadcast_platform_event
+        from apps.platform.rules import process_event_rules
+
+        events = PlatformEvent.objects.bulk_create(
+            [
+                PlatformEvent(
+                    event_type="sla.breached",
+                    entity_type=Appointment.__name__,
+                    entity_id=str(breach["appointment_id"]),
+                    payload={
+                        "reason": breach["reason"],
+                        "breach_latency_seconds": breach["breach_latency_seconds"],
+                        "detected_by": "sweeper",
+                    },
+                )
+                for breach in breaches
+            ]
+        )
+        for event in events:
+            process_event_rules(event)
+            broadcast_platform_event(event)
+
+        # update() and bulk_create() skip signals, so caches are refreshed here.
+        from apps.accounts.dashboard import invalidate_dashboard_summaries
+
+        from .new_queue import schedule_queue_sync
+
+        invalidate_dashboard_summaries(
+            user_ids=[row["client_id"] for row in rows] + [row["assigned_master_id"] for row in rows],
+            queue=True,
+            admin=True,
+        )
+        schedule_queue_sync([row["id"] for row in rows if row["status"] == AppointmentStatusChoices.NEW])
+    return breaches
+
+
+def sweep_sla_breaches(*, now=None, batch_size: int = 500) -> dict:
+    """Flag every overdue appointment that no transition has evaluated yet.
+
+    Uses the deadline indexes for one range scan per batch, a bulk UPDATE and
+    bulk-created ``sla.breached`` events. Returns counters and breach latency
+    (deadline to flag) for reporting.
+    """
+    now = now or timezone.now()
+    overdue = Appointment.objects.filter(sla_breached=False).filter(_overdue_sla_filter(now)).order_by("id")
+    breaches: list[dict] = []
+    last_id = 0
+    while True:
+        ids = list(overdue.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        last_id = ids[-1]
+        breaches.extend(_flag_sla_batch(ids, now))
+
+    latencies = [breach["breach_latency_seconds"] for breach in breaches]
+    return {
+        "flagged": len(breaches),
+        "response_timeout": sum(1 for breach in breaches if breach["reason"] == "response_timeout"),
+        "completion_timeout": sum(1 for breach in breaches if breach["reason"] == "completion_timeout"),
+        "avg_breach_latency_seconds": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_breach_latency_seconds": max(latencies, default=0),
+    }
+
+
+def available_new_appointments_filter_for_master(master: User) -> Q | None:
     if (
         master.role != RoleChoices.MASTER
         or not master.is_master_active
         or not master.master_quality_approved
         or master.is_banned
     ):
-        return Appointment.objects.none()
+        return None
 
-    queryset = Appointment.objects.filter(
-        status=AppointmentStatusChoices.NEW,
-        assigned_master__isnull=True,
-    )
+    condition = Q(status=AppointmentStatusChoices.NEW, assigned_master__isnull=True)
     if master.master_level == MasterLevelChoices.TRAINEE:
-        queryset = queryset.filter(is_wholesale_request=False)
-    return queryset
+        condition &= Q(is_wholesale_request=False)
+    return condition
+
+
+def get_available_new_appointments_queryset_for_master(master: User):
+    condition = available_new_appointments_filter_for_master(master)
+    if condition is None:
+        return Appointment.objects.none()
+    return Appointment.objects.filter(condition)
 
 
 def assert_master_can_take_new_appointment(appointment: Appointment, master: User) -> None:
@@ -115,25 +294,32 @@ def assert_master_can_take_new_appointment(appointment: Appointment, master: Use
         raise PermissionDenied("Стажер не может брать оптовые заявки")
 
 
-def transition_status(appointment: Appointment, actor: User, to_status: str, note: str = "") -> Appointment:
-    from_status = appointment.status
-    appointment.status = to_status
-    update_fields = ["status", "updated_at"]
-
-    if to_status == AppointmentStatusChoices.IN_REVIEW and not appointment.taken_at:
-        appointment.taken_at = timezone.now()
-        update_fields.append("taken_at")
-    if to_status == AppointmentStatusChoices.IN_PROGRESS and not appointment.started_at:
-        appointment.started_at = timezone.now()
-        update_fields.append("started_at")
+def transition_status(
+    appointment: Appointment,
+    actor: User,
+    to_status: str,
+    note: str = "",
+    *,
+    changes: dict | None = None,
+    expected: dict | None = None,
+    enforce_table: bool = True,
+) -> Appointment:
+    """Apply a status change as a conditional UPDATE, then record and announce it.
+
+    ``changes`` are written in the same UPDATE. A concurrent writer that moved
+    the status first makes this raise ``TransitionConflict`` (HTTP 409).
+    """
+    changes = dict(changes or {})
     if to_status == AppointmentStatusChoices.PAID:
-        _set_completion_deadline_from_paid(appointment)
-        update_fields.append("completion_deadline_at")
-    if to_status == AppointmentStatusChoices.COMPLETED and not appointment.completed_at:
-        appointment.completed_at = timezone.now()
-        update_fields.append("completed_at")
-
-    appointment.save(update_fields=update_fields)
+        changes["completion_deadline_at"] = _completion_deadline_from_paid()
+    outcome = compare_and_set_status(
+        appointment,
+        to_status,
+        changes=changes,
+        expected=expected,
+        enforce_table=enforce_table,
+    )
+    from_status = outcome.from_status
     add_event(
         appointment=appointment,
         actor=actor,
@@ -150,6 +336,7 @@ def transition_status(appointment: Appointment, actor: User, to_status: str, not
             "from_status": from_status,
             "to_status": to_status,
             "note": note,
+            "lock_wait_ms": outcome.lock_wait_ms,
         },
     )
     from apps.accounts.notifications import notify_client_about_status_change
@@ -173,18 +360,152 @@ def transition_status(appointment: Appointment, actor: User, to_status: str, not
 
 @transaction.atomic
 def take_appointment(appointment_id: int, master: User) -> Appointment:
-    appointment = Appointment.objects.select_for_update().get(id=appointment_id)
+    assert_dispatch_allows_take(appointment_id, master)
+    # No row lock: racing masters all read, one conditional UPDATE wins, the rest get 409.
+    appointment = Appointment.objects.get(id=appointment_id)
     if appointment.status != AppointmentStatusChoices.NEW:
         raise ValidationError("Можно взять только NEW заявку")
     assert_master_can_take_new_appointment(appointment, master)
 
-    appointment.assigned_master = master
-    appointment.save(update_fields=["assigned_master", "updated_at"])
-    updated_appointment = transition_status(appointment, master, AppointmentStatusChoices.IN_REVIEW, note="Заявка взята мастером")
+    updated_appointment = transition_status(
+        appointment,
+        master,
+        AppointmentStatusChoices.IN_REVIEW,
+        note="Заявка взята мастером",
+        changes={"assigned_master": master},
+        expected={"assigned_master__isnull": True},
+    )
     emit_event(
         "appointment.master_taken",
         updated_appointment,
         actor=master,
-        payload={"assigned_master_id": master.id},
+        payload={"assigned_master_id": master.id, **complete_dispatch(updated_appointment, master)},
     )
     return updated_appointment
+
+
+def _refresh_stats_after_bulk_transition(client_ids: list[int], master_id: int) -> None:
+    from apps.accounts.services import recalculate_client_stats, recalculate_master_stats
+
+    for client in User.objects.filter(id__in=client_ids):
+        recalculate_client_stats(client)
+    master = User.objects.filter(id=master_id).first()
+    if master is not None:
+        recalculate_master_stats(master)
+
+
+@transaction.atomic
+def run_master_bulk_action(
+    *,
+    master: User,
+    appointment_ids: list[int],
+    from_status: str | None = None,
+    to_status: str | None = None,
+    skip_reason: str = "",
+    note: str = "",
+    message_text: str = "",
+) -> tuple[list[int], list[dict]]:
+    """Apply one master action to many appointments with batched writes.
+
+    Status changes go through ``bulk_compare_and_set_status``: the transition
+    table is enforced and rows moved by someone else meanwhile are skipped, with
+    no row locks. Without ``to_status`` only the chat message is sent. Telegram
+    notifications and stats recalculation are grouped and deferred until after commit.
+    """
+    from apps.accounts.dashboard import invalidate_dashboard_summaries
+    from apps.accounts.notifications import notify_clients_about_bulk_update
+    from apps.chat.models import Message
+    from apps.chat.previews import record_latest_messages
+    from apps.chat.unread import record_messages_created
+
+    appointments = {
+        item.id: item
+        for item in Appointment.objects.filter(id__in=appointment_ids, assigned_master=master).select_related("client")
+    }
+    processed: list[int] = []
+    skipped: list[dict] = []
+    for appointment_id in appointment_ids:
+        appointment = appointments.get(appointment_id)
+        if appointment is None:
+            skipped.append({"appointment_id": appointment_id, "reason": "no_access_or_not_found"})
+        elif to_status and appointment.status != from_status:
+            skipped.append({"appointment_id": appointment_id, "reason": skip_reason})
+        else:
+            processed.append(appointment_id)
+    lock_wait_ms = 0.0
+    if to_status and processed:
+        outcome = bulk_compare_and_set_status(processed, from_status, to_status, expected={"assigned_master": master})
+        applied_ids = set(outcome.applied_ids)
+        skipped.extend(
+            {"appointment_id": appointment_id, "reason": skip_reason}
+            for appointment_id in processed
+            if appointment_id not in applied_ids
+        )
+        processed = outcome.applied_ids
+        values = outcome.values
+        lock_wait_ms = outcome.lock_wait_ms
+    if not processed:
+        return processed, skipped
+
+    rows = [appointments[appointment_id] for appointment_id in processed]
+    if to_status:
+        publish_appointment_deltas(processed, values)
+        timestamp_field = FIRST_ENTRY_TIMESTAMPS.get(to_status)
+        for appointment in rows:
+            appointment.status = to_status
+            appointment.updated_at = values["updated_at"]
+            if timestamp_field and getattr(appointment, timestamp_field) is None:
+                setattr(appointment, timestamp_field, values["updated_at"])
+
+        AppointmentEvent.objects.bulk_create(
+            [
+                AppointmentEvent(
+                    appointment=appointment,
+                    actor=master,
+                    event_type=AppointmentEventType.STATUS_CHANGED,
+                    from_status=from_status,
+                    to_status=to_status,
+                    note=note,
+                )
+                for appointment in rows
+            ]
+        )
+
+    messages = []
+    if message_text:
+        messages = Message.objects.bulk_create(
+            [Message(appointment=appointment, sender=master, text=message_text) for appointment in rows]
+        )
+        record_messages_created(messages)
+        record_latest_messages(messages)
+
+    emit_event(
+        "appointment.bulk_status_changed" if to_status else "chat.bulk_message_sent",
+        master,
+        actor=master,
+        payload={
+            "appointment_ids": processed,
+            "from_status": from_status or "",
+            "to_status": to_status or "",
+            "note": note,
+            "messages_sent": len(messages),
+            "lock_wait_ms": lock_wait_ms,
+        },
+    )
+    if to_status == AppointmentStatusChoices.COMPLETED:
+        for appointment in rows:
+            evaluate_completion_sla(appointment, master)
+
+    client_ids = sorted({appointment.client_id for appointment in rows})
+    invalidate_dashboard_summaries(user_ids=[*client_ids, master.id], admin=bool(to_status))
+    submit_after_commit(
+        notify_clients_about_bulk_update,
+        processed,
+        from_status=from_status or "",
+        to_status=to_status or "",
+        note=note,
+        message_text=message_text,
+    )
+    if to_status:
+        submit_after_commit(_refresh_stats_after_bulk_transition, client_ids, master.id)
+    return processed, skipped
@@ -0,0 +1,92 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.accounts.models import User
+from apps.common.media_derivatives import (
+    derivatives_built,
+    derivatives_ready_field,
+    mark_pending_derivatives,
+    schedule_pending_derivatives,
+)
+
+from .archive import restore_archived_appointment
+from .deltas import changed_columns, publish_appointment_delta, publish_appointment_deltas, snapshot_loaded_values
+from .models import Appointment, AppointmentEvent, AppointmentStatusChoices
+from .new_queue import schedule_queue_removal, schedule_queue_sync
+
+
+@receiver(post_save, sender=Appointment)
+def sync_new_queue_on_appointment_save(sender, instance: Appointment, **kwargs):
+    if instance.status == AppointmentStatusChoices.NEW and instance.assigned_master_id is None:
+        schedule_queue_sync([instance.id])
+    else:
+        schedule_queue_removal([instance.id])
+
+
+@receiver(post_save, sender=Appointment)
+def publish_appointment_delta_on_save(sender, instance: Appointment, created: bool, raw: bool = False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if not created:
+        instance.sync_version()
+        columns, stale = changed_columns(instance, update_fields)
+        publish_appointment_delta(instance, columns, stale)
+    snapshot_loaded_values(instance)
+
+
+@receiver(pre_save, sender=Appointment)
+def mark_appointment_media_derivatives(sender, instance: Appointment, **kwargs):
+    mark_pending_derivatives(instance, ("photo_lock_screen", "payment_proof"))
+
+
+@receiver(post_save, sender=Appointment)
+def build_appointment_media_derivatives(sender, instance: Appointment, **kwargs):
+    schedule_pending_derivatives(instance)
+
+
+@receiver(derivatives_built, sender=Appointment)
+def publish_appointment_derivative_urls(sender, object_id: int, field_name: str, **kwargs):
+    # The ready flag was set with update(): bump the version like other update() writers
+    # so open cards swap in the thumbnail/preview URLs.
+    Appointment.objects.filter(pk=object_id).update(version=F("version") + 1)
+    publish_appointment_deltas([object_id], [derivatives_ready_field(field_name), "updated_at"])
+    schedule_queue_sync([object_id])
+
+
+@receiver(post_delete, sender=Appointment)
+def remove_deleted_appointment_from_new_queue(sender, instance: Appointment, **kwargs):
+    schedule_queue_removal([instance.id])
+
+
+@receiver(post_save, sender="chat.Message")
+def refresh_new_queue_card_on_message(sender, instance, created: bool, **kwargs):
+    appointment = instance.appointment
+    if appointment.status == AppointmentStatusChoices.NEW and appointment.assigned_master_id is None:
+        schedule_queue_sync([appointment.id])
+
+
+@receiver(post_save, sender=User)
+def rescore_new_queue_on_wholesale_priority(sender, instance: User, update_fields=None, **kwargs):
+    if update_fields is not None and "wholesale_priority" not in update_fields:
+        return
+    open_ids = list(
+        Appointment.objects.filter(
+            client=instance,
+            status=AppointmentStatusChoices.NEW,
+            assigned_master__isnull=True,
+            is_wholesale_request=True,
+        ).values_list("id", flat=True)
+    )
+    schedule_queue_sync(open_ids)
+
+
+@receiver(pre_save, sender=AppointmentEvent)
+@receiver(pre_save, sender="chat.Message")
+def restore_archived_history_on_write(sender, instance, raw: bool = False, **kwargs):
+    # New history on an archived appointment brings its old history back to the hot tables first.
+    if raw or not instance._state.adding:
+        return
+    appointment = instance.appointment
+    if appointment.archived_at is not None:
+        restore_archived_appointment(appointment)
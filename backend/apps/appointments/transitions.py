@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from django.db import router, transaction
+from django.db.models import F, Value
+from django.db.models.expressions import Combinable
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Appointment, AppointmentStatusChoices
+
+logger = logging.getLogger(__name__)
+
+_S = AppointmentStatusChoices
+
+ALLOWED_STATUS_TRANSITIONS: dict[str, frozenset[str]] = {
+    _S.NEW: frozenset({_S.IN_REVIEW, _S.CANCELLED}),
+    _S.IN_REVIEW: frozenset({_S.AWAITING_PAYMENT, _S.DECLINED_BY_MASTER, _S.CANCELLED}),
+    _S.AWAITING_PAYMENT: frozenset({_S.PAYMENT_PROOF_UPLOADED, _S.DECLINED_BY_MASTER, _S.CANCELLED}),
+    _S.PAYMENT_PROOF_UPLOADED: frozenset({_S.PAID, _S.CANCELLED}),
+    _S.PAID: frozenset({_S.IN_PROGRESS, _S.CANCELLED}),
+    _S.IN_PROGRESS: frozenset({_S.COMPLETED, _S.CANCELLED}),
+    _S.COMPLETED: frozenset(),
+    _S.DECLINED_BY_MASTER: frozenset(),
+    _S.CANCELLED: frozenset(),
+}
+
+# Stamped the first time the status is entered and kept on later re-entries.
+FIRST_ENTRY_TIMESTAMPS = {
+    _S.IN_REVIEW: "taken_at",
+    _S.IN_PROGRESS: "started_at",
+    _S.COMPLETED: "completed_at",
+}
+
+
+@dataclass(frozen=True)
+class TransitionOutcome:
+    from_status: str
+    # Time spent in the UPDATE, including waiting on a row lock held by a concurrent writer.
+    # Reported in the appointment.status_changed payload and averaged into DailyMetrics.
+    lock_wait_ms: float
+
+
+@dataclass(frozen=True)
+class BulkTransitionOutcome:
+    # Requested ids still in from_status when the UPDATE ran, in request order.
+    applied_ids: list[int]
+    lock_wait_ms: float
+    values: dict = field(default_factory=dict)
+
+
+class TransitionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Заявку уже изменили. Обновите её и повторите действие."
+    default_code = "transition_conflict"
+
+
+def is_allowed_transition(from_status: str, to_status: str) -> bool:
+    return to_status in ALLOWED_STATUS_TRANSITIONS.get(from_status, frozenset())
+
+
+def _transition_values(to_status: str, now, changes: dict | None = None) -> dict:
+    values = {"status": to_status, "updated_at": now, **(changes or {})}
+    timestamp_field = FIRST_ENTRY_TIMESTAMPS.get(to_status)
+    if timestamp_field and timestamp_field not in values:
+        values[timestamp_field] = Coalesce(F(timestamp_field), Value(now))
+    return values
+
+
+def _check_transition(from_status: str, to_status: str) -> None:
+    if not is_allowed_transition(from_status, to_status):
+        raise ValidationError({"status": f"Переход {from_status} -> {to_status} недопустим"})
+
+
+def compare_and_set_status(
+    appointment: Appointment,
+    to_status: str,
+    *,
+    changes: dict | None = None,
+    expected: dict | None = None,
+    enforce_table: bool = True,
+) -> TransitionOutcome:
+    """Move ``appointment`` to ``to_status`` with one conditional UPDATE and no row lock.
+
+    The row changes only while it is still in the status this instance was
+    loaded with (plus the ``expected`` lookups); otherwise another writer won
+    and ``TransitionConflict`` is raised.
+    """
+    from_status = appointment.status
+    if enforce_table:
+        _check_transition(from_status, to_status)
+
+    values = _transition_values(to_status, timezone.now(), changes)
+
+    with transaction.atomic():
+        started = time.monotonic()
+        updated = (
+            Appointment.objects.filter(pk=appointment.pk, status=from_status, **(expected or {}))
+            .update(**values, version=F("version") + 1)
+        )
+        lock_wait_ms = round((time.monotonic() - started) * 1000, 2)
+        logger.info(
+            "appointment transition appointment_id=%s from_status=%s to_status=%s outcome=%s lock_wait_ms=%s",
+            appointment.pk,
+            from_status,
+            to_status,
+            "applied" if updated else "conflict",
+            lock_wait_ms,
+        )
+        if not updated:
+            raise TransitionConflict()
+
+        # Django's update() has no RETURNING; our UPDATE holds the row until commit,
+        # so this read sees exactly what it wrote.
+        computed = [name for name, value in values.items() if isinstance(value, Combinable)]
+        written = Appointment._base_manager.filter(pk=appointment.pk).values("version", *computed).get()
+        for name, value in values.items():
+            setattr(appointment, name, written[name] if name in computed else value)
+        appointment.version = written["version"]
+
+        # The same notification save() would send: queue sync, dashboards and deltas listen to it.
+        post_save.send(
+            sender=Appointment,
+            instance=appointment,
+            created=False,
+            update_fields=frozenset([*values, "version"]),
+            raw=False,
+            using=router.db_for_write(Appointment, instance=appointment),
+        )
+    return TransitionOutcome(from_status=from_status, lock_wait_ms=lock_wait_ms)
+
+
+def bulk_compare_and_set_status(
+    appointment_ids: list[int],
+    from_status: str,
+    to_status: str,
+    *,
+    expected: dict | None = None,
+) -> BulkTransitionOutcome:
+    """Move every appointment still in ``from_status`` to ``to_status`` with one conditional UPDATE.
+
+    Same transition table and first-entry timestamps as ``compare_and_set_status``,
+    no row locks. Ids missing from ``applied_ids`` were moved by another writer
+    first. No post_save is sent: callers publish deltas and notifications for the
+    whole batch.
+    """
+    _check_transition(from_status, to_status)
+    if not appointment_ids:
+        return BulkTransitionOutcome(applied_ids=[], lock_wait_ms=0.0)
+
+    now = timezone.now()
+    values = _transition_values(to_status, now)
+    with transaction.atomic():
+        started = time.monotonic()
+        updated = (
+            Appointment.objects.filter(pk__in=appointment_ids, status=from_status, **(expected or {}))
+            .update(**values, version=F("version") + 1)
+        )
+        lock_wait_ms = round((time.monotonic() - started) * 1000, 2)
+        logger.info(
+            "appointment bulk transition from_status=%s to_status=%s requested=%s applied=%s lock_wait_ms=%s",
+            from_status,
+            to_status,
+            len(appointment_ids),
+            updated,
+            lock_wait_ms,
+        )
+        if not updated:
+            return BulkTransitionOutcome(applied_ids=[], lock_wait_ms=lock_wait_ms, values=values)
+        # No RETURNING here either: the rows we wrote carry our status and updated_at
+        # and stay locked by the UPDATE until commit.
+        applied = set(
+            Appointment._base_manager.filter(pk__in=appointment_ids, status=to_status, updated_at=now).values_list(
+                "pk", flat=True
+            )
+        )
+    return BulkTransitionOutcome(
+        applied_ids=[appointment_id for appointment_id in appointment_ids if appointment_id in applied],
+        lock_wait_ms=lock_wait_ms,
+        values=values,
+    )
@@ -20,10 +20,12 @@ from .views import (
     MyAppointmentsView,
     RepeatAppointmentView,
     UploadPaymentProofView,
+    WholesaleBatchCreateView,
 )
 
 urlpatterns = [
     path("appointments/", AppointmentCreateView.as_view(), name="appointments-create"),
+    path("appointments/batch/", WholesaleBatchCreateView.as_view(), name="appointments-batch"),
     path("appointments/my/", MyAppointmentsView.as_view(), name="appointments-my"),
     path("appointments/new/", MasterNewAppointmentsView.as_view(), name="appointments-new"),
     path("appointments/active/", MasterActiveAppointmentsView.as_view(), name="appointments-active"),
@@ -1,7 +1,6 @@
 ﻿from __future__ import annotations
 
 from django.conf import settings
-from django.db.models import OuterRef, Subquery
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import permissions, status
@@ -9,13 +8,18 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.accounts.models import RoleChoices, WholesaleStatusChoices
-from apps.accounts.notifications import notify_masters_about_new_appointment
 from apps.accounts.permissions import IsAdminRole, IsAuthenticatedAndNotBanned
 from apps.accounts.services import recalculate_client_stats
-from apps.appointments.access import get_appointment_for_user
-from apps.chat.models import Message
-from apps.common.api_limits import parse_non_negative_int_param, serialize_bounded_queryset
-from apps.chat.services import notify_client_about_chat_message
+from apps.appointments.access import appointment_access_filter, get_appointment_for_user
+from apps.common.api_limits import (
+    parse_id_list_param,
+    parse_non_negative_int_param,
+    render_bounded_list_response,
+    resolve_list_window,
+    serialize_bounded_queryset,
+)
+from apps.common.conditional import apply_etag, etag_matches, not_modified_response
+from apps.common.projection import PROJECTION_CONTEXT_KEY
 from apps.platform.services import emit_event
 
 from .client_actions import can_client_signal, create_client_signal, repeat_client_appointment
@@ -31,12 +35,23 @@ from .serializers import (
     MasterBulkActionSerializer,
     SetPriceSerializer,
     UploadPaymentProofSerializer,
+    WholesaleBatchCreateSerializer,
+    parse_wholesale_batch_csv,
 )
+from .archive import appointment_events_queryset
+from .dispatch import advance_expired_offers, dispatch_new_appointment
+from .etags import appointment_detail_etag, appointment_events_etag
+from .fast_render import appointment_list_renderer
+from .new_queue import CARD_MEDIA_VARIANTS, order_by_queue_priority, read_queue_page
+from .projection import project_rendered_card, resolve_appointment_projection
 from .services import (
     add_event,
+    available_new_appointments_filter_for_master,
     assert_master_assigned,
+    create_wholesale_batch,
     get_available_new_appointments_queryset_for_master,
     initialize_response_deadline,
+    run_master_bulk_action,
     take_appointment,
     transition_status,
 )
@@ -46,12 +61,54 @@ def _appointment_serializer_context(request, *, include_client_access: bool) ->
     return {
         "request": request,
         "include_client_access": include_client_access,
+        PROJECTION_CONTEXT_KEY: resolve_appointment_projection(request),
     }
 
 
+def _fast_list_renderer(context: dict):
+    return appointment_list_renderer(context) if settings.FAST_LIST_RENDERING else None
+
+
 class AppointmentCreateView(APIView):
     permission_classes = (IsAuthenticatedAndNotBanned,)
 
+    def get(self, request):
+        """Multi-get: ``?ids=3,1,7``. Rows come back in request order; the rest as per-id errors."""
+        ids = parse_id_list_param(
+            request.query_params.get("ids"),
+            field_name="ids",
+            max_items=settings.APPOINTMENT_MULTI_GET_MAX_IDS,
+        )
+        context = _appointment_serializer_context(request, include_client_access=False)
+        # The access check is part of the fetch, so the happy path is one query.
+        queryset = (
+            Appointment.objects.for_listing(request.user, request.user.role, projection=context[PROJECTION_CONTEXT_KEY])
+            .filter(appointment_access_filter(request.user), id__in=ids)
+            .order_by("id")
+        )
+        fast_renderer = _fast_list_renderer(context)
+        if fast_renderer is not None:
+            rows = fast_renderer.render(list(fast_renderer.values(queryset)))
+        else:
+            rows = AppointmentSerializer(queryset, many=True, context=context).data
+        by_id = {row["id"]: row for row in rows}
+
+        errors = []
+        missing = [appointment_id for appointment_id in ids if appointment_id not in by_id]
+        if missing:
+            existing = set(Appointment.objects.filter(id__in=missing).values_list("id", flat=True))
+            for appointment_id in missing:
+                if appointment_id in existing:
+                    errors.append({"id": appointment_id, "code": "forbidden", "detail": "Нет доступа к заявке"})
+                else:
+                    errors.append({"id": appointment_id, "code": "not_found", "detail": "Заявка не найдена"})
+        return Response(
+            {
+                "results": [by_id[appointment_id] for appointment_id in ids if appointment_id in by_id],
+                "errors": errors,
+            }
+        )
+
     def post(self, request):
         if request.user.role != RoleChoices.CLIENT:
             return Response({"detail": "Только клиент может создавать заявки"}, status=status.HTTP_403_FORBIDDEN)
@@ -73,7 +130,7 @@ class AppointmentCreateView(APIView):
             actor=request.user,
             payload={"status": appointment.status},
         )
-        notify_masters_about_new_appointment(appointment)
+        dispatch_new_appointment(appointment)
         return Response(
             AppointmentSerializer(
                 appointment,
@@ -83,6 +140,37 @@ class AppointmentCreateView(APIView):
         )
 
 
+class WholesaleBatchCreateView(APIView):
+    permission_classes = (IsAuthenticatedAndNotBanned,)
+
+    def post(self, request):
+        user = request.user
+        if user.role != RoleChoices.CLIENT or user.is_banned:
+            return Response({"detail": "Только клиент может создавать заявки"}, status=status.HTTP_403_FORBIDDEN)
+        if not (user.is_service_center and user.wholesale_status == WholesaleStatusChoices.APPROVED):
+            return Response(
+                {"detail": "Пакетная подача доступна только подтверждённым сервисным центрам"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        upload = request.FILES.get("file")
+        payload = {"items": parse_wholesale_batch_csv(upload)} if upload is not None else request.data
+        serializer = WholesaleBatchCreateSerializer(data=payload, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        appointments = create_wholesale_batch(user, serializer.validated_data["items"])
+        context = {
+            **_appointment_serializer_context(request, include_client_access=True),
+            "unread_counts": {appointment.id: 0 for appointment in appointments},
+        }
+        return Response(
+            {
+                "created_count": len(appointments),
+                "appointments": AppointmentSerializer(appointments, many=True, context=context).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class MyAppointmentsView(APIView):
     permission_classes = (IsAuthenticatedAndNotBanned,)
 
@@ -90,14 +178,20 @@ class MyAppointmentsView(APIView):
         if request.user.role != RoleChoices.CLIENT:
             return Response({"detail": "Только для клиентов"}, status=status.HTTP_403_FORBIDDEN)
 
-        queryset = Appointment.objects.filter(client=request.user).select_related("assigned_master", "client")
+        context = _appointment_serializer_context(request, include_client_access=False)
+        queryset = Appointment.objects.for_listing(
+            request.user,
+            RoleChoices.CLIENT,
+            projection=context[PROJECTION_CONTEXT_KEY],
+        ).filter(client=request.user)
         return serialize_bounded_queryset(
             request,
             queryset,
             AppointmentSerializer,
-            serializer_context=_appointment_serializer_context(request, include_client_access=False),
+            serializer_context=context,
             default_limit=settings.DEFAULT_API_LIST_LIMIT,
             max_limit=settings.MAX_API_LIST_LIMIT,
+            fast_renderer=_fast_list_renderer(context),
         )
 
 
@@ -105,12 +199,15 @@ class AppointmentDetailView(APIView):
     permission_classes = (IsAuthenticatedAndNotBanned,)
 
     def get(self, request, appointment_id: int):
+        etag = appointment_detail_etag(request, appointment_id)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
         appointment = get_appointment_for_user(request.user, appointment_id)
         data = AppointmentSerializer(
             appointment,
             context=_appointment_serializer_context(request, include_client_access=True),
         ).data
-        return Response(data)
+        return apply_etag(Response(data), etag)
 
 
 class ClientAccessUpdateView(APIView):
@@ -162,20 +259,24 @@ class AppointmentEventsView(APIView):
     permission_classes = (IsAuthenticatedAndNotBanned,)
 
     def get(self, request, appointment_id: int):
+        etag = appointment_events_etag(request, appointment_id)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
         appointment = get_appointment_for_user(request.user, appointment_id)
         after_id = parse_non_negative_int_param(request.query_params.get("after_id"), field_name="after_id", default=0)
 
-        queryset = appointment.events.select_related("actor").all()
+        queryset = appointment_events_queryset(appointment).select_related("actor")
         if after_id > 0:
             queryset = queryset.filter(id__gt=after_id)
         queryset = queryset.order_by("-id")
-        return serialize_bounded_queryset(
+        response = serialize_bounded_queryset(
             request,
             queryset,
             AppointmentEventSerializer,
             default_limit=settings.APPOINTMENT_EVENTS_LIST_LIMIT,
             max_limit=settings.APPOINTMENT_EVENTS_MAX_LIST_LIMIT,
         )
+        return apply_etag(response, etag)
 
 
 class UploadPaymentProofView(APIView):
@@ -328,14 +429,43 @@ class MasterNewAppointmentsView(APIView):
         if request.user.role != RoleChoices.MASTER:
             return Response({"detail": "Только для мастеров"}, status=status.HTTP_403_FORBIDDEN)
 
-        queryset = get_available_new_appointments_queryset_for_master(request.user).select_related("client")
+        # Masters poll this endpoint, so it doubles as the throttled lease sweeper.
+        advance_expired_offers()
+        window = resolve_list_window(
+            request,
+            default_limit=settings.DEFAULT_API_LIST_LIMIT,
+            max_limit=settings.MAX_API_LIST_LIMIT,
+        )
+        context = _appointment_serializer_context(request, include_client_access=False)
+        projection = context[PROJECTION_CONTEXT_KEY]
+        if not window.cursor_mode and available_new_appointments_filter_for_master(request.user) is not None:
+            page = read_queue_page(
+                request.user,
+                offset=window.offset,
+                limit=window.limit,
+                request=request,
+                sign_media=projection is None or not projection.isdisjoint(CARD_MEDIA_VARIANTS),
+            )
+            if page is not None:
+                cards, total = page
+                cards = [project_rendered_card(card, projection) for card in cards]
+                return render_bounded_list_response(cards, window=window, total=total)
+
+        queryset = order_by_queue_priority(
+            get_available_new_appointments_queryset_for_master(request.user).for_listing(
+                request.user,
+                RoleChoices.MASTER,
+                projection=projection,
+            )
+        )
         return serialize_bounded_queryset(
             request,
             queryset,
             AppointmentSerializer,
-            serializer_context=_appointment_serializer_context(request, include_client_access=False),
+            serializer_context=context,
             default_limit=settings.DEFAULT_API_LIST_LIMIT,
             max_limit=settings.MAX_API_LIST_LIMIT,
+            fast_renderer=_fast_list_renderer(context),
         )
 
 
@@ -353,27 +483,20 @@ class MasterActiveAppointmentsView(APIView):
             AppointmentStatusChoices.PAID,
             AppointmentStatusChoices.IN_PROGRESS,
         )
-        latest_message_qs = Message.objects.filter(
-            appointment_id=OuterRef("pk"),
-            is_deleted=False,
-        ).order_by("-id")
-        queryset = (
-            Appointment.objects.filter(assigned_master=request.user, status__in=active_statuses)
-            .select_related("client", "assigned_master")
-            .annotate(
-                latest_message_text=Subquery(latest_message_qs.values("text")[:1]),
-                latest_message_created_at=Subquery(latest_message_qs.values("created_at")[:1]),
-                latest_message_sender_username=Subquery(latest_message_qs.values("sender__username")[:1]),
-                latest_message_sender_role=Subquery(latest_message_qs.values("sender__role")[:1]),
-            )
-        )
+        context = _appointment_serializer_context(request, include_client_access=False)
+        queryset = Appointment.objects.for_listing(
+            request.user,
+            RoleChoices.MASTER,
+            projection=context[PROJECTION_CONTEXT_KEY],
+        ).filter(assigned_master=request.user, status__in=active_statuses)
         return serialize_bounded_queryset(
             request,
             queryset,
             AppointmentSerializer,
-            serializer_context=_appointment_serializer_context(request, include_client_access=False),
+            serializer_context=context,
             default_limit=settings.DEFAULT_API_LIST_LIMIT,
             max_limit=settings.MAX_API_LIST_LIMIT,
+            fast_renderer=_fast_list_renderer(context),
         )
 
 
@@ -392,47 +515,28 @@ class MasterBulkActionView(APIView):
         action = data["action"]
         message_text = (data.get("message_text") or "").strip()
 
-        appointments = {
-            item.id: item
-            for item in Appointment.objects.filter(id__in=ids, assigned_master=request.user).select_related("client", "assigned_master")
-        }
+        transition = {}
+        if action == MasterBulkActionSerializer.ACTION_START_WORK:
+            transition = {
+                "from_status": AppointmentStatusChoices.PAID,
+                "to_status": AppointmentStatusChoices.IN_PROGRESS,
+                "skip_reason": "status_must_be_paid",
+                "note": "Bulk action: start work",
+            }
+        elif action == MasterBulkActionSerializer.ACTION_COMPLETE_WORK:
+            transition = {
+                "from_status": AppointmentStatusChoices.IN_PROGRESS,
+                "to_status": AppointmentStatusChoices.COMPLETED,
+                "skip_reason": "status_must_be_in_progress",
+                "note": "Bulk action: complete work",
+            }
 
-        processed = []
-        skipped = []
-
-        for appointment_id in ids:
-            appointment = appointments.get(appointment_id)
-            if not appointment:
-                skipped.append({"appointment_id": appointment_id, "reason": "no_access_or_not_found"})
-                continue
-
-            if action == MasterBulkActionSerializer.ACTION_START_WORK:
-                if appointment.status != AppointmentStatusChoices.PAID:
-                    skipped.append({"appointment_id": appointment_id, "reason": "status_must_be_paid"})
-                    continue
-                transition_status(appointment, request.user, AppointmentStatusChoices.IN_PROGRESS, note="Bulk action: start work")
-            elif action == MasterBulkActionSerializer.ACTION_COMPLETE_WORK:
-                if appointment.status != AppointmentStatusChoices.IN_PROGRESS:
-                    skipped.append({"appointment_id": appointment_id, "reason": "status_must_be_in_progress"})
-                    continue
-                transition_status(appointment, request.user, AppointmentStatusChoices.COMPLETED, note="Bulk action: complete work")
-                recalculate_client_stats(appointment.client)
-
-            if message_text:
-                message = Message.objects.create(
-                    appointment=appointment,
-                    sender=request.user,
-                    text=message_text,
-                )
-                emit_event(
-                    "chat.message_sent",
-                    message,
-                    actor=request.user,
-                    payload={"appointment_id": appointment.id, "bulk": True},
-                )
-                notify_client_about_chat_message(message)
-
-            processed.append(appointment_id)
+        processed, skipped = run_master_bulk_action(
+            master=request.user,
+            appointment_ids=ids,
+            message_text=message_text,
+            **transition,
+        )
 
         return Response(
             {
@@ -547,10 +651,12 @@ class ConfirmPaymentMixin:
         if appointment.status != AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED:
             return Response({"detail": "Подтвердить оплату можно только из PAYMENT_PROOF_UPLOADED"}, status=status.HTTP_400_BAD_REQUEST)
 
-        appointment.payment_confirmed_by = request.user
-        appointment.payment_confirmed_at = timezone.now()
-        appointment.save(update_fields=["payment_confirmed_by", "payment_confirmed_at", "updated_at"])
-        transition_status(appointment, request.user, AppointmentStatusChoices.PAID)
+        transition_status(
+            appointment,
+            request.user,
+            AppointmentStatusChoices.PAID,
+            changes={"payment_confirmed_by": request.user, "payment_confirmed_at": timezone.now()},
+        )
         add_event(appointment, request.user, AppointmentEventType.PAYMENT_CONFIRMED)
         emit_event(
             "appointment.payment_confirmed",
@@ -635,7 +741,14 @@ class AdminManualStatusView(APIView):
         serializer.is_valid(raise_exception=True)
 
         to_status = serializer.validated_data["status"]
-        transition_status(appointment, request.user, to_status, serializer.validated_data.get("note", ""))
+        # Admins may override the transition table, but still lose to a concurrent writer.
+        transition_status(
+            appointment,
+            request.user,
+            to_status,
+            serializer.validated_data.get("note", ""),
+            enforce_table=False,
+        )
         recalculate_client_stats(appointment.client)
         return Response(
             AppointmentSerializer(
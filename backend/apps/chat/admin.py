@@ -1,6 +1,6 @@
 ﻿from django.contrib import admin
 
-from .models import MasterQuickReply, Message, ReadState
+from .models import MasterQuickReply, Message, ModerationTerm, ReadState
 
 
 @admin.register(Message)
@@ -25,3 +25,11 @@ class MasterQuickReplyAdmin(admin.ModelAdmin):
     def has_media(self, obj):
         return bool(obj.media_file)
     has_media.boolean = True
+
+
+@admin.register(ModerationTerm)
+class ModerationTermAdmin(admin.ModelAdmin):
+    list_display = ("term", "category", "is_active", "updated_at")
+    list_filter = ("category", "is_active")
+    list_editable = ("is_active",)
+    search_fields = ("term",)
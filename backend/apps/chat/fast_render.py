@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from apps.common.fast_render import CompiledRenderer, FastListRenderer, RenderContext, field_file, iso_datetime, plain
+from apps.common.media_derivatives import PREVIEW_SIZE, THUMBNAIL_SIZE
+from apps.common.secure_media import MEDIA_SCOPE_MESSAGE, build_media_access_url
+
+from .models import Message
+
+
+def _file_url(variant: int | None):
+    def render(row: dict, ctx: RenderContext):
+        name = row["file"]
+        if row["is_deleted"] or not name:
+            return None
+        return build_media_access_url(
+            file_field=field_file(Message, "file", name),
+            scope=MEDIA_SCOPE_MESSAGE,
+            object_id=row["id"],
+            field_name="file",
+            request=ctx.request,
+            variant=variant,
+            derivatives_ready=row["file_derivatives_ready"],
+        )
+
+    return render
+
+
+@lru_cache(maxsize=1)
+def compile_message_renderer() -> CompiledRenderer:
+    # Mirrors MessageSerializer, including its blanking of deleted messages.
+    # Works for both Message and ArchivedMessage rows.
+    return CompiledRenderer(
+        (
+            "id",
+            "appointment",
+            "sender",
+            "sender__username",
+            "sender__role",
+            "text",
+            "file",
+            "file_derivatives_ready",
+            "is_deleted",
+            "deleted_at",
+            "created_at",
+        ),
+        [
+            ("id", plain("id")),
+            ("appointment", plain("appointment")),
+            ("sender", plain("sender")),
+            ("sender_username", plain("sender__username")),
+            ("sender_role", plain("sender__role")),
+            ("text", lambda row, ctx: None if row["is_deleted"] else row["text"]),
+            ("file_url", _file_url(None)),
+            ("file_thumb_url", _file_url(THUMBNAIL_SIZE)),
+            ("file_preview_url", _file_url(PREVIEW_SIZE)),
+            ("is_deleted", plain("is_deleted")),
+            ("deleted_at", iso_datetime("deleted_at")),
+            ("created_at", iso_datetime("created_at")),
+        ],
+    )
+
+
+def message_list_renderer(serializer_context: dict) -> FastListRenderer:
+    """Fast path equivalent of ``MessageSerializer(many=True)`` for chat pages."""
+    return FastListRenderer(compile_message_renderer(), RenderContext.from_serializer_context(serializer_context))
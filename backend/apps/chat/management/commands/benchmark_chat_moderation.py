@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.chat.models import Message, ModerationTermCategory
+from apps.chat.moderation_lexicon import LexiconMatcher, fold_text, load_lexicon_terms
+from apps.chat.text_moderation import spam_score
+
+_SAMPLE_MESSAGES = (
+    "Здравствуйте, телефон после сброса просит гугл аккаунт, что делать?",
+    "Samsung A52, Android 13, ПК есть, RuDesktop установлен",
+    "Оплатил, скинул чек. Когда начнёте?",
+    "Спасибо большое, всё заработало!",
+    "Подскажите, сколько по времени займёт разблокировка?",
+)
+_WORD_RE = re.compile(r"[a-zA-Zа-яА-ЯёЁ0-9_]+")
+_ALPHABET = "абвгдежзийклмнопрстуфхцчшщэюя"
+
+
+def _rate(messages: int, elapsed: float) -> float:
+    return round(messages / elapsed, 1) if elapsed else float(messages)
+
+
+def _linear_scan(text: str, stems: tuple[str, ...]) -> bool:
+    """The previous per-word ``startswith`` loop over every stem, for comparison."""
+    words = _WORD_RE.findall(text.lower())
+    return any(any(word.startswith(stem) for stem in stems) for word in words)
+
+
+class Command(BaseCommand):
+    help = "Измеряет скорость модерации клиентских сообщений (сообщений в секунду) на текущем словаре (только чтение)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000, help="Сколько сообщений проверить за раунд.")
+        parser.add_argument("--rounds", type=int, default=3, help="Сколько раундов прогнать.")
+        parser.add_argument(
+            "--extra-terms",
+            type=int,
+            default=5000,
+            help="Сколько синтетических слов добавить к словарю в памяти.",
+        )
+
+    def handle(self, *args, **options):
+        count, rounds, extra = options["messages"], options["rounds"], options["extra_terms"]
+        if count < 1 or rounds < 1 or extra < 0:
+            raise CommandError("--messages и --rounds должны быть больше нуля, --extra-terms не меньше нуля")
+
+        texts = list(Message.objects.exclude(text="").order_by("-id").values_list("text", flat=True)[:count])
+        texts = texts or list(_SAMPLE_MESSAGES)
+        texts = [texts[index % len(texts)] for index in range(count)]
+
+        terms = load_lexicon_terms()
+        generator = random.Random(42)
+        for _ in range(extra):
+            term = "".join(generator.choice(_ALPHABET) for _ in range(generator.randint(4, 9)))
+            terms.append((term, ModerationTermCategory.PROFANITY))
+        matcher = LexiconMatcher(terms)
+        stems = tuple(fold_text(term) for term, _ in terms)
+
+        def compiled():
+            for text in texts:
+                folded = fold_text(text)
+                spam_score(text, folded, matcher.matches(folded))
+
+        def linear():
+            for text in texts:
+                _linear_scan(text, stems)
+
+        results = {}
+        for name, run in (("linear", linear), ("compiled", compiled)):
+            started = time.monotonic()
+            for _ in range(rounds):
+                run()
+            results[name] = _rate(count * rounds, time.monotonic() - started)
+
+        speedup = round(results["compiled"] / results["linear"], 1) if results["linear"] else 0.0
+        self.stdout.write(
+            f"lexicon: {matcher.size} terms, {count} messages/round, linear {results['linear']} msg/s, "
+            f"compiled {results['compiled']} msg/s ({speedup}x)"
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:15
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_counters(apps, schema_editor):
+    Message = apps.get_model("chat", "Message")
+    ReadState = apps.get_model("chat", "ReadState")
+    db_alias = schema_editor.connection.alias
+
+    unread = (
+        Message.objects.using(db_alias)
+        .filter(
+            appointment_id=OuterRef("appointment_id"),
+            id__gt=OuterRef("last_read_message_id"),
+            is_deleted=False,
+        )
+        .exclude(sender_id=OuterRef("user_id"))
+        .order_by()
+        .values("appointment_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    last_message = (
+        Message.objects.using(db_alias)
+        .filter(appointment_id=OuterRef("appointment_id"))
+        .order_by()
+        .values("appointment_id")
+        .annotate(last_id=Max("id"))
+        .values("last_id")
+    )
+    ReadState.objects.using(db_alias).update(
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0)),
+        last_message_id=Coalesce(Subquery(last_message, output_field=IntegerField()), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_masterquickreply_media_file_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readstate',
+            name='last_message_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='readstate',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_counters, migrations.RunPython.noop),
+    ]
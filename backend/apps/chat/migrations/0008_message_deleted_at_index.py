@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0013_appointment_version'),
+        ('chat', '0007_archivedmessage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['deleted_at'], name='chat_msg_deleted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0013_appointment_version'),
+        ('chat', '0008_message_deleted_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedmessage',
+            index=models.Index(fields=['appointment', 'id'], name='chat_archmsg_appt_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['appointment', 'id'], name='chat_msg_appt_id_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:37
+
+from django.db import migrations, models
+
+# Stems that used to be hard-coded in apps.chat.text_moderation.
+PROFANITY_STEMS = ("хуй", "пизд", "бляд", "блят", "еба", "ебан", "пидор", "гандон")
+SPAM_PHRASES = ("казино", "ставки на спорт", "заработок без вложений", "пассивный доход", "раскрутка канала")
+
+
+def seed_lexicon(apps, schema_editor):
+    ModerationTerm = apps.get_model("chat", "ModerationTerm")
+    ModerationTerm.objects.bulk_create(
+        [ModerationTerm(term=term, category="profanity") for term in PROFANITY_STEMS]
+        + [ModerationTerm(term=term, category="spam") for term in SPAM_PHRASES],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0009_message_appointment_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('term', models.CharField(max_length=120, unique=True)),
+                ('category', models.CharField(choices=[('profanity', 'Недопустимая лексика'), ('spam', 'Спам')], default='profanity', max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ('category', 'term'),
+            },
+        ),
+        migrations.RunPython(seed_lexicon, migrations.RunPython.noop),
+    ]
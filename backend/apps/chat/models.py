@@ -32,6 +32,8 @@ class Message(TimeStampedModel):
     )
     text = models.TextField(blank=True)
     file = models.FileField(upload_to="chat_files/", null=True, blank=True, validators=[validate_chat_file])
+    # Set once the WebP thumbnail/preview of file are stored (apps.common.media_derivatives).
+    file_derivatives_ready = models.BooleanField(default=False)
 
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
@@ -45,6 +47,46 @@ class Message(TimeStampedModel):
 
     class Meta:
         ordering = ("id",)
+        indexes = [
+            # Cross-appointment sync picks up deletions of already-seen messages by time.
+            models.Index(fields=["deleted_at"], name="chat_msg_deleted_at_idx"),
+            # Latest-first chat pages: newest N of one appointment, then backwards by id.
+            models.Index(fields=["appointment", "id"], name="chat_msg_appt_id_idx"),
+        ]
+
+
+class ArchivedMessage(models.Model):
+    """Cold copy of a ``Message`` of an archived appointment; ids are preserved."""
+
+    id = models.BigIntegerField(primary_key=True)
+    appointment = models.ForeignKey(
+        "appointments.Appointment",
+        on_delete=models.CASCADE,
+        related_name="archived_messages",
+    )
+    sender = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    text = models.TextField(blank=True)
+    file = models.FileField(upload_to="chat_files/", null=True, blank=True)
+    file_derivatives_ready = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    deleted_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [models.Index(fields=["appointment", "id"], name="chat_archmsg_appt_id_idx")]
 
 
 class ReadState(TimeStampedModel):
@@ -59,6 +101,10 @@ class ReadState(TimeStampedModel):
         related_name="read_states",
     )
     last_read_message_id = models.BigIntegerField(default=0)
+    # Materialized counters maintained by apps.chat.unread on message create/delete
+    # and on read pointer moves, so badges never have to scan chat_message.
+    unread_count = models.PositiveIntegerField(default=0)
+    last_message_id = models.BigIntegerField(default=0)
 
     class Meta:
         unique_together = ("appointment", "user")
@@ -89,3 +135,26 @@ class MasterQuickReply(TimeStampedModel):
 
     def __str__(self) -> str:
         return f"/{self.command}"
+
+
+class ModerationTermCategory(models.TextChoices):
+    PROFANITY = "profanity", "Недопустимая лексика"
+    SPAM = "spam", "Спам"
+
+
+class ModerationTerm(TimeStampedModel):
+    """Lexicon entry for client chat moderation; matched as a word prefix after homoglyph folding."""
+
+    term = models.CharField(max_length=120, unique=True)
+    category = models.CharField(
+        max_length=20,
+        choices=ModerationTermCategory.choices,
+        default=ModerationTermCategory.PROFANITY,
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ("category", "term")
+
+    def __str__(self) -> str:
+        return self.term
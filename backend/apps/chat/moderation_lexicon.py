@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Bumped whenever an admin edits the lexicon; every process recompiles its matcher
+# after at most CHAT_MODERATION_LEXICON_RECHECK_SECONDS.
+_LEXICON_VERSION_KEY = "chat:moderation:lexicon_version"
+
+# Latin and Greek letters that look like Cyrillic ones, plus the usual digit and
+# symbol substitutions. Applied after NFKC + lower() to tokens that contain a letter.
+_LOOKALIKES = str.maketrans(
+    {
+        "a": "а",
+        "b": "в",
+        "c": "с",
+        "e": "е",
+        "h": "н",
+        "k": "к",
+        "m": "м",
+        "n": "п",
+        "o": "о",
+        "p": "р",
+        "t": "т",
+        "u": "и",
+        "x": "х",
+        "y": "у",
+        "α": "а",
+        "ε": "е",
+        "κ": "к",
+        "ο": "о",
+        "ρ": "р",
+        "τ": "т",
+        "υ": "у",
+        "χ": "х",
+        "ё": "е",
+        "0": "о",
+        "3": "з",
+        "4": "ч",
+        "6": "б",
+        "@": "а",
+    }
+)
+_TOKEN_RE = re.compile(r"[\w@]+")
+_REPEAT_RE = re.compile(r"(.)\1+")
+# Combining marks and invisible format characters (zero-width space/joiner, soft hyphen).
+_INVISIBLE_CATEGORIES = frozenset({"Mn", "Me", "Cf"})
+
+_TERMINAL = ""
+
+
+def fold_text(text: str) -> str:
+    """Canonical form both the lexicon and incoming messages are matched in.
+
+    Lowercases, strips invisible characters, maps lookalikes onto Cyrillic,
+    collapses letter runs ("хууууй" -> "хуй") and joins words with single spaces.
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = "".join(ch for ch in text if unicodedata.category(ch) not in _INVISIBLE_CATEGORIES)
+    words = []
+    for token in _TOKEN_RE.findall(text):
+        if any(ch.isalpha() for ch in token):
+            token = token.translate(_LOOKALIKES)
+        words.append(_REPEAT_RE.sub(r"\1", token))
+    return " ".join(words)
+
+
+class LexiconMatcher:
+    """Prefix trie over folded lexicon terms, matched at every word start.
+
+    Cost depends on the message length and the longest term, not on how many
+    terms the lexicon holds. Terms may span several words ("ставки на спорт").
+    """
+
+    def __init__(self, terms: Iterable[tuple[str, str]]):
+        self._root: dict = {}
+        self.size = 0
+        for term, category in terms:
+            folded = fold_text(term)
+            if not folded:
+                continue
+            node = self._root
+            for ch in folded:
+                node = node.setdefault(ch, {})
+            node.setdefault(_TERMINAL, category)
+            self.size += 1
+
+    def matches(self, folded: str) -> list[tuple[str, str]]:
+        """``(category, matched_text)`` for every word start that begins with a lexicon term."""
+        found = []
+        root = self._root
+        length = len(folded)
+        start = 0
+        while start < length:
+            node = root
+            position = start
+            while position < length:
+                node = node.get(folded[position])
+                if node is None:
+                    break
+                position += 1
+                if _TERMINAL in node:
+                    found.append((node[_TERMINAL], folded[start:position]))
+                    break
+            next_space = folded.find(" ", start)
+            if next_space < 0:
+                break
+            start = next_space + 1
+        return found
+
+
+class _CompiledLexicon:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.matcher: LexiconMatcher | None = None
+        self.version: str | None = None
+        self.checked_at = 0.0
+
+
+_compiled = _CompiledLexicon()
+
+
+def _lexicon_version() -> str:
+    value = cache.get(_LEXICON_VERSION_KEY)
+    if value is None:
+        value = str(time.time_ns())
+        cache.set(_LEXICON_VERSION_KEY, value, timeout=None)
+    return str(value)
+
+
+def invalidate_lexicon() -> None:
+    cache.set(_LEXICON_VERSION_KEY, str(time.time_ns()), timeout=None)
+    with _compiled.lock:
+        _compiled.matcher = None
+
+
+def load_lexicon_terms() -> list[tuple[str, str]]:
+    from .models import ModerationTerm
+
+    return list(ModerationTerm.objects.filter(is_active=True).values_list("term", "category"))
+
+
+def get_lexicon_matcher() -> LexiconMatcher:
+    """Process-wide compiled matcher, rebuilt only when the lexicon version changes."""
+    now = time.monotonic()
+    matcher = _compiled.matcher
+    if matcher is not None and now - _compiled.checked_at < settings.CHAT_MODERATION_LEXICON_RECHECK_SECONDS:
+        return matcher
+    version = _lexicon_version()
+    with _compiled.lock:
+        if _compiled.matcher is None or _compiled.version != version:
+            _compiled.matcher = LexiconMatcher(load_lexicon_terms())
+            _compiled.version = version
+        _compiled.checked_at = now
+        return _compiled.matcher
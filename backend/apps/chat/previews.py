@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from django.db.models import BigIntegerField, Case, CharField, DateTimeField, F, Q, Value, When
+
+from apps.appointments.deltas import publish_appointment_deltas
+from apps.appointments.models import Appointment
+
+from .models import Message
+
+PREVIEW_MAX_LENGTH = 255
+FILE_PREVIEW = "Файл"
+
+_PREVIEW_OUTPUT_FIELDS = {
+    "last_message_id": BigIntegerField(),
+    "last_message_preview": CharField(),
+    "last_message_at": DateTimeField(),
+    "last_message_sender_username": CharField(),
+    "last_message_sender_role": CharField(),
+}
+
+
+def message_preview(message: Message) -> str:
+    text = (message.text or "").strip()
+    if text:
+        return text[:PREVIEW_MAX_LENGTH]
+    return FILE_PREVIEW if message.file else ""
+
+
+def _preview_fields(message: Message | None) -> dict:
+    if message is None:
+        return {
+            "last_message_id": None,
+            "last_message_preview": "",
+            "last_message_at": None,
+            "last_message_sender_username": "",
+            "last_message_sender_role": "",
+        }
+    return {
+        "last_message_id": message.id,
+        "last_message_preview": message_preview(message),
+        "last_message_at": message.created_at,
+        "last_message_sender_username": message.sender.username,
+        "last_message_sender_role": message.sender.role or "",
+    }
+
+
+def record_latest_messages(messages) -> None:
+    """Move each appointment's preview forward to the newest of ``messages``.
+
+    The id guard keeps a late writer from overwriting a newer preview, so
+    concurrent senders need no row lock.
+    """
+    latest: dict[int, Message] = {}
+    for message in messages:
+        if not message.id or message.is_deleted:
+            continue
+        current = latest.get(message.appointment_id)
+        if current is None or message.id > current.id:
+            latest[message.appointment_id] = message
+    if not latest:
+        return
+    if len(latest) == 1:
+        [(appointment_id, message)] = latest.items()
+        updated = Appointment.objects.filter(id=appointment_id).filter(
+            Q(last_message_id__isnull=True) | Q(last_message_id__lt=message.id)
+        ).update(**_preview_fields(message), version=F("version") + 1)
+        if updated:
+            publish_appointment_deltas([appointment_id], _PREVIEW_OUTPUT_FIELDS)
+        return
+
+    # Batch writers (bulk actions) get a single UPDATE with per-row CASE values.
+    guard = Q()
+    fields_by_appointment = {}
+    for appointment_id, message in latest.items():
+        guard |= Q(id=appointment_id) & (Q(last_message_id__isnull=True) | Q(last_message_id__lt=message.id))
+        fields_by_appointment[appointment_id] = _preview_fields(message)
+    changes = {
+        field: Case(
+            *[When(id=appointment_id, then=Value(values[field])) for appointment_id, values in fields_by_appointment.items()],
+            output_field=output_field,
+        )
+        for field, output_field in _PREVIEW_OUTPUT_FIELDS.items()
+    }
+    Appointment.objects.filter(guard).update(**changes, version=F("version") + 1)
+    publish_appointment_deltas(latest, _PREVIEW_OUTPUT_FIELDS)
+
+
+def refresh_latest_message(appointment_id: int) -> None:
+    latest = (
+        Message.objects.filter(appointment_id=appointment_id, is_deleted=False)
+        .select_related("sender")
+        .order_by("-id")
+        .first()
+    )
+    Appointment.objects.filter(id=appointment_id).update(**_preview_fields(latest), version=F("version") + 1)
+    publish_appointment_deltas([appointment_id], _PREVIEW_OUTPUT_FIELDS)
+
+
+def record_message_hidden(message: Message) -> None:
+    # Only the current preview needs recomputing; older deletions are invisible in lists.
+    if Appointment.objects.filter(id=message.appointment_id, last_message_id=message.id).exists():
+        refresh_latest_message(message.appointment_id)
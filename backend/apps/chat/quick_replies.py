@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import MasterQuickReply
+
+# Per-master version tokens: a write bumps the token, so both the shared map and
+# every process-local copy of it become unreachable at once.
+_VERSION_KEY = "chat:quick_replies:version:{user_id}"
+_MAP_KEY = "chat:quick_replies:map:{user_id}:{version}"
+
+
+@dataclass(frozen=True)
+class QuickReplyEntry:
+    id: int
+    command: str
+    title: str
+    text: str
+    # Storage name of the attached media; message file fields accept it as is.
+    media_file: str
+
+
+@dataclass(frozen=True)
+class QuickReplyCommandMap:
+    by_command: dict[str, QuickReplyEntry]
+    # Sorted commands for prefix autocompletion.
+    commands: tuple[str, ...]
+
+    def get(self, command: str) -> QuickReplyEntry | None:
+        return self.by_command.get(command)
+
+    def complete(self, prefix: str, *, limit: int) -> list[QuickReplyEntry]:
+        start = bisect_left(self.commands, prefix)
+        matches = []
+        for command in self.commands[start:]:
+            if not command.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(self.by_command[command])
+        return matches
+
+
+class _LocalMaps:
+    """Small process-local LRU of ``user_id -> (version, map)``."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[int, tuple[str, QuickReplyCommandMap]] = OrderedDict()
+
+    def get(self, user_id: int, version: str) -> QuickReplyCommandMap | None:
+        with self.lock:
+            cached = self.entries.get(user_id)
+            if cached is None or cached[0] != version:
+                return None
+            self.entries.move_to_end(user_id)
+            return cached[1]
+
+    def put(self, user_id: int, version: str, command_map: QuickReplyCommandMap) -> None:
+        with self.lock:
+            self.entries[user_id] = (version, command_map)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > max(settings.QUICK_REPLY_LOCAL_CACHE_SIZE, 0):
+                self.entries.popitem(last=False)
+
+    def drop(self, user_id: int) -> None:
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+_local_maps = _LocalMaps()
+
+
+def _version(user_id: int) -> str:
+    key = _VERSION_KEY.format(user_id=user_id)
+    value = cache.get(key)
+    if value is None:
+        value = str(time.time_ns())
+        cache.set(key, value, timeout=None)
+    return str(value)
+
+
+def invalidate_quick_replies(user_id: int) -> None:
+    cache.set(_VERSION_KEY.format(user_id=user_id), str(time.time_ns()), timeout=None)
+    _local_maps.drop(user_id)
+
+
+def _build_command_map(user_id: int) -> QuickReplyCommandMap:
+    rows = MasterQuickReply.objects.filter(user_id=user_id).values_list("id", "command", "title", "text", "media_file")
+    by_command = {
+        command: QuickReplyEntry(id=reply_id, command=command, title=title, text=text, media_file=media_file or "")
+        for reply_id, command, title, text, media_file in rows
+    }
+    return QuickReplyCommandMap(by_command=by_command, commands=tuple(sorted(by_command)))
+
+
+def get_quick_reply_map(user_id: int) -> QuickReplyCommandMap:
+    """The master's command map: one cache read for the version, then the local LRU,
+    then the shared cache, and only on a miss there a database query."""
+    version = _version(user_id)
+    command_map = _local_maps.get(user_id, version)
+    if command_map is not None:
+        return command_map
+
+    map_key = _MAP_KEY.format(user_id=user_id, version=version)
+    command_map = cache.get(map_key)
+    if command_map is None:
+        command_map = _build_command_map(user_id)
+        cache.set(map_key, command_map, timeout=settings.QUICK_REPLY_CACHE_SECONDS)
+    _local_maps.put(user_id, version, command_map)
+    return command_map
@@ -1,19 +1,52 @@
 ﻿from __future__ import annotations
 
 from django.conf import settings
+from django.db.models.manager import BaseManager
 from django.utils import timezone
 from rest_framework import serializers
 
+from apps.common.media_derivatives import PREVIEW_SIZE, THUMBNAIL_SIZE
+from apps.common.projection import projection_includes
 from apps.common.secure_media import build_message_file_url, build_quick_reply_media_url
 from apps.common.upload_security import chat_file_upload_policy, quick_reply_media_upload_policy, sanitize_upload
 
 from .models import MasterQuickReply, Message
+from .unread import UNREAD_COUNT_ANNOTATION, get_unread_counts
+
+
+class UnreadCountListSerializer(serializers.ListSerializer):
+    """Precomputes unread counters for the whole page in one grouped query."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        # Rows from ``Appointment.objects.for_listing`` already carry the counter.
+        missing = [item.id for item in items if not hasattr(item, UNREAD_COUNT_ANNOTATION)]
+        if missing and projection_includes(self.context, "unread_count"):
+            request = self.context.get("request")
+            self._context = {
+                **self._context,
+                "unread_counts": get_unread_counts(getattr(request, "user", None), missing),
+            }
+        return super().to_representation(items)
+
+
+def resolve_unread_count(serializer: serializers.Serializer, appointment) -> int:
+    annotated = getattr(appointment, UNREAD_COUNT_ANNOTATION, None)
+    if annotated is not None:
+        return annotated
+    precomputed = serializer.context.get("unread_counts")
+    if precomputed is not None and appointment.id in precomputed:
+        return precomputed[appointment.id]
+    request = serializer.context.get("request")
+    return get_unread_counts(getattr(request, "user", None), [appointment.id]).get(appointment.id, 0)
 
 
 class MessageSerializer(serializers.ModelSerializer):
     sender_username = serializers.CharField(source="sender.username", read_only=True)
     sender_role = serializers.CharField(source="sender.role", read_only=True)
     file_url = serializers.SerializerMethodField()
+    file_thumb_url = serializers.SerializerMethodField()
+    file_preview_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Message
@@ -26,6 +59,8 @@ class MessageSerializer(serializers.ModelSerializer):
             "text",
             "file",
             "file_url",
+            "file_thumb_url",
+            "file_preview_url",
             "is_deleted",
             "deleted_at",
             "created_at",
@@ -45,11 +80,23 @@ class MessageSerializer(serializers.ModelSerializer):
             return None
         return build_message_file_url(self.context.get("request"), obj)
 
+    def get_file_thumb_url(self, obj: Message) -> str | None:
+        if obj.is_deleted:
+            return None
+        return build_message_file_url(self.context.get("request"), obj, variant=THUMBNAIL_SIZE)
+
+    def get_file_preview_url(self, obj: Message) -> str | None:
+        if obj.is_deleted:
+            return None
+        return build_message_file_url(self.context.get("request"), obj, variant=PREVIEW_SIZE)
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         if instance.is_deleted:
             data["text"] = None
             data["file_url"] = None
+            data["file_thumb_url"] = None
+            data["file_preview_url"] = None
         return data
 
 
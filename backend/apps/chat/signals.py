@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.common.media_derivatives import mark_pending_derivatives, schedule_pending_derivatives
+
+from .models import MasterQuickReply, Message, ModerationTerm
+from .moderation_lexicon import invalidate_lexicon
+from .quick_replies import invalidate_quick_replies
+from .previews import record_latest_messages, record_message_hidden
+from .unread import record_message_created
+
+
+@receiver(post_save, sender=Message)
+def update_unread_counters_on_message(sender, instance: Message, created: bool, **kwargs):
+    if created:
+        record_message_created(instance)
+
+
+@receiver(post_save, sender=Message)
+def update_appointment_last_message(sender, instance: Message, created: bool, **kwargs):
+    if created:
+        record_latest_messages([instance])
+    elif instance.is_deleted:
+        record_message_hidden(instance)
+
+
+@receiver(pre_save, sender=Message)
+def mark_message_media_derivatives(sender, instance: Message, **kwargs):
+    mark_pending_derivatives(instance, ("file",))
+
+
+@receiver(post_save, sender=Message)
+def build_message_media_derivatives(sender, instance: Message, **kwargs):
+    schedule_pending_derivatives(instance)
+
+
+@receiver(post_save, sender=ModerationTerm)
+@receiver(post_delete, sender=ModerationTerm)
+def recompile_moderation_lexicon(sender, **kwargs):
+    # After commit, or a process rechecking in between compiles the old terms under the new version.
+    transaction.on_commit(invalidate_lexicon)
+
+
+@receiver(post_save, sender=MasterQuickReply)
+@receiver(post_delete, sender=MasterQuickReply)
+def bump_quick_reply_version(sender, instance: MasterQuickReply, **kwargs):
+    # After commit: a reader that saw the new version earlier could cache the old rows under it.
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_quick_replies(user_id))
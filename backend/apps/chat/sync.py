@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from apps.appointments.access import appointment_access_filter
+
+from .fast_render import message_list_renderer
+from .models import Message
+from .serializers import MessageSerializer
+from .unread import get_unread_counts
+
+SYNC_CURSOR_SALT = "apps.chat.sync.cursor"
+
+
+@dataclass(frozen=True)
+class SyncCursor:
+    # Highest message id the client has seen.
+    last_message_id: int
+    # (deleted_at, id) of the newest deletion of an already-seen message the client has seen;
+    # compared as a pair so deletions sharing a timestamp survive a page cut between them.
+    deleted_after: datetime
+    deleted_after_id: int = 0
+
+
+def encode_sync_cursor(cursor: SyncCursor) -> str:
+    payload = {"m": cursor.last_message_id, "d": cursor.deleted_after.isoformat(), "di": cursor.deleted_after_id}
+    return signing.dumps(payload, salt=SYNC_CURSOR_SALT, compress=True)
+
+
+def decode_sync_cursor(raw_value: str) -> SyncCursor:
+    try:
+        payload = signing.loads(raw_value, salt=SYNC_CURSOR_SALT)
+        deleted_after = parse_datetime(payload["d"])
+        if deleted_after is None:
+            raise ValueError(payload["d"])
+        return SyncCursor(
+            last_message_id=int(payload["m"]),
+            deleted_after=deleted_after,
+            deleted_after_id=int(payload.get("di", 0)),
+        )
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as exc:
+        raise ValidationError({"cursor": "Некорректный курсор синхронизации."}) from exc
+
+
+def _initial_cursor(user) -> SyncCursor:
+    last_id = (
+        Message.objects.filter(appointment_access_filter(user, prefix="appointment__")).aggregate(last=Max("id"))["last"]
+        or 0
+    )
+    return SyncCursor(last_message_id=last_id, deleted_after=timezone.now())
+
+
+def _value(item, name: str):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def sync_messages(user, raw_cursor: str | None, *, request=None) -> dict:
+    """New and deleted messages since ``raw_cursor`` across all appointments ``user`` can open.
+
+    Without a cursor nothing is returned except a cursor pointing at "now",
+    so a client never downloads whole histories through this endpoint.
+    """
+    if not raw_cursor:
+        return {"cursor": encode_sync_cursor(_initial_cursor(user)), "has_more": False, "appointments": []}
+    cursor = decode_sync_cursor(raw_cursor)
+    limit = settings.CHAT_SYNC_MAX_MESSAGES
+
+    seen = Q(id__lte=cursor.last_message_id)
+    deleted_since = Q(deleted_at__gt=cursor.deleted_after) | Q(
+        deleted_at=cursor.deleted_after, id__gt=cursor.deleted_after_id
+    )
+    queryset = (
+        Message.objects.filter(appointment_access_filter(user, prefix="appointment__"))
+        .filter(Q(id__gt=cursor.last_message_id) | (seen & Q(is_deleted=True) & deleted_since))
+        .select_related("sender")
+        # Deletions of seen messages first, in deletion order, then new messages by id:
+        # a truncated page can always resume from the last row it returned.
+        .annotate(sync_is_new=Case(When(seen, then=Value(0)), default=Value(1), output_field=IntegerField()))
+        .order_by("sync_is_new", F("deleted_at").asc(nulls_last=True), "id")
+    )
+    context = {"request": request}
+    fast_renderer = message_list_renderer(context) if settings.FAST_LIST_RENDERING else None
+    if fast_renderer is not None:
+        items = list(fast_renderer.values(queryset)[: limit + 1])
+    else:
+        items = list(queryset[: limit + 1])
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    last_message_id = cursor.last_message_id
+    deleted_watermark = (cursor.deleted_after, cursor.deleted_after_id)
+    for item in items:
+        item_id = _value(item, "id")
+        if item_id > cursor.last_message_id:
+            last_message_id = max(last_message_id, item_id)
+        elif _value(item, "deleted_at") is not None:
+            deleted_watermark = max(deleted_watermark, (_value(item, "deleted_at"), item_id))
+
+    if fast_renderer is not None:
+        rendered = fast_renderer.render(items)
+    else:
+        rendered = MessageSerializer(items, many=True, context=context).data
+
+    grouped: dict[int, list[dict]] = {}
+    for message in rendered:
+        grouped.setdefault(message["appointment"], []).append(message)
+    unread_counts = get_unread_counts(user, grouped)
+    return {
+        "cursor": encode_sync_cursor(
+            SyncCursor(
+                last_message_id=last_message_id,
+                deleted_after=deleted_watermark[0],
+                deleted_after_id=deleted_watermark[1],
+            )
+        ),
+        "has_more": has_more,
+        "appointments": [
+            {
+                "appointment_id": appointment_id,
+                "unread_count": unread_counts.get(appointment_id, 0),
+                "messages": messages,
+            }
+            for appointment_id, messages in grouped.items()
+        ],
+    }
@@ -1,33 +1,54 @@
 from __future__ import annotations
 
 import re
+from collections import Counter
+
+from django.conf import settings
+
+from .models import ModerationTermCategory
+from .moderation_lexicon import fold_text, get_lexicon_matcher
 
 
 class ChatMessageRejected(ValueError):
     """Raised when a client chat message does not pass moderation rules."""
 
 
-PROFANITY_STEMS = (
-    "хуй",
-    "пизд",
-    "бляд",
-    "блят",
-    "еба",
-    "ебан",
-    "пидор",
-    "гандон",
-)
-
 SPAM_REPEAT_RE = re.compile(r"(.)\1{7,}", re.IGNORECASE)
+SPAM_LINK_RE = re.compile(r"(?:https?://|www\.|t\.me/)\S*", re.IGNORECASE)
+
+# Spam signal weights; a message is rejected once their sum reaches CHAT_SPAM_SCORE_THRESHOLD.
+SPAM_WEIGHTS = {
+    "repeated_chars": 1.0,
+    "repeated_words": 1.0,
+    "links": 0.6,
+    "shouting": 0.5,
+    "lexicon": 0.6,
+}
 
 
 def normalize_chat_text(text: str) -> str:
     return (text or "").strip()
 
 
-def _contains_profanity(text: str) -> bool:
-    words = re.findall(r"[a-zA-Zа-яА-ЯёЁ0-9_]+", (text or "").lower())
-    return any(any(word.startswith(stem) for stem in PROFANITY_STEMS) for word in words)
+def spam_score(text: str, folded: str, lexicon_hits: list[tuple[str, str]]) -> float:
+    words = folded.split()
+    score = 0.0
+    if SPAM_REPEAT_RE.search(text):
+        score += SPAM_WEIGHTS["repeated_chars"]
+    if len(words) >= 4:
+        _, top_count = Counter(words).most_common(1)[0]
+        if top_count >= 4 and top_count * 2 >= len(words):
+            score += SPAM_WEIGHTS["repeated_words"]
+    links = SPAM_LINK_RE.findall(text)
+    if len(links) >= 3:
+        score += SPAM_WEIGHTS["links"]
+    letters = [ch for ch in SPAM_LINK_RE.sub(" ", text) if ch.isalpha()]
+    if len(letters) >= 20 and sum(ch.isupper() for ch in letters) >= 0.8 * len(letters):
+        score += SPAM_WEIGHTS["shouting"]
+    score += SPAM_WEIGHTS["lexicon"] * sum(
+        1 for category, _ in lexicon_hits if category == ModerationTermCategory.SPAM
+    )
+    return score
 
 
 def validate_client_chat_text(text: str) -> str:
@@ -35,10 +56,13 @@ def validate_client_chat_text(text: str) -> str:
     if not normalized:
         return normalized
 
-    if SPAM_REPEAT_RE.search(normalized):
+    folded = fold_text(normalized)
+    lexicon_hits = get_lexicon_matcher().matches(folded)
+
+    if spam_score(normalized, folded, lexicon_hits) >= settings.CHAT_SPAM_SCORE_THRESHOLD:
         raise ChatMessageRejected("Сообщение похоже на спам. Опишите вопрос коротко и по делу.")
 
-    if _contains_profanity(normalized):
+    if any(category == ModerationTermCategory.PROFANITY for category, _ in lexicon_hits):
         raise ChatMessageRejected("Сообщение содержит недопустимую лексику. Переформулируйте, пожалуйста.")
 
     alnum_count = sum(ch.isalnum() for ch in normalized)
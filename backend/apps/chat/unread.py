@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.platform.realtime import broadcast_chat_unread_state
+
+from .models import Message, ReadState
+
+
+def _is_authenticated(user) -> bool:
+    return bool(user is not None and getattr(user, "is_authenticated", False))
+
+
+def get_unread_counts(user, appointment_ids: Iterable[int]) -> dict[int, int]:
+    ids = list(dict.fromkeys(int(item) for item in appointment_ids if item))
+    if not ids or not _is_authenticated(user):
+        return {}
+    counts = dict.fromkeys(ids, 0)
+    materialized = dict(
+        ReadState.objects.filter(user=user, appointment_id__in=ids).values_list("appointment_id", "unread_count")
+    )
+    counts.update(materialized)
+
+    # Appointments the user has never opened and never received a message in
+    # have no counter row yet; they fall back to one grouped scan.
+    missing = [appointment_id for appointment_id in ids if appointment_id not in materialized]
+    if missing:
+        rows = (
+            Message.objects.filter(appointment_id__in=missing, is_deleted=False)
+            .exclude(sender=user)
+            .order_by()
+            .values("appointment_id")
+            .annotate(unread=Count("id"))
+        )
+        counts.update({row["appointment_id"]: row["unread"] for row in rows})
+    return counts
+
+
+# Attribute set by ``unread_count_annotation`` and read by the serializers
+# before they fall back to ``get_unread_counts``.
+UNREAD_COUNT_ANNOTATION = "listing_unread_count"
+
+
+def unread_count_annotation(user):
+    """Per-row unread counter for appointment listings, same semantics as ``get_unread_counts``."""
+    materialized = ReadState.objects.filter(user=user, appointment_id=OuterRef("pk")).values("unread_count")[:1]
+    scanned = (
+        Message.objects.filter(appointment_id=OuterRef("pk"), is_deleted=False)
+        .exclude(sender=user)
+        .order_by()
+        .values("appointment_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(
+        Subquery(materialized, output_field=IntegerField()),
+        Subquery(scanned, output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def get_unread_total(user, appointments_queryset) -> int:
+    if not _is_authenticated(user):
+        return 0
+    appointment_ids = appointments_queryset.order_by().values("id")
+    materialized_total = (
+        ReadState.objects.filter(user=user, appointment_id__in=appointment_ids).aggregate(total=Sum("unread_count"))["total"]
+        or 0
+    )
+    missing_total = (
+        Message.objects.filter(appointment_id__in=appointment_ids, is_deleted=False)
+        .exclude(sender=user)
+        .exclude(appointment_id__in=ReadState.objects.filter(user=user).values("appointment_id"))
+        .order_by()
+        .count()
+    )
+    return materialized_total + missing_total
+
+
+def _unread_count_expression(*, appointment_id: int, user_id: int, last_read_message_id: int):
+    unread = (
+        Message.objects.filter(appointment_id=appointment_id, id__gt=last_read_message_id, is_deleted=False)
+        .exclude(sender_id=user_id)
+        .order_by()
+        .values("appointment_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+
+
+def _last_message_id_expression(appointment_id: int):
+    last_message = (
+        Message.objects.filter(appointment_id=appointment_id)
+        .order_by()
+        .values("appointment_id")
+        .annotate(last_id=Max("id"))
+        .values("last_id")
+    )
+    return Coalesce(Subquery(last_message, output_field=IntegerField()), Value(0))
+
+
+def _publish_unread_state(recipients: set[tuple[int, int]]) -> None:
+    if not recipients:
+        return
+    appointment_ids = {appointment_id for appointment_id, _ in recipients}
+    user_ids = {user_id for _, user_id in recipients}
+    unread: dict[int, dict[int, int]] = {}
+    rows = ReadState.objects.filter(appointment_id__in=appointment_ids, user_id__in=user_ids).values_list(
+        "appointment_id", "user_id", "unread_count"
+    )
+    for appointment_id, user_id, unread_count in rows:
+        if (appointment_id, user_id) in recipients:
+            unread.setdefault(appointment_id, {})[user_id] = unread_count
+
+    def publish() -> None:
+        for appointment_id, unread_by_user in unread.items():
+            broadcast_chat_unread_state(appointment_id, unread_by_user)
+
+    transaction.on_commit(publish)
+
+
+def _participant_ids(appointment) -> set[int]:
+    return {user_id for user_id in (appointment.client_id, appointment.assigned_master_id) if user_id}
+
+
+@transaction.atomic
+def record_messages_created(messages) -> None:
+    # bulk_create() bypasses post_save, so batch writers call this directly.
+    messages = [message for message in messages if message.id]
+    if not messages:
+        return
+    appointments = {message.appointment_id: message.appointment for message in messages}
+    appointment_ids = list(appointments)
+
+    unread_by_sender: dict[int, dict[int, int]] = {}
+    for message in messages:
+        if not message.is_deleted:
+            per_appointment = unread_by_sender.setdefault(message.sender_id, {})
+            per_appointment[message.appointment_id] = per_appointment.get(message.appointment_id, 0) + 1
+
+    existing = set(
+        ReadState.objects.filter(appointment_id__in=appointment_ids).values_list("appointment_id", "user_id")
+    )
+    for sender_id, per_appointment in unread_by_sender.items():
+        ReadState.objects.filter(appointment_id__in=list(per_appointment)).exclude(user_id=sender_id).update(
+            unread_count=F("unread_count")
+            + Case(
+                *[When(appointment_id=appointment_id, then=Value(count)) for appointment_id, count in per_appointment.items()],
+                default=Value(0),
+            )
+        )
+    last_message_ids: dict[int, int] = {}
+    for message in messages:
+        last_message_ids[message.appointment_id] = max(last_message_ids.get(message.appointment_id, 0), message.id)
+    ReadState.objects.filter(appointment_id__in=appointment_ids).update(
+        last_message_id=Greatest(
+            F("last_message_id"),
+            Case(
+                *[When(appointment_id=appointment_id, then=Value(last_id)) for appointment_id, last_id in last_message_ids.items()],
+                default=Value(0),
+            ),
+        )
+    )
+
+    senders_by_appointment: dict[int, set[int]] = {}
+    for message in messages:
+        senders_by_appointment.setdefault(message.appointment_id, set()).add(message.sender_id)
+    recipients = {
+        (appointment_id, user_id)
+        for appointment_id, appointment in appointments.items()
+        for user_id in _participant_ids(appointment) - senders_by_appointment[appointment_id]
+    }
+    missing = recipients - existing
+    if missing:
+        ReadState.objects.bulk_create(
+            [ReadState(appointment_id=appointment_id, user_id=user_id) for appointment_id, user_id in missing],
+            ignore_conflicts=True,
+        )
+        # Fresh rows are counted from scratch so earlier history is included.
+        for appointment_id, user_id in missing:
+            ReadState.objects.filter(appointment_id=appointment_id, user_id=user_id, last_message_id=0).update(
+                unread_count=_unread_count_expression(appointment_id=appointment_id, user_id=user_id, last_read_message_id=0),
+                last_message_id=_last_message_id_expression(appointment_id),
+            )
+    _publish_unread_state(recipients)
+
+
+def record_message_created(message) -> None:
+    record_messages_created([message])
+
+
+@transaction.atomic
+def record_message_deleted(message) -> None:
+    # Call before the soft delete is saved only for messages that were visible.
+    ReadState.objects.filter(
+        appointment_id=message.appointment_id,
+        last_read_message_id__lt=message.id,
+        unread_count__gt=0,
+    ).exclude(user_id=message.sender_id).update(unread_count=F("unread_count") - 1)
+
+
+@transaction.atomic
+def advance_read_pointer(appointment, user, last_read_message_id: int) -> ReadState:
+    state, created = ReadState.objects.get_or_create(appointment=appointment, user=user)
+    if not created and last_read_message_id <= state.last_read_message_id:
+        return state
+
+    next_pointer = max(last_read_message_id, state.last_read_message_id)
+    ReadState.objects.filter(pk=state.pk).update(
+        last_read_message_id=next_pointer,
+        unread_count=_unread_count_expression(
+            appointment_id=appointment.id,
+            user_id=user.id,
+            last_read_message_id=next_pointer,
+        ),
+        last_message_id=_last_message_id_expression(appointment.id),
+        updated_at=timezone.now(),
+    )
+    state.refresh_from_db(fields=["last_read_message_id", "unread_count", "last_message_id", "updated_at"])
+
+    # The counter is written with update(), which does not send post_save.
+    from apps.accounts.dashboard import invalidate_dashboard_summaries
+
+    invalidate_dashboard_summaries(user_ids=(user.id,))
+    unread_by_user = {user.id: state.unread_count}
+    transaction.on_commit(lambda: broadcast_chat_unread_state(appointment.id, unread_by_user))
+    return state
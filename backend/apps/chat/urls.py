@@ -3,6 +3,8 @@
 from .views import (
     AppointmentMessagesView,
     AppointmentReadView,
+    ChatSyncView,
+    MasterQuickReplyCommandsView,
     MasterQuickReplyDetailView,
     MasterQuickReplyListCreateView,
     MessageDeleteView,
@@ -12,6 +14,8 @@ urlpatterns = [
     path("appointments/<int:appointment_id>/messages/", AppointmentMessagesView.as_view(), name="appointment-messages"),
     path("messages/<int:message_id>/", MessageDeleteView.as_view(), name="message-delete"),
     path("appointments/<int:appointment_id>/read/", AppointmentReadView.as_view(), name="appointment-read"),
+    path("chat/sync/", ChatSyncView.as_view(), name="chat-sync"),
     path("chat/quick-replies/", MasterQuickReplyListCreateView.as_view(), name="master-quick-replies"),
+    path("chat/quick-replies/commands/", MasterQuickReplyCommandsView.as_view(), name="master-quick-reply-commands"),
     path("chat/quick-replies/<int:reply_id>/", MasterQuickReplyDetailView.as_view(), name="master-quick-reply-detail"),
 ]
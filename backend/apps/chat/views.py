@@ -4,18 +4,30 @@ from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.accounts.models import RoleChoices
 from apps.accounts.permissions import IsAuthenticatedAndNotBanned
 from apps.appointments.access import get_appointment_for_user
+from apps.appointments.archive import appointment_messages_queryset
+from apps.appointments.etags import appointment_messages_etag
 from apps.appointments.models import AppointmentEventType
 from apps.appointments.services import add_event, evaluate_response_sla
-from apps.common.api_limits import parse_non_negative_int_param, serialize_bounded_queryset
+from apps.common.api_limits import (
+    paginate_latest_first,
+    parse_bool_param,
+    parse_non_negative_int_param,
+    parse_positive_int_param,
+    serialize_bounded_queryset,
+)
+from apps.common.conditional import apply_etag, etag_matches, not_modified_response
 from apps.platform.services import emit_event
 
-from .models import MasterQuickReply, Message, ReadState
+from .fast_render import message_list_renderer
+from .models import MasterQuickReply, Message
+from .quick_replies import QuickReplyEntry, get_quick_reply_map
 from .serializers import (
     MasterQuickReplySerializer,
     MessageCreateSerializer,
@@ -24,10 +36,16 @@ from .serializers import (
 )
 from .services import notify_client_about_chat_message
 from .services import notify_master_about_client_chat_message
+from .sync import sync_messages
 from .text_moderation import ChatMessageRejected, validate_client_chat_text
+from .unread import advance_read_pointer, record_message_deleted
+
+
+QUICK_REPLY_AUTOCOMPLETE_LIMIT = 10
+QUICK_REPLY_AUTOCOMPLETE_MAX_LIMIT = 50
 
 
-def apply_master_quick_reply(user, text: str) -> tuple[str, MasterQuickReply | None]:
+def apply_master_quick_reply(user, text: str) -> tuple[str, QuickReplyEntry | None]:
     raw = (text or "").strip()
     if user.role != RoleChoices.MASTER or not raw:
         return raw, None
@@ -41,11 +59,7 @@ def apply_master_quick_reply(user, text: str) -> tuple[str, MasterQuickReply | N
     if not command:
         return raw, None
 
-    quick_reply = (
-        MasterQuickReply.objects.filter(user=user, command=command)
-        .only("id", "text", "media_file")
-        .first()
-    )
+    quick_reply = get_quick_reply_map(user.id).get(command)
     if not quick_reply:
         return raw, None
 
@@ -62,16 +76,56 @@ class AppointmentMessagesView(APIView):
     permission_classes = (IsAuthenticatedAndNotBanned,)
 
     def get(self, request, appointment_id: int):
+        etag = appointment_messages_etag(request, appointment_id)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
         appointment = get_appointment_for_user(request.user, appointment_id)
         after_id = parse_non_negative_int_param(request.query_params.get("after_id"), field_name="after_id", default=0)
-        queryset = appointment.messages.filter(id__gt=after_id).select_related("sender").order_by("id")
-        return serialize_bounded_queryset(
+        before_id = parse_non_negative_int_param(request.query_params.get("before_id"), field_name="before_id", default=0)
+        context = {"request": request}
+        if before_id or parse_bool_param(request.query_params.get("latest")):
+            if after_id:
+                raise ValidationError({"after_id": "after_id нельзя совмещать с before_id или latest."})
+            return apply_etag(self._latest_first_page(request, appointment, before_id, context), etag)
+
+        queryset = (
+            appointment_messages_queryset(appointment).filter(id__gt=after_id).select_related("sender").order_by("id")
+        )
+        response = serialize_bounded_queryset(
             request,
             queryset,
             MessageSerializer,
-            serializer_context={"request": request},
+            serializer_context=context,
             default_limit=settings.CHAT_MESSAGES_LIST_LIMIT,
             max_limit=settings.CHAT_MESSAGES_MAX_LIST_LIMIT,
+            fast_renderer=message_list_renderer(context) if settings.FAST_LIST_RENDERING else None,
+        )
+        return apply_etag(response, etag)
+
+    def _latest_first_page(self, request, appointment, before_id: int, context: dict) -> Response:
+        limit = min(
+            parse_positive_int_param(
+                request.query_params.get("limit"),
+                field_name="limit",
+                default=settings.CHAT_MESSAGES_LIST_LIMIT,
+            ),
+            settings.CHAT_MESSAGES_MAX_LIST_LIMIT,
+        )
+        queryset = appointment_messages_queryset(appointment).select_related("sender")
+        fast_renderer = message_list_renderer(context) if settings.FAST_LIST_RENDERING else None
+        if fast_renderer is not None:
+            rows, has_more = paginate_latest_first(fast_renderer.values(queryset), before_id=before_id, limit=limit)
+            results = fast_renderer.render(rows)
+        else:
+            rows, has_more = paginate_latest_first(queryset, before_id=before_id, limit=limit)
+            results = MessageSerializer(rows, many=True, context=context).data
+        return Response(
+            {
+                "limit": limit,
+                "has_more": has_more,
+                "next_before_id": results[0]["id"] if has_more else None,
+                "results": results,
+            }
         )
 
     def post(self, request, appointment_id: int):
@@ -125,6 +179,8 @@ class MessageDeleteView(APIView):
         if message.sender_id != request.user.id and not is_admin:
             return Response({"detail": "Удалять можно только свои сообщения"}, status=status.HTTP_403_FORBIDDEN)
 
+        if not message.is_deleted:
+            record_message_deleted(message)
         message.is_deleted = True
         message.deleted_at = timezone.now()
         message.deleted_by = request.user
@@ -146,6 +202,13 @@ class MessageDeleteView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class ChatSyncView(APIView):
+    permission_classes = (IsAuthenticatedAndNotBanned,)
+
+    def get(self, request):
+        return Response(sync_messages(request.user, request.query_params.get("cursor"), request=request))
+
+
 class AppointmentReadView(APIView):
     permission_classes = (IsAuthenticatedAndNotBanned,)
 
@@ -155,12 +218,9 @@ class AppointmentReadView(APIView):
         serializer.is_valid(raise_exception=True)
         last_read_message_id = serializer.validated_data["last_read_message_id"]
 
-        read_state, _ = ReadState.objects.get_or_create(appointment=appointment, user=request.user)
-        if last_read_message_id > read_state.last_read_message_id:
-            read_state.last_read_message_id = last_read_message_id
-            read_state.save(update_fields=["last_read_message_id", "updated_at"])
+        read_state = advance_read_pointer(appointment, request.user, last_read_message_id)
 
-        return Response({"ok": True})
+        return Response({"ok": True, "unread_count": read_state.unread_count})
 
 
 class MasterQuickReplyListCreateView(APIView):
@@ -200,6 +260,41 @@ class MasterQuickReplyListCreateView(APIView):
         return Response(data, status=status.HTTP_201_CREATED)
 
 
+class MasterQuickReplyCommandsView(APIView):
+    """Prefix autocompletion for the chat composer, served from the cached command map."""
+
+    permission_classes = (IsAuthenticatedAndNotBanned,)
+
+    def get(self, request):
+        if request.user.role != RoleChoices.MASTER:
+            return Response({"detail": "Только для мастеров"}, status=status.HTTP_403_FORBIDDEN)
+
+        prefix = (request.query_params.get("prefix") or "").strip().lstrip("/").lower()
+        limit = min(
+            parse_positive_int_param(
+                request.query_params.get("limit"),
+                field_name="limit",
+                default=QUICK_REPLY_AUTOCOMPLETE_LIMIT,
+            ),
+            QUICK_REPLY_AUTOCOMPLETE_MAX_LIMIT,
+        )
+        entries = get_quick_reply_map(request.user.id).complete(prefix, limit=limit)
+        return Response(
+            {
+                "results": [
+                    {
+                        "id": entry.id,
+                        "command": entry.command,
+                        "title": entry.title,
+                        "preview": entry.text[:120],
+                        "has_media": bool(entry.media_file),
+                    }
+                    for entry in entries
+                ]
+            }
+        )
+
+
 class MasterQuickReplyDetailView(APIView):
     permission_classes = (IsAuthenticatedAndNotBanned,)
 
@@ -1,16 +1,31 @@
 from __future__ import annotations
 
+import datetime
+import uuid
 from dataclasses import dataclass
+from decimal import Decimal
 from typing import Any
 
 from django.conf import settings
-from django.db.models import QuerySet
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import F, OrderBy, Q, QuerySet
 from rest_framework import generics
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 
 TRUE_VALUES = {"1", "true", "yes", "on"}
+CURSOR_PARAM = "cursor"
+CURSOR_SALT = "apps.common.api_limits.cursor"
+
+
+@dataclass(frozen=True, slots=True)
+class ListCursor:
+    ordering: tuple[str, ...]
+    values: tuple[Any, ...]
+    backwards: bool = False
 
 
 @dataclass(frozen=True, slots=True)
@@ -18,6 +33,22 @@ class ListWindow:
     limit: int
     offset: int
     include_meta: bool
+    cursor_mode: bool = False
+    cursor: ListCursor | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ListPage:
+    items: list
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class _OrderingKey:
+    path: str
+    descending: bool
+    nulls_largest: bool
 
 
 def parse_bool_param(raw_value: Any, *, default: bool = False) -> bool:
@@ -50,6 +81,52 @@ def parse_positive_int_param(raw_value: Any, *, field_name: str, default: int) -
     return value
 
 
+def parse_id_list_param(raw_value: Any, *, field_name: str, max_items: int) -> list[int]:
+    """Parse ``?ids=3,1,3`` into unique positive ids, keeping the request order."""
+    raw_items = [item.strip() for item in str(raw_value or "").split(",") if item.strip()]
+    if not raw_items:
+        raise ValidationError({field_name: f"Параметр {field_name} обязателен."})
+    try:
+        ids = list(dict.fromkeys(int(item) for item in raw_items))
+    except ValueError as exc:
+        raise ValidationError({field_name: f"Параметр {field_name} должен быть списком целых чисел через запятую."}) from exc
+    if any(item < 1 for item in ids):
+        raise ValidationError({field_name: f"Параметр {field_name} должен содержать только положительные id."})
+    if len(ids) > max_items:
+        raise ValidationError({field_name: f"Можно запросить не больше {max_items} id за раз."})
+    return ids
+
+
+def encode_list_cursor(cursor: ListCursor) -> str:
+    payload = {
+        "o": list(cursor.ordering),
+        "v": [_encode_cursor_value(value) for value in cursor.values],
+        "b": int(cursor.backwards),
+    }
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_list_cursor(raw_value: str) -> ListCursor:
+    try:
+        payload = signing.loads(raw_value, salt=CURSOR_SALT)
+        ordering = tuple(str(item) for item in payload["o"])
+        values = tuple(payload["v"])
+        backwards = bool(payload.get("b"))
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as exc:
+        raise ValidationError({CURSOR_PARAM: "Некорректный курсор."}) from exc
+    if len(ordering) != len(values):
+        raise ValidationError({CURSOR_PARAM: "Некорректный курсор."})
+    return ListCursor(ordering=ordering, values=values, backwards=backwards)
+
+
+def _encode_cursor_value(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
 def resolve_list_window(
     request,
     *,
@@ -67,6 +144,20 @@ def resolve_list_window(
         field_name="limit",
         default=effective_default_limit,
     )
+    include_meta = parse_bool_param(request.query_params.get("include_meta"))
+
+    # An empty ?cursor= opens the first page in cursor mode; offset is ignored
+    # there, so deep pages are not bounded by API_LIST_MAX_OFFSET.
+    if CURSOR_PARAM in request.query_params:
+        raw_cursor = (request.query_params.get(CURSOR_PARAM) or "").strip()
+        return ListWindow(
+            limit=min(limit, effective_max_limit),
+            offset=0,
+            include_meta=include_meta,
+            cursor_mode=True,
+            cursor=decode_list_cursor(raw_cursor) if raw_cursor else None,
+        )
+
     offset = parse_non_negative_int_param(
         request.query_params.get("offset"),
         field_name="offset",
@@ -78,7 +169,7 @@ def resolve_list_window(
     return ListWindow(
         limit=min(limit, effective_max_limit),
         offset=offset,
-        include_meta=parse_bool_param(request.query_params.get("include_meta")),
+        include_meta=include_meta,
     )
 
 
@@ -86,6 +177,205 @@ def apply_list_window(queryset_or_list, window: ListWindow):
     return queryset_or_list[window.offset : window.offset + window.limit]
 
 
+def _ordering_keys(queryset: QuerySet) -> list[_OrderingKey]:
+    if queryset.query.order_by:
+        terms = list(queryset.query.order_by)
+    elif queryset.query.default_ordering:
+        terms = list(queryset.model._meta.ordering)
+    else:
+        terms = []
+
+    nulls_largest = connection.features.nulls_order_largest
+    keys = []
+    for term in terms:
+        if isinstance(term, str):
+            if term == "?" or "." in term:
+                raise ValidationError({CURSOR_PARAM: "Курсорная пагинация недоступна для этого списка."})
+            descending = term.startswith("-")
+            keys.append(_OrderingKey(term.lstrip("-+"), descending, nulls_largest))
+        elif isinstance(term, OrderBy) and isinstance(term.expression, F):
+            term_nulls_largest = nulls_largest
+            if term.nulls_last:
+                term_nulls_largest = not term.descending
+            elif term.nulls_first:
+                term_nulls_largest = term.descending
+            keys.append(_OrderingKey(term.expression.name, term.descending, term_nulls_largest))
+        else:
+            raise ValidationError({CURSOR_PARAM: "Курсорная пагинация недоступна для этого списка."})
+
+    # The primary key makes the ordering total, so every row has one position.
+    if not any(key.path in ("pk", "id", queryset.model._meta.pk.name) for key in keys):
+        descending = keys[-1].descending if keys else False
+        keys.append(_OrderingKey("pk", descending, nulls_largest))
+    return keys
+
+
+def _resolve_ordering_field(model, path: str):
+    field = None
+    for part in path.split("__"):
+        if model is None:
+            return None
+        try:
+            field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model if field.is_relation else None
+    return field
+
+
+def _row_value(item, path: str) -> Any:
+    if isinstance(item, dict):
+        # ``.values()`` rows from a fast list renderer carry the ordering columns.
+        return item["id" if path == "pk" else path]
+    value = item
+    parts = path.split("__")
+    for index, part in enumerate(parts):
+        if value is None:
+            return None
+        if index == len(parts) - 1 and part != "pk":
+            try:
+                field = value._meta.get_field(part)
+            except (AttributeError, FieldDoesNotExist):
+                field = None
+            if field is not None and field.is_relation and field.concrete:
+                return getattr(value, field.attname)
+        value = getattr(value, part)
+    return value
+
+
+def _value_after(path: str, value: Any, *, greater: bool, nulls_largest: bool) -> Q:
+    nothing = Q(pk__in=[])
+    if value is None:
+        # NULL sorts at one end of the range; only non-NULL rows can follow it.
+        return Q(**{f"{path}__isnull": False}) if greater != nulls_largest else nothing
+    condition = Q(**{f"{path}__{'gt' if greater else 'lt'}": value})
+    if greater == nulls_largest:
+        condition |= Q(**{f"{path}__isnull": True})
+    return condition
+
+
+def _value_equals(path: str, value: Any) -> Q:
+    if value is None:
+        return Q(**{f"{path}__isnull": True})
+    return Q(**{path: value})
+
+
+def _keyset_filter(keys: list[_OrderingKey], values: tuple[Any, ...], *, backwards: bool) -> Q:
+    condition = Q(pk__in=[])
+    prefix = Q()
+    for key, value in zip(keys, values):
+        greater = key.descending == backwards
+        condition |= prefix & _value_after(key.path, value, greater=greater, nulls_largest=key.nulls_largest)
+        prefix &= _value_equals(key.path, value)
+    return condition
+
+
+def _cursor_for(keys: list[_OrderingKey], item, *, backwards: bool) -> str:
+    return encode_list_cursor(
+        ListCursor(
+            ordering=tuple(_ordering_label(key) for key in keys),
+            values=tuple(_row_value(item, key.path) for key in keys),
+            backwards=backwards,
+        )
+    )
+
+
+def _ordering_label(key: _OrderingKey) -> str:
+    return f"{'-' if key.descending else ''}{key.path}"
+
+
+def _decode_cursor_values(queryset: QuerySet, keys: list[_OrderingKey], cursor: ListCursor) -> tuple[Any, ...]:
+    if cursor.ordering != tuple(_ordering_label(key) for key in keys):
+        raise ValidationError({CURSOR_PARAM: "Курсор относится к другой сортировке."})
+    values = []
+    for key, raw_value in zip(keys, cursor.values):
+        field = _resolve_ordering_field(queryset.model, key.path)
+        if raw_value is None or field is None:
+            values.append(raw_value)
+            continue
+        target = field.target_field if field.is_relation else field
+        try:
+            values.append(target.to_python(raw_value))
+        except Exception as exc:
+            raise ValidationError({CURSOR_PARAM: "Некорректный курсор."}) from exc
+    return tuple(values)
+
+
+def _paginate_sequence(items, window: ListWindow) -> ListPage:
+    # Already materialized collections carry a plain position in the cursor.
+    position = 0
+    if window.cursor is not None:
+        if window.cursor.ordering != ("#position",):
+            raise ValidationError({CURSOR_PARAM: "Курсор относится к другой сортировке."})
+        position = parse_non_negative_int_param(window.cursor.values[0], field_name=CURSOR_PARAM)
+    page = list(items[position : position + window.limit])
+    next_position = position + window.limit
+    prev_position = max(position - window.limit, 0)
+    return ListPage(
+        items=page,
+        next_cursor=encode_list_cursor(ListCursor(("#position",), (next_position,))) if next_position < len(items) else None,
+        prev_cursor=encode_list_cursor(ListCursor(("#position",), (prev_position,))) if position > 0 else None,
+    )
+
+
+def paginate_list_window(queryset_or_list, window: ListWindow) -> ListPage:
+    if not window.cursor_mode:
+        return ListPage(items=apply_list_window(queryset_or_list, window))
+    if not isinstance(queryset_or_list, QuerySet):
+        return _paginate_sequence(queryset_or_list, window)
+
+    queryset = queryset_or_list
+    keys = _ordering_keys(queryset)
+    order_terms = list(queryset.query.order_by) or list(queryset.model._meta.ordering if queryset.query.default_ordering else [])
+    if len(order_terms) < len(keys):
+        order_terms.append(_ordering_label(keys[-1]))
+    queryset = queryset.order_by(*order_terms)
+
+    cursor = window.cursor
+    backwards = bool(cursor and cursor.backwards)
+    if cursor is not None:
+        values = _decode_cursor_values(queryset, keys, cursor)
+        queryset = queryset.filter(_keyset_filter(keys, values, backwards=backwards))
+    if backwards:
+        queryset = queryset.reverse()
+
+    rows = list(queryset[: window.limit + 1])
+    has_more = len(rows) > window.limit
+    rows = rows[: window.limit]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return ListPage(items=rows)
+
+    has_next = has_more if not backwards else True
+    has_prev = cursor is not None if not backwards else has_more
+    return ListPage(
+        items=rows,
+        next_cursor=_cursor_for(keys, rows[-1], backwards=False) if has_next else None,
+        prev_cursor=_cursor_for(keys, rows[0], backwards=True) if has_prev else None,
+    )
+
+
+def paginate_latest_first(queryset, *, before_id: int, limit: int) -> tuple[list, bool]:
+    """Newest ``limit`` rows below ``before_id`` (0 = the very latest), returned oldest first.
+
+    Pages backwards by primary key, so with an ``(owner, id)`` index every page
+    is one short index scan however long the history is. Returns ``(rows, has_more)``.
+    """
+    if before_id:
+        queryset = queryset.filter(pk__lt=before_id)
+    rows = list(queryset.order_by("-pk")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return rows, has_more
+
+
+def ordering_columns(queryset: QuerySet) -> tuple[str, ...]:
+    """Columns a keyset cursor reads from each row, for ``.values()`` pages."""
+    return tuple("id" if key.path == "pk" else key.path for key in _ordering_keys(queryset))
+
+
 def collection_count(queryset_or_list) -> int:
     if isinstance(queryset_or_list, QuerySet):
         return queryset_or_list.count()
@@ -97,8 +387,19 @@ def render_bounded_list_response(
     *,
     window: ListWindow,
     total: int | None = None,
+    page: ListPage | None = None,
     response_status: int = 200,
 ) -> Response:
+    if window.cursor_mode:
+        body = {
+            "limit": window.limit,
+            "next_cursor": page.next_cursor if page else None,
+            "prev_cursor": page.prev_cursor if page else None,
+            "results": serialized_data,
+        }
+        if window.include_meta:
+            body["count"] = total if total is not None else len(serialized_data)
+        return Response(body, status=response_status)
     if window.include_meta:
         return Response(
             {
@@ -112,6 +413,19 @@ def render_bounded_list_response(
     return Response(serialized_data, status=response_status)
 
 
+def render_fast_list_page(queryset, fast_renderer, *, window: ListWindow, total: int | None, response_status: int = 200):
+    """Paginate ``.values()`` rows and render them without DRF serializers."""
+    extra_columns = ordering_columns(queryset) if window.cursor_mode else ()
+    page = paginate_list_window(fast_renderer.values(queryset, *extra_columns), window)
+    return render_bounded_list_response(
+        fast_renderer.render(page.items),
+        window=window,
+        total=total,
+        page=page,
+        response_status=response_status,
+    )
+
+
 def serialize_bounded_queryset(
     request,
     queryset,
@@ -123,6 +437,7 @@ def serialize_bounded_queryset(
     max_limit: int | None = None,
     max_offset: int | None = None,
     response_status: int = 200,
+    fast_renderer=None,
 ) -> Response:
     window = resolve_list_window(
         request,
@@ -131,15 +446,18 @@ def serialize_bounded_queryset(
         max_offset=max_offset,
     )
     total = collection_count(queryset) if window.include_meta else None
-    page = apply_list_window(queryset, window)
+    if fast_renderer is not None:
+        return render_fast_list_page(queryset, fast_renderer, window=window, total=total, response_status=response_status)
+    page = paginate_list_window(queryset, window)
     effective_kwargs = dict(serializer_kwargs or {})
     if serializer_context is not None and "context" not in effective_kwargs:
         effective_kwargs["context"] = serializer_context
-    serializer = serializer_class(page, many=True, **effective_kwargs)
+    serializer = serializer_class(page.items, many=True, **effective_kwargs)
     return render_bounded_list_response(
         serializer.data,
         window=window,
         total=total,
+        page=page,
         response_status=response_status,
     )
 
@@ -157,10 +475,17 @@ class BoundedListAPIView(generics.ListAPIView):
             max_offset=self.max_list_offset,
         )
 
+    def get_fast_renderer(self):
+        """Return a fast list renderer to bypass ``get_serializer`` for pages, or ``None``."""
+        return None
+
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         window = self.get_list_window()
         total = collection_count(queryset) if window.include_meta else None
-        page = apply_list_window(queryset, window)
-        serializer = self.get_serializer(page, many=True)
-        return render_bounded_list_response(serializer.data, window=window, total=total)
+        fast_renderer = self.get_fast_renderer()
+        if fast_renderer is not None:
+            return render_fast_list_page(queryset, fast_renderer, window=window, total=total)
+        page = paginate_list_window(queryset, window)
+        serializer = self.get_serializer(page.items, many=True)
+        return render_bounded_list_response(serializer.data, window=window, total=total, page=page)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.BACKGROUND_TASK_WORKERS),
+                thread_name_prefix="frp-background",
+            )
+        return _executor
+
+
+def _run_task(func: Callable, args: tuple, kwargs: dict) -> None:
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, "__qualname__", func))
+
+
+def _run_pooled_task(func: Callable, args: tuple, kwargs: dict) -> None:
+    close_old_connections()
+    try:
+        _run_task(func, args, kwargs)
+    finally:
+        close_old_connections()
+
+
+def submit_after_commit(func: Callable, *args, **kwargs) -> None:
+    """Run slow side effects (Telegram, stats) after the transaction commits.
+
+    Tasks run on a small in-process thread pool so the request returns first;
+    BACKGROUND_TASKS_EAGER runs them inline, which tests rely on.
+    """
+
+    def dispatch() -> None:
+        if settings.BACKGROUND_TASKS_EAGER:
+            _run_task(func, args, kwargs)
+        else:
+            _get_executor().submit(_run_pooled_task, func, args, kwargs)
+
+    transaction.on_commit(dispatch)
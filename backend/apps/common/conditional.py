@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def build_etag(*parts) -> str:
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def request_query_fingerprint(request) -> str:
+    # Paging parameters change the payload, so they are part of the version.
+    return "&".join(f"{key}={value}" for key, value in sorted(request.query_params.items()))
+
+
+def etag_matches(request, etag: str | None) -> bool:
+    if not etag:
+        return False
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    # If-None-Match uses the weak comparison function (RFC 9110, 13.1.2).
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def apply_etag(response, etag: str | None):
+    if etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response["ETag"] = etag
+        # Browsers keep the body and revalidate every poll; the tag is per user.
+        response["Cache-Control"] = "private, no-cache"
+        response["Vary"] = "Authorization, Cookie"
+    return response
+
+
+def not_modified_response(etag: str) -> Response:
+    return apply_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
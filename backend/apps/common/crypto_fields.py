@@ -9,6 +9,7 @@ from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 
 
 _ENCRYPTED_PREFIX = "enc1:"
@@ -33,7 +34,12 @@ def _build_cipher(keys: tuple[str, ...]) -> MultiFernet:
     return MultiFernet([Fernet(_normalize_fernet_key(item)) for item in keys])
 
 
-def get_sensitive_field_cipher() -> MultiFernet:
+@lru_cache(maxsize=8)
+def _build_primary_fernet(key: str) -> Fernet:
+    return Fernet(_normalize_fernet_key(key))
+
+
+def _configured_keys() -> tuple[str, ...]:
     configured_keys = tuple(
         item.strip() for item in getattr(settings, "RUSTDESK_ENCRYPTION_KEYS", "").split(",") if item.strip()
     )
@@ -42,7 +48,15 @@ def get_sensitive_field_cipher() -> MultiFernet:
             configured_keys = (_DEV_FALLBACK_KEY,)
         else:
             raise ImproperlyConfigured("RUSTDESK_ENCRYPTION_KEYS must be configured when DEBUG=0")
-    return _build_cipher(configured_keys)
+    return configured_keys
+
+
+def get_sensitive_field_cipher() -> MultiFernet:
+    return _build_cipher(_configured_keys())
+
+
+def primary_key_fingerprint() -> str:
+    return hashlib.sha256(_configured_keys()[0].encode("utf-8")).hexdigest()[:12]
 
 
 def encrypt_sensitive_value(value: str) -> str:
@@ -68,13 +82,104 @@ def decrypt_sensitive_value(value: str) -> str:
         raise ValueError("Encrypted field value could not be decrypted") from exc
 
 
+def reencrypt_sensitive_value(value: str) -> str | None:
+    """Return ``value`` encrypted under the primary key, or ``None`` if it already is."""
+    normalized = "" if value is None else str(value)
+    if not normalized:
+        return None
+    if not normalized.startswith(_ENCRYPTED_PREFIX):
+        return encrypt_sensitive_value(normalized)
+    token = normalized[len(_ENCRYPTED_PREFIX) :].encode("utf-8")
+    try:
+        _build_primary_fernet(_configured_keys()[0]).decrypt(token)
+        return None
+    except InvalidToken:
+        pass
+    try:
+        rotated = get_sensitive_field_cipher().rotate(token).decode("utf-8")
+    except InvalidToken as exc:
+        raise ValueError("Encrypted field value could not be decrypted") from exc
+    return f"{_ENCRYPTED_PREFIX}{rotated}"
+
+
+class LazyDecryptedText:
+    """Ciphertext loaded from the database, decrypted on first use.
+
+    Model attributes unwrap it to a plain ``str`` on access (see
+    ``_LazyDecryptingAttribute``); ``values()`` rows get the proxy itself,
+    which behaves like the decrypted string.
+    """
+
+    __slots__ = ("ciphertext", "_plaintext")
+
+    def __init__(self, ciphertext: str):
+        self.ciphertext = ciphertext
+        self._plaintext: str | None = None
+
+    def resolve(self) -> str:
+        if self._plaintext is None:
+            self._plaintext = decrypt_sensitive_value(self.ciphertext)
+        return self._plaintext
+
+    def __str__(self) -> str:
+        return self.resolve()
+
+    def __repr__(self) -> str:
+        return "<LazyDecryptedText>"
+
+    def __bool__(self) -> bool:
+        return bool(self.ciphertext)
+
+    def __len__(self) -> int:
+        return len(self.resolve())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyDecryptedText):
+            other = other.resolve()
+        return self.resolve() == other
+
+    def __hash__(self) -> int:
+        return hash(self.resolve())
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+
+class _LazyDecryptingAttribute(DeferredAttribute):
+    # A data descriptor, so reads go through __get__ even when the proxy sits in __dict__.
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, LazyDecryptedText):
+            value = value.resolve()
+            instance.__dict__[self.field.attname] = value
+        return value
+
+
 class EncryptedTextField(models.TextField):
     description = "Text field encrypted at rest with Fernet"
+    descriptor_class = _LazyDecryptingAttribute
 
     def from_db_value(self, value, expression, connection):
+        # Rows are often loaded only to be listed; defer the Fernet work until read.
+        if isinstance(value, str) and value.startswith(_ENCRYPTED_PREFIX):
+            return LazyDecryptedText(value)
         return self.to_python(value)
 
+    def pre_save(self, model_instance, add):
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, LazyDecryptedText):
+            # Untouched values are written back as stored, without a decrypt/encrypt round trip.
+            return value.ciphertext
+        return super().pre_save(model_instance, add)
+
     def to_python(self, value):
+        if isinstance(value, LazyDecryptedText):
+            return value.resolve()
         if value in (None, ""):
             return value
         if not isinstance(value, str):
@@ -82,8 +187,21 @@ class EncryptedTextField(models.TextField):
         return decrypt_sensitive_value(value)
 
     def get_prep_value(self, value):
+        if isinstance(value, LazyDecryptedText):
+            return value.ciphertext
         if value in (None, ""):
             return ""
         if not isinstance(value, str):
             value = str(value)
         return encrypt_sensitive_value(value)
+
+
+def encrypted_field_names(model) -> list[str]:
+    return [field.name for field in model._meta.concrete_fields if isinstance(field, EncryptedTextField)]
+
+
+class EncryptedFieldsQuerySet(models.QuerySet):
+    def defer_encrypted(self):
+        """Skip loading encrypted columns for listings that never render them."""
+        names = encrypted_field_names(self.model)
+        return self.defer(*names) if names else self
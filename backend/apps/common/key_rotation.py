@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+
+from django.apps import apps
+from django.db import models, transaction
+
+from .crypto_fields import LazyDecryptedText, encrypted_field_names, primary_key_fingerprint, reencrypt_sensitive_value
+from .models import KeyRotationCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+
+def encrypted_models() -> list[tuple[type, list[str]]]:
+    result = []
+    for model in apps.get_models():
+        names = encrypted_field_names(model)
+        if names:
+            result.append((model, names))
+    return result
+
+
+# Checkpoints are keyed by the primary key fingerprint, so a new rotation never
+# resumes from the previous one's position. They live in the database so that a
+# separately launched run (or a restarted cache) still resumes.
+def _checkpoint_filter(model) -> dict:
+    return {"key_fingerprint": primary_key_fingerprint(), "model_label": model._meta.label_lower}
+
+
+def get_checkpoint(model) -> int:
+    return (
+        KeyRotationCheckpoint.objects.filter(**_checkpoint_filter(model)).values_list("last_pk", flat=True).first()
+        or 0
+    )
+
+
+def save_checkpoint(model, last_pk: int) -> None:
+    KeyRotationCheckpoint.objects.update_or_create(**_checkpoint_filter(model), defaults={"last_pk": last_pk})
+
+
+def reset_checkpoint(model) -> None:
+    KeyRotationCheckpoint.objects.filter(**_checkpoint_filter(model)).delete()
+
+
+def _raw(value: str) -> models.Value:
+    # Plain TextField output, so neither side of the compare-and-set goes through encryption.
+    return models.Value(value, output_field=models.TextField())
+
+
+def _stored_value(instance, attname: str) -> str:
+    value = instance.__dict__.get(attname)
+    if isinstance(value, LazyDecryptedText):
+        return value.ciphertext
+    return value or ""
+
+
+def _reencrypt_batch(model, field_names: list[str], rows: list) -> int:
+    attnames = [model._meta.get_field(name).attname for name in field_names]
+    updated = 0
+    for row in rows:
+        stored = {attname: _stored_value(row, attname) for attname in attnames}
+        rotated = {attname: reencrypt_sensitive_value(value) for attname, value in stored.items()}
+        values = {attname: _raw(value) for attname, value in rotated.items() if value is not None}
+        if not values:
+            continue
+        # Written only while the row still holds the ciphertext we read: credentials a user
+        # saved in the meantime are already under the primary key and must not be overwritten.
+        expected = {attname: _raw(value) for attname, value in stored.items()}
+        updated += model._base_manager.filter(pk=row.pk, **expected).update(**values)
+    return updated
+
+
+def reencrypt_model(
+    model,
+    field_names: list[str],
+    *,
+    batch_size: int = 500,
+    on_batch: Callable[[dict], None] | None = None,
+) -> dict:
+    """Re-encrypt every row of ``model`` under the primary key in keyset-ordered chunks.
+
+    Progress is checkpointed after each committed batch, so an interrupted run
+    continues after the last processed primary key.
+    """
+    last_pk = get_checkpoint(model)
+    scanned = 0
+    updated = 0
+    started = time.monotonic()
+    while True:
+        with transaction.atomic():
+            rows = list(
+                model._base_manager.filter(pk__gt=last_pk).order_by("pk").only("pk", *field_names)[:batch_size]
+            )
+            if not rows:
+                break
+            updated += _reencrypt_batch(model, field_names, rows)
+        last_pk = rows[-1].pk
+        scanned += len(rows)
+        save_checkpoint(model, last_pk)
+        if on_batch is not None:
+            elapsed = time.monotonic() - started
+            on_batch(
+                {
+                    "model": model._meta.label,
+                    "last_pk": last_pk,
+                    "scanned": scanned,
+                    "updated": updated,
+                    "rows_per_second": round(scanned / elapsed, 1) if elapsed else float(scanned),
+                }
+            )
+        if len(rows) < batch_size:
+            break
+
+    elapsed = time.monotonic() - started
+    reset_checkpoint(model)
+    summary = {
+        "model": model._meta.label,
+        "scanned": scanned,
+        "updated": updated,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(scanned / elapsed, 1) if elapsed else float(scanned),
+    }
+    logger.info(
+        "sensitive field re-encryption finished model=%s scanned=%s updated=%s rows_per_second=%s",
+        summary["model"],
+        scanned,
+        updated,
+        summary["rows_per_second"],
+    )
+    return summary
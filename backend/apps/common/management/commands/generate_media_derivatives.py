@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.appointments.models import Appointment
+from apps.chat.models import Message
+from apps.common.media_derivatives import (
+    DERIVATIVE_SIZES,
+    derivative_name,
+    generate_image_derivatives,
+    mark_derivatives_ready,
+    supports_derivatives,
+)
+
+_MEDIA_FIELDS = (
+    (Appointment, ("photo_lock_screen", "payment_proof")),
+    (Message, ("file",)),
+)
+
+
+class Command(BaseCommand):
+    help = "Создаёт WebP-превью для ранее загруженных изображений заявок и чата."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Сколько строк читать за один запрос.")
+        parser.add_argument("--force", action="store_true", help="Пересоздать превью, даже если они уже есть.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size должен быть больше нуля")
+
+        generated = 0
+        for model, field_names in _MEDIA_FIELDS:
+            last_pk = 0
+            while True:
+                rows = list(
+                    model._base_manager.filter(pk__gt=last_pk).order_by("pk").only("pk", *field_names)[:batch_size]
+                )
+                if not rows:
+                    break
+                last_pk = rows[-1].pk
+                for row in rows:
+                    for field_name in field_names:
+                        file_field = getattr(row, field_name)
+                        if not file_field or not supports_derivatives(file_field.name):
+                            continue
+                        if not options["force"] and all(
+                            file_field.storage.exists(derivative_name(file_field.name, size)) for size in DERIVATIVE_SIZES
+                        ):
+                            # Rows from before the ready flag existed still need it for remote URLs.
+                            mark_derivatives_ready(model, row.pk, field_name, file_field.name)
+                            continue
+                        try:
+                            if generate_image_derivatives(file_field):
+                                generated += 1
+                                mark_derivatives_ready(model, row.pk, field_name, file_field.name)
+                        except OSError as exc:
+                            self.stderr.write(f"{model._meta.label} #{row.pk} {field_name}: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives for {generated} files"))
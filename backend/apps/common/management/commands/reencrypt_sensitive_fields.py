@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.key_rotation import encrypted_models, reencrypt_model, reset_checkpoint
+
+
+class Command(BaseCommand):
+    help = "Перешифровывает зашифрованные поля основным ключом из RUSTDESK_ENCRYPTION_KEYS после ротации."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Сколько строк обрабатывать за транзакцию.")
+        parser.add_argument("--restart", action="store_true", help="Игнорировать сохранённый checkpoint и начать сначала.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size должен быть больше нуля")
+
+        def report(progress):
+            if options["verbosity"] >= 2:
+                self.stdout.write(
+                    "{model}: up to pk={last_pk}, scanned {scanned}, updated {updated}, "
+                    "{rows_per_second} rows/s".format(**progress)
+                )
+
+        total_scanned = 0
+        total_updated = 0
+        total_elapsed = 0.0
+        for model, field_names in encrypted_models():
+            if options["restart"]:
+                reset_checkpoint(model)
+            summary = reencrypt_model(model, field_names, batch_size=batch_size, on_batch=report)
+            total_scanned += summary["scanned"]
+            total_updated += summary["updated"]
+            total_elapsed += summary["elapsed_seconds"]
+            self.stdout.write(
+                "{model}: scanned {scanned}, re-encrypted {updated}, {rows_per_second} rows/s".format(**summary)
+            )
+
+        rate = round(total_scanned / total_elapsed, 1) if total_elapsed else float(total_scanned)
+        self.stdout.write(
+            self.style.SUCCESS(f"Re-encrypted {total_updated} of {total_scanned} rows, {rate} rows/s")
+        )
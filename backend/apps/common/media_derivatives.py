@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .background import submit_after_commit
+
+logger = logging.getLogger(__name__)
+
+# Sanitized raster uploads get WebP derivatives stored next to the original:
+# lock_screen/photo.jpg -> lock_screen/photo.256w.webp, lock_screen/photo.1024w.webp.
+THUMBNAIL_SIZE = 256
+PREVIEW_SIZE = 1024
+DERIVATIVE_SIZES = (PREVIEW_SIZE, THUMBNAIL_SIZE)
+_SOURCE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+_PENDING_ATTR = "_pending_media_derivatives"
+
+# Sent with ``sender=model, object_id=..., field_name=...`` once a row's derivatives are stored.
+derivatives_built = Signal()
+
+
+def supports_derivatives(file_name: str) -> bool:
+    return os.path.splitext(file_name or "")[1].lower() in _SOURCE_EXTENSIONS
+
+
+def derivative_name(file_name: str, size: int) -> str:
+    root, _ = os.path.splitext(file_name.lstrip("/"))
+    return f"{root}.{size}w.webp"
+
+
+def derivatives_ready_field(field_name: str) -> str:
+    """Boolean column telling URL builders that ``field_name``'s derivatives exist in storage."""
+    return f"{field_name}_derivatives_ready"
+
+
+def mark_derivatives_ready(model, object_id: int, field_name: str, file_name: str) -> bool:
+    """Set the ready flag, but only while the row still points at ``file_name``.
+
+    ``updated_at`` moves too: conditional GETs version rows by it, and the payload
+    gains thumbnail/preview URLs.
+    """
+    updated = model._base_manager.filter(pk=object_id, **{field_name: file_name}).update(
+        **{derivatives_ready_field(field_name): True, "updated_at": timezone.now()}
+    )
+    if updated:
+        derivatives_built.send(sender=model, object_id=object_id, field_name=field_name)
+    return bool(updated)
+
+
+def derivative_file(file_field, size: int):
+    """Return a FieldFile for the ``size`` derivative of ``file_field``."""
+    return file_field.field.attr_class(file_field.instance, file_field.field, derivative_name(file_field.name, size))
+
+
+def _encode_webp(image: Image.Image) -> bytes:
+    output = BytesIO()
+    image.save(output, format="WEBP", quality=80, method=4)
+    return output.getvalue()
+
+
+def generate_image_derivatives(file_field) -> list[str]:
+    file_name = str(getattr(file_field, "name", "") or "")
+    if not file_name or not supports_derivatives(file_name):
+        return []
+
+    storage = file_field.storage
+    with storage.open(file_name, "rb") as source:
+        payload = source.read()
+    try:
+        with Image.open(BytesIO(payload)) as image:
+            image.load()
+            current = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (UnidentifiedImageError, OSError):
+        logger.warning("media derivative skipped, unreadable image name=%s", file_name)
+        return []
+
+    written = []
+    # Largest first, so each smaller size is resampled from the previous one.
+    for size in sorted(DERIVATIVE_SIZES, reverse=True):
+        current = current.copy()
+        current.thumbnail((size, size), Image.Resampling.LANCZOS)
+        name = derivative_name(file_name, size)
+        if storage.exists(name):
+            storage.delete(name)
+        written.append(storage.save(name, ContentFile(_encode_webp(current))))
+    return written
+
+
+def _generate_for_instance(model_label: str, object_id: int, field_name: str, expected_name: str) -> None:
+    model = apps.get_model(model_label)
+    instance = model._base_manager.filter(pk=object_id).only("pk", field_name).first()
+    if instance is None:
+        return
+    file_field = getattr(instance, field_name)
+    if file_field.name != expected_name:
+        return
+    if generate_image_derivatives(file_field):
+        mark_derivatives_ready(model, object_id, field_name, expected_name)
+
+
+def mark_pending_derivatives(instance, field_names) -> None:
+    """pre_save hook: remember fields that carry a fresh, not yet stored upload."""
+    pending = []
+    for field_name in field_names:
+        file_field = getattr(instance, field_name, None)
+        if file_field and not file_field._committed and supports_derivatives(file_field.name):
+            pending.append(field_name)
+            # The new upload has no derivatives until the background job stores them.
+            setattr(instance, derivatives_ready_field(field_name), False)
+    setattr(instance, _PENDING_ATTR, pending)
+
+
+def schedule_pending_derivatives(instance) -> None:
+    """post_save hook: build derivatives for uploads stored by this save."""
+    for field_name in getattr(instance, _PENDING_ATTR, None) or ():
+        submit_after_commit(
+            _generate_for_instance,
+            instance._meta.label,
+            instance.pk,
+            field_name,
+            getattr(instance, field_name).name,
+        )
+    setattr(instance, _PENDING_ATTR, [])
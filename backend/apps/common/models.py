@@ -7,3 +7,15 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class KeyRotationCheckpoint(models.Model):
+    """Last re-encrypted primary key per model for one encryption key (see ``apps.common.key_rotation``)."""
+
+    key_fingerprint = models.CharField(max_length=64)
+    model_label = models.CharField(max_length=100)
+    last_pk = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("key_fingerprint", "model_label")
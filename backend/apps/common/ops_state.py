@@ -20,6 +20,8 @@ JOB_STATUS_SPECS: dict[str, dict[str, object]] = {
     "certbot_dry_run": {"stale_after_seconds": 864000},
     "django_housekeeping": {"stale_after_seconds": 129600},
     "platform_metrics_refresh": {"stale_after_seconds": 7200},
+    "sla_sweep": {"stale_after_seconds": 1800},
+    "appointment_archive": {"stale_after_seconds": 129600},
 }
 
 ROLLBACK_REQUIRED_KEYS = (
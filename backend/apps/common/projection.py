@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+PROJECTION_CONTEXT_KEY = "field_projection"
+ALWAYS_PROJECTED_FIELDS = frozenset({"id"})
+
+
+def _split_names(raw: str) -> list[str]:
+    return [item.strip() for item in (raw or "").split(",") if item.strip()]
+
+
+def readable_field_names(serializer_class) -> tuple[str, ...]:
+    meta = serializer_class.Meta
+    write_only = {name for name, options in getattr(meta, "extra_kwargs", {}).items() if options.get("write_only")}
+    return tuple(name for name in meta.fields if name not in write_only)
+
+
+def resolve_field_projection(request, serializer_class) -> frozenset[str] | None:
+    """Parse ``?fields=a,b`` / ``?exclude=c`` into the set of fields to render.
+
+    ``None`` means no projection was requested and the full payload is rendered.
+    """
+    if request is None:
+        return None
+    params = request.query_params
+    requested = _split_names(params.get(FIELDS_PARAM, ""))
+    excluded = _split_names(params.get(EXCLUDE_PARAM, ""))
+    if not requested and not excluded:
+        return None
+
+    available = readable_field_names(serializer_class)
+    for param, names in ((FIELDS_PARAM, requested), (EXCLUDE_PARAM, excluded)):
+        unknown = sorted(set(names) - set(available))
+        if unknown:
+            raise ValidationError({param: f"Неизвестные поля: {', '.join(unknown)}."})
+
+    selected = set(requested) if requested else set(available)
+    selected.difference_update(excluded)
+    return frozenset(selected | ALWAYS_PROJECTED_FIELDS)
+
+
+def projection_includes(context: dict, field_name: str) -> bool:
+    projection = context.get(PROJECTION_CONTEXT_KEY)
+    return projection is None or field_name in projection
+
+
+class ProjectedFieldsMixin:
+    """Drop readable fields outside ``context["field_projection"]``.
+
+    Fields are removed before binding, so skipped ``SerializerMethodField``s
+    never run; in list serializers this happens once per page.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        projection = self.context.get(PROJECTION_CONTEXT_KEY)
+        if projection is None:
+            return fields
+        return {name: field for name, field in fields.items() if field.write_only or name in projection}
@@ -9,6 +9,7 @@ from django.core import signing
 from django.http import FileResponse, Http404, HttpResponse
 from django.urls import reverse
 
+from .media_derivatives import DERIVATIVE_SIZES, derivative_file, derivatives_ready_field, supports_derivatives
 from .storage_backends import media_storage_is_remote
 
 MEDIA_SCOPE_APPOINTMENT = "appointment"
@@ -32,21 +33,21 @@ def build_signed_media_url(
     file_name: str,
     request=None,
     base_url: str = "",
+    variant: int | None = None,
 ) -> str | None:
     normalized_name = (file_name or "").lstrip("/")
     if not normalized_name:
         return None
 
-    token = signing.dumps(
-        {
-            "scope": scope,
-            "object_id": int(object_id),
-            "field": field_name,
-            "name": normalized_name,
-        },
-        salt=settings.SECURE_MEDIA_SIGNING_SALT,
-        compress=True,
-    )
+    payload = {
+        "scope": scope,
+        "object_id": int(object_id),
+        "field": field_name,
+        "name": normalized_name,
+    }
+    if variant is not None:
+        payload["variant"] = int(variant)
+    token = signing.dumps(payload, salt=settings.SECURE_MEDIA_SIGNING_SALT, compress=True)
     path = f"{reverse('secure-media-download')}?{urlencode({'token': token})}"
     if request is not None:
         return request.build_absolute_uri(path)
@@ -100,9 +101,23 @@ def build_media_access_url(
     field_name: str,
     request=None,
     base_url: str = "",
+    variant: int | None = None,
+    derivatives_ready: bool | None = None,
 ) -> str | None:
+    if variant is not None and not supports_derivatives(getattr(file_field, "name", "")):
+        return None
     if media_storage_is_remote():
-        direct_url = build_storage_signed_media_url(file_field)
+        if variant is not None:
+            if derivatives_ready is None:
+                derivatives_ready = bool(
+                    getattr(getattr(file_field, "instance", None), derivatives_ready_field(field_name), False)
+                )
+            if not derivatives_ready:
+                # Presigning a derivative that is not stored yet would hand out a 404;
+                # without a variant URL the client shows the original.
+                return None
+        direct_field = derivative_file(file_field, variant) if variant is not None else file_field
+        direct_url = build_storage_signed_media_url(direct_field)
         if direct_url:
             return direct_url
     return build_signed_media_url(
@@ -112,10 +127,18 @@ def build_media_access_url(
         file_name=getattr(file_field, "name", ""),
         request=request,
         base_url=base_url,
+        variant=variant,
     )
 
 
-def build_appointment_media_url(request, appointment, field_name: str, *, base_url: str = "") -> str | None:
+def build_appointment_media_url(
+    request,
+    appointment,
+    field_name: str,
+    *,
+    base_url: str = "",
+    variant: int | None = None,
+) -> str | None:
     file_field = getattr(appointment, field_name, None)
     if not file_field or not getattr(file_field, "name", ""):
         return None
@@ -126,6 +149,8 @@ def build_appointment_media_url(request, appointment, field_name: str, *, base_u
         field_name=field_name,
         request=request,
         base_url=base_url,
+        variant=variant,
+        derivatives_ready=getattr(appointment, derivatives_ready_field(field_name), None),
     )
 
 
@@ -143,7 +168,7 @@ def build_user_media_url(request, user, field_name: str, *, base_url: str = "")
     )
 
 
-def build_message_file_url(request, message, *, base_url: str = "") -> str | None:
+def build_message_file_url(request, message, *, base_url: str = "", variant: int | None = None) -> str | None:
     file_field = getattr(message, "file", None)
     if not file_field or not getattr(file_field, "name", ""):
         return None
@@ -154,6 +179,7 @@ def build_message_file_url(request, message, *, base_url: str = "") -> str | Non
         field_name="file",
         request=request,
         base_url=base_url,
+        variant=variant,
     )
 
 
@@ -190,6 +216,7 @@ def resolve_signed_media_file(token: str):
     object_id = payload.get("object_id")
     field_name = payload.get("field")
     expected_name = str(payload.get("name") or "").lstrip("/")
+    variant = payload.get("variant")
 
     if scope not in {
         MEDIA_SCOPE_APPOINTMENT,
@@ -200,6 +227,8 @@ def resolve_signed_media_file(token: str):
         raise Http404("Unknown media scope")
     if not isinstance(object_id, int) or object_id <= 0 or not expected_name or not field_name:
         raise Http404("Invalid media payload")
+    if variant is not None and (scope not in {MEDIA_SCOPE_APPOINTMENT, MEDIA_SCOPE_MESSAGE} or variant not in DERIVATIVE_SIZES):
+        raise Http404("Unknown media variant")
 
     if scope == MEDIA_SCOPE_APPOINTMENT:
         file_field = _resolve_appointment_media(object_id, field_name)
@@ -213,6 +242,11 @@ def resolve_signed_media_file(token: str):
     current_name = str(getattr(file_field, "name", "") or "").lstrip("/")
     if current_name != expected_name:
         raise Http404("Media file changed")
+    if variant is not None:
+        derivative = derivative_file(file_field, variant)
+        # Uploads older than derivative generation fall back to the original.
+        if file_field.storage.exists(derivative.name):
+            return derivative
     return file_field
 
 
@@ -264,11 +298,14 @@ def _resolve_user_media(object_id: int, field_name: str):
 
 
 def _resolve_message_media(object_id: int, field_name: str):
-    from apps.chat.models import Message
+    from apps.chat.models import ArchivedMessage, Message
 
     if field_name != "file":
         raise Http404("Unknown message media field")
     message = Message.objects.filter(id=object_id, is_deleted=False).first()
+    if message is None:
+        # Archived messages keep their ids, so links signed before archival still resolve.
+        message = ArchivedMessage.objects.filter(id=object_id, is_deleted=False).first()
     if message is None:
         raise Http404("Message not found")
     file_field = getattr(message, "file", None)
@@ -8,7 +8,7 @@ from django.utils import timezone
 from apps.accounts.models import User
 from apps.appointments.models import Appointment, AppointmentStatusChoices
 
-from .models import DailyMetrics
+from .models import DailyMetrics, PlatformEvent
 
 
 def _day_bounds(target_date: date):
@@ -64,6 +64,34 @@ def compute_daily_metrics_for_date(target_date: date) -> DailyMetrics:
     avg_time_to_complete = (sum(completion_values) / len(completion_values)) if completion_values else 0.0
     conversion_new_to_paid = (paid_appointments / new_appointments) if new_appointments > 0 else 0.0
 
+    breach_payloads = list(
+        PlatformEvent.objects.filter(
+            event_type="sla.breached",
+            created_at__gte=start,
+            created_at__lt=end,
+        ).values_list("payload", flat=True)
+    )
+    # Only sweeper-detected breaches know their deadline-to-flag latency.
+    breach_latencies = [
+        float(payload["breach_latency_seconds"])
+        for payload in breach_payloads
+        if isinstance(payload, dict) and "breach_latency_seconds" in payload
+    ]
+    avg_sla_breach_latency = (sum(breach_latencies) / len(breach_latencies)) if breach_latencies else 0.0
+
+    transition_payloads = PlatformEvent.objects.filter(
+        event_type__in=("appointment.status_changed", "appointment.bulk_status_changed"),
+        created_at__gte=start,
+        created_at__lt=end,
+    ).values_list("payload", flat=True)
+    # Events written before lock_wait_ms was recorded are skipped.
+    lock_waits = [
+        float(payload["lock_wait_ms"])
+        for payload in transition_payloads
+        if isinstance(payload, dict) and "lock_wait_ms" in payload
+    ]
+    avg_transition_lock_wait_ms = (sum(lock_waits) / len(lock_waits)) if lock_waits else 0.0
+
     metrics, _ = DailyMetrics.objects.update_or_create(
         date=target_date,
         defaults={
@@ -75,6 +103,9 @@ def compute_daily_metrics_for_date(target_date: date) -> DailyMetrics:
             "avg_time_to_first_response": round(float(avg_time_to_first_response), 2),
             "avg_time_to_complete": round(float(avg_time_to_complete), 2),
             "conversion_new_to_paid": round(float(conversion_new_to_paid), 4),
+            "sla_breaches": len(breach_payloads),
+            "avg_sla_breach_latency": round(float(avg_sla_breach_latency), 2),
+            "avg_transition_lock_wait_ms": round(float(avg_transition_lock_wait_ms), 2),
         },
     )
     return metrics
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform', '0004_seed_sla_breach_rule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailymetrics',
+            name='avg_sla_breach_latency',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dailymetrics',
+            name='sla_breaches',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform', '0005_dailymetrics_sla_breaches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailymetrics',
+            name='avg_transition_lock_wait_ms',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
@@ -183,6 +183,9 @@ class DailyMetrics(models.Model):
     avg_time_to_first_response = models.FloatField(default=0.0)
     avg_time_to_complete = models.FloatField(default=0.0)
     conversion_new_to_paid = models.FloatField(default=0.0)
+    sla_breaches = models.PositiveIntegerField(default=0)
+    avg_sla_breach_latency = models.FloatField(default=0.0)
+    avg_transition_lock_wait_ms = models.FloatField(default=0.0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
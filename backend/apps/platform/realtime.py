@@ -22,6 +22,10 @@ def master_queue_group_name() -> str:
     return "masters.queue"
 
 
+def realtime_enabled() -> bool:
+    return get_channel_layer() is not None
+
+
 def _group_send(group_name: str, event_type: str, payload: dict) -> None:
     channel_layer = get_channel_layer()
     if channel_layer is None:
@@ -51,10 +55,25 @@ def _resolve_appointment_id(event) -> int | None:
     return None
 
 
+def _resolve_appointment_ids(event) -> list[int]:
+    # Batched events (bulk actions) list every affected appointment.
+    raw_ids = (event.payload or {}).get("appointment_ids")
+    if isinstance(raw_ids, list):
+        resolved = []
+        for raw_id in raw_ids:
+            try:
+                resolved.append(int(raw_id))
+            except (TypeError, ValueError):
+                continue
+        return resolved
+    appointment_id = _resolve_appointment_id(event)
+    return [appointment_id] if appointment_id else []
+
+
 def broadcast_platform_event(event) -> None:
     serialized = PlatformEventSerializer(event).data
-    appointment_id = _resolve_appointment_id(event)
-    if appointment_id:
+    appointment_ids = _resolve_appointment_ids(event)
+    for appointment_id in appointment_ids:
         _group_send(
             appointment_events_group_name(appointment_id),
             "appointment_event",
@@ -64,15 +83,16 @@ def broadcast_platform_event(event) -> None:
             },
         )
 
-    if appointment_id and event.event_type.startswith("chat."):
-        _group_send(
-            appointment_chat_group_name(appointment_id),
-            "chat_message",
-            {
-                "kind": "chat_event",
-                "event": serialized,
-            },
-        )
+    if event.event_type.startswith("chat.") or (event.payload or {}).get("messages_sent"):
+        for appointment_id in appointment_ids:
+            _group_send(
+                appointment_chat_group_name(appointment_id),
+                "chat_message",
+                {
+                    "kind": "chat_event",
+                    "event": serialized,
+                },
+            )
 
     if event.event_type.startswith(("appointment.", "chat.", "review.", "sla.")):
         _group_send(
@@ -85,6 +105,11 @@ def broadcast_platform_event(event) -> None:
         )
 
 
+def broadcast_appointment_delta(appointment_id: int, payload: dict) -> None:
+    # Consumers filter the payload per subscriber before sending it on.
+    _group_send(appointment_events_group_name(appointment_id), "appointment_delta", payload)
+
+
 def broadcast_notification(notification) -> None:
     unread_count = notification.user.notifications.filter(is_read=False).count()
     _group_send(
@@ -96,3 +121,16 @@ def broadcast_notification(notification) -> None:
             "unread_count": unread_count,
         },
     )
+
+
+def broadcast_chat_unread_state(appointment_id: int, unread_by_user: dict[int, int]) -> None:
+    for user_id, unread_count in unread_by_user.items():
+        _group_send(
+            notification_group_name(user_id),
+            "notification_message",
+            {
+                "kind": "chat_unread",
+                "appointment_id": appointment_id,
+                "unread_count": unread_count,
+            },
+        )
@@ -9,8 +9,9 @@ from django.apps import apps
 from django.db import transaction
 
 from apps.accounts.models import RoleChoices, User
-from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.appointments.models import Appointment
 from apps.appointments.services import transition_status
+from apps.appointments.transitions import TransitionConflict, is_allowed_transition
 
 from .models import Rule
 from .services import create_notification
@@ -163,32 +164,6 @@ def _build_context(event, entity) -> dict[str, Any]:
     return context
 
 
-def _allowed_status_transition(current_status: str, to_status: str) -> bool:
-    allowed_transitions = {
-        AppointmentStatusChoices.NEW: {AppointmentStatusChoices.IN_REVIEW, AppointmentStatusChoices.CANCELLED},
-        AppointmentStatusChoices.IN_REVIEW: {
-            AppointmentStatusChoices.AWAITING_PAYMENT,
-            AppointmentStatusChoices.DECLINED_BY_MASTER,
-            AppointmentStatusChoices.CANCELLED,
-        },
-        AppointmentStatusChoices.AWAITING_PAYMENT: {
-            AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED,
-            AppointmentStatusChoices.DECLINED_BY_MASTER,
-            AppointmentStatusChoices.CANCELLED,
-        },
-        AppointmentStatusChoices.PAYMENT_PROOF_UPLOADED: {
-            AppointmentStatusChoices.PAID,
-            AppointmentStatusChoices.CANCELLED,
-        },
-        AppointmentStatusChoices.PAID: {AppointmentStatusChoices.IN_PROGRESS, AppointmentStatusChoices.CANCELLED},
-        AppointmentStatusChoices.IN_PROGRESS: {AppointmentStatusChoices.COMPLETED, AppointmentStatusChoices.CANCELLED},
-        AppointmentStatusChoices.COMPLETED: set(),
-        AppointmentStatusChoices.DECLINED_BY_MASTER: set(),
-        AppointmentStatusChoices.CANCELLED: set(),
-    }
-    return to_status in allowed_transitions.get(current_status, set())
-
-
 def _action_recipients(action: dict[str, Any], event, entity, appointment: Appointment | None) -> list[User]:
     target = action.get("target", "")
     if target == "actor" and event.actor:
@@ -255,12 +230,16 @@ def _execute_action(rule: Rule, action: dict[str, Any], event, entity, context:
         to_status = action.get("to_status")
         if not to_status or appointment.status == to_status:
             return
-        if not _allowed_status_transition(appointment.status, to_status):
+        if not is_allowed_transition(appointment.status, to_status):
             return
         actor = event.actor or appointment.assigned_master or appointment.client
         if actor is None:
             return
-        transition_status(appointment, actor, to_status, note=f"[rule:{rule.name}] auto change")
+        try:
+            transition_status(appointment, actor, to_status, note=f"[rule:{rule.name}] auto change")
+        except TransitionConflict:
+            # Someone else moved the appointment first; the rule no longer applies.
+            pass
         return
 
     if action_type in {"assign_tag", "assign_flag"}:
@@ -146,4 +146,7 @@ class DailyMetricsSerializer(serializers.ModelSerializer):
             "avg_time_to_first_response",
             "avg_time_to_complete",
             "conversion_new_to_paid",
+            "sla_breaches",
+            "avg_sla_breach_latency",
+            "avg_transition_lock_wait_ms",
         )
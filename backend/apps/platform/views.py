@@ -26,15 +26,19 @@ from .models import DailyMetrics, PlatformEvent, Rule
 
 RULE_EVENT_TYPES = (
     ("appointment.created", "Создана заявка"),
+    ("appointment.batch_created", "Пакетная подача заявок сервисным центром"),
+    ("appointment.dispatch_offered", "Заявка предложена мастеру"),
     ("appointment.master_taken", "Мастер взял заявку"),
     ("appointment.price_set", "Выставлена цена"),
     ("appointment.payment_marked", "Оплата отмечена"),
     ("appointment.payment_confirmed", "Оплата подтверждена"),
     ("appointment.work_started", "Работа начата"),
     ("appointment.work_completed", "Работа завершена"),
+    ("appointment.bulk_status_changed", "Массовая смена статуса заявок"),
     ("appointment.deleted_by_admin", "Заявка удалена админом"),
     ("chat.message_sent", "Отправлено сообщение в чат"),
     ("chat.message_deleted", "Удалено сообщение в чате"),
+    ("chat.bulk_message_sent", "Массовая рассылка в чаты заявок"),
     ("review.master_created", "Клиент оставил отзыв мастеру"),
     ("review.client_created", "Мастер оставил отзыв клиенту"),
     ("sla.breached", "Нарушен SLA"),
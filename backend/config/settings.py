@@ -179,8 +179,25 @@ ADMIN_API_MAX_LIST_LIMIT = int(os.getenv("ADMIN_API_MAX_LIST_LIMIT", "500"))
 API_LIST_MAX_OFFSET = int(os.getenv("API_LIST_MAX_OFFSET", "5000"))
 CHAT_MESSAGES_LIST_LIMIT = int(os.getenv("CHAT_MESSAGES_LIST_LIMIT", "100"))
 CHAT_MESSAGES_MAX_LIST_LIMIT = int(os.getenv("CHAT_MESSAGES_MAX_LIST_LIMIT", "200"))
+CHAT_SYNC_MAX_MESSAGES = int(os.getenv("CHAT_SYNC_MAX_MESSAGES", "500"))
+CHAT_SPAM_SCORE_THRESHOLD = float(os.getenv("CHAT_SPAM_SCORE_THRESHOLD", "1.0"))
+CHAT_MODERATION_LEXICON_RECHECK_SECONDS = int(os.getenv("CHAT_MODERATION_LEXICON_RECHECK_SECONDS", "30"))
+QUICK_REPLY_CACHE_SECONDS = int(os.getenv("QUICK_REPLY_CACHE_SECONDS", "86400"))
+QUICK_REPLY_LOCAL_CACHE_SIZE = int(os.getenv("QUICK_REPLY_LOCAL_CACHE_SIZE", "512"))
 APPOINTMENT_EVENTS_LIST_LIMIT = int(os.getenv("APPOINTMENT_EVENTS_LIST_LIMIT", "100"))
 APPOINTMENT_EVENTS_MAX_LIST_LIMIT = int(os.getenv("APPOINTMENT_EVENTS_MAX_LIST_LIMIT", "200"))
+FAST_LIST_RENDERING = _env_bool("FAST_LIST_RENDERING", True)
+DASHBOARD_SUMMARY_CACHE_SECONDS = int(os.getenv("DASHBOARD_SUMMARY_CACHE_SECONDS", "30"))
+BACKGROUND_TASKS_EAGER = _env_bool("BACKGROUND_TASKS_EAGER", False)
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", "2"))
+APPOINTMENT_DISPATCH_ENABLED = _env_bool("APPOINTMENT_DISPATCH_ENABLED", False)
+APPOINTMENT_DISPATCH_LEASE_SECONDS = int(os.getenv("APPOINTMENT_DISPATCH_LEASE_SECONDS", "90"))
+APPOINTMENT_DISPATCH_MAX_OFFERS = int(os.getenv("APPOINTMENT_DISPATCH_MAX_OFFERS", "3"))
+APPOINTMENT_DISPATCH_MAX_WORKLOAD = int(os.getenv("APPOINTMENT_DISPATCH_MAX_WORKLOAD", "5"))
+APPOINTMENT_DISPATCH_SWEEP_SECONDS = int(os.getenv("APPOINTMENT_DISPATCH_SWEEP_SECONDS", "15"))
+APPOINTMENT_ARCHIVE_AFTER_DAYS = int(os.getenv("APPOINTMENT_ARCHIVE_AFTER_DAYS", "180"))
+WHOLESALE_BATCH_MAX_ITEMS = int(os.getenv("WHOLESALE_BATCH_MAX_ITEMS", "50"))
+APPOINTMENT_MULTI_GET_MAX_IDS = int(os.getenv("APPOINTMENT_MULTI_GET_MAX_IDS", "100"))
 
 LANGUAGE_CODE = "ru-ru"
 TIME_ZONE = "Europe/Berlin"
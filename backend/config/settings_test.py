@@ -29,3 +29,5 @@ CACHES = {
         "LOCATION": "frpclient-tests",
     }
 }
+
+BACKGROUND_TASKS_EAGER = True
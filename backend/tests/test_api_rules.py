@@ -13,8 +13,8 @@ from apps.accounts.models import MasterLevelChoices, RoleChoices, User, Wholesal
 from apps.accounts.notifications import notify_masters_about_new_appointment
 from apps.accounts.services import recalculate_client_stats
 from apps.appointments.models import Appointment, AppointmentEvent, AppointmentEventType, AppointmentStatusChoices
-from apps.chat.models import Message
-from apps.platform.models import Notification
+from apps.chat.models import Message, ReadState
+from apps.platform.models import Notification, PlatformEvent
 from apps.reviews.models import Review, ReviewTypeChoices
 from upload_helpers import make_test_heic_upload, make_test_image_upload
 
@@ -798,7 +798,7 @@ def test_client_can_repeat_appointment(client_user):
         status=AppointmentStatusChoices.COMPLETED,
     )
 
-    with patch("apps.appointments.client_actions.notify_masters_about_new_appointment") as notify_mock:
+    with patch("apps.accounts.notifications.notify_masters_about_new_appointment") as notify_mock:
         response = auth_as(client_user).post(f"/api/appointments/{source.id}/repeat/")
         assert response.status_code == 201
         notify_mock.assert_called_once()
@@ -900,7 +900,7 @@ def test_create_appointment_calls_master_telegram_notifications(client_user):
         "rustdesk_password": "test-pass",
     }
 
-    with patch("apps.appointments.views.notify_masters_about_new_appointment") as notify_mock:
+    with patch("apps.accounts.notifications.notify_masters_about_new_appointment") as notify_mock:
         response = auth_as(client_user).post("/api/appointments/", payload, format="json")
         assert response.status_code == 201
         notify_mock.assert_called_once()
@@ -1470,6 +1470,67 @@ def test_master_bulk_send_template_message(master_user, client_user):
     assert Message.objects.filter(appointment=appointment, sender=master_user, text__contains="продолжаю").exists()
 
 
+@pytest.mark.django_db
+def test_master_bulk_complete_work_batches_side_effects(
+    master_user,
+    client_user,
+    client_user_2,
+    django_capture_on_commit_callbacks,
+):
+    client_user.telegram_id = 555001
+    client_user.save(update_fields=["telegram_id", "updated_at"])
+    in_progress = [
+        Appointment.objects.create(
+            client=owner,
+            assigned_master=master_user,
+            brand="Honor",
+            model=f"B{index}",
+            lock_type="PIN",
+            has_pc=True,
+            description="desc",
+            status=AppointmentStatusChoices.IN_PROGRESS,
+        )
+        for index, owner in enumerate((client_user, client_user, client_user_2))
+    ]
+    waiting = Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Honor",
+        model="W",
+        lock_type="PIN",
+        has_pc=True,
+        description="desc",
+        status=AppointmentStatusChoices.PAID,
+    )
+    ids = [item.id for item in in_progress]
+
+    with patch("apps.accounts.notifications.send_telegram_message", return_value=True) as send_mock:
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auth_as(master_user).post(
+                "/api/appointments/bulk-action/",
+                {
+                    "appointment_ids": [*ids, waiting.id],
+                    "action": "complete_work",
+                    "message_text": "Готово",
+                },
+                format="json",
+            )
+
+    assert response.status_code == 200
+    assert response.data["processed_ids"] == ids
+    assert response.data["skipped"] == [{"appointment_id": waiting.id, "reason": "status_must_be_in_progress"}]
+    assert set(Appointment.objects.filter(id__in=ids).values_list("status", flat=True)) == {AppointmentStatusChoices.COMPLETED}
+    assert not Appointment.objects.filter(id__in=ids, completed_at__isnull=True).exists()
+    assert AppointmentEvent.objects.filter(appointment_id__in=ids, event_type=AppointmentEventType.STATUS_CHANGED).count() == 3
+    assert Message.objects.filter(appointment_id__in=ids, text="Готово").count() == 3
+    assert PlatformEvent.objects.filter(event_type="appointment.bulk_status_changed").count() == 1
+    assert not PlatformEvent.objects.filter(event_type="appointment.status_changed").exists()
+    assert send_mock.call_count == 1
+    client_user.client_stats.refresh_from_db()
+    assert client_user.client_stats.completed_orders_count == 2
+    assert ReadState.objects.get(appointment=in_progress[0], user=client_user).unread_count == 1
+
+
 @pytest.mark.django_db
 def test_auto_wholesale_priority_from_client_stats(client_user):
     client_user.is_service_center = True
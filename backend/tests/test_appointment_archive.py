@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import (
+    Appointment,
+    AppointmentEvent,
+    AppointmentEventType,
+    AppointmentStatusChoices,
+    ArchivedAppointmentEvent,
+)
+from apps.chat.models import ArchivedMessage, Message
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def participants(db):
+    client_user = User.objects.create_user(username="archive-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="archive-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    return client_user, master_user
+
+
+def _appointment_with_history(client_user: User, master_user: User, status: str, *, age_days: int) -> Appointment:
+    appointment = Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="PIN",
+        has_pc=True,
+        description="archive",
+        status=status,
+    )
+    AppointmentEvent.objects.create(
+        appointment=appointment,
+        actor=master_user,
+        event_type=AppointmentEventType.STATUS_CHANGED,
+        from_status=AppointmentStatusChoices.IN_PROGRESS,
+        to_status=status,
+    )
+    Message.objects.create(appointment=appointment, sender=client_user, text="Спасибо")
+    Message.objects.create(appointment=appointment, sender=master_user, text="Готово")
+    old = timezone.now() - timedelta(days=age_days)
+    Appointment.objects.filter(id=appointment.id).update(updated_at=old)
+    Message.objects.filter(appointment=appointment).update(created_at=old, updated_at=old)
+    return appointment
+
+
+@pytest.mark.django_db
+def test_archive_moves_closed_history_and_endpoints_read_through(participants):
+    client_user, master_user = participants
+    closed = _appointment_with_history(client_user, master_user, AppointmentStatusChoices.COMPLETED, age_days=200)
+    recent = _appointment_with_history(client_user, master_user, AppointmentStatusChoices.COMPLETED, age_days=10)
+    active = _appointment_with_history(client_user, master_user, AppointmentStatusChoices.IN_PROGRESS, age_days=400)
+
+    api = auth_as(client_user)
+    events_before = api.get(f"/api/appointments/{closed.id}/events/").data
+    messages_before = api.get(f"/api/appointments/{closed.id}/messages/").data
+    etag_before = api.get(f"/api/appointments/{closed.id}/messages/")["ETag"]
+
+    out = StringIO()
+    call_command("archive_closed_appointments", "--older-than-days", "180", "--batch-size", "1", stdout=out)
+    assert "Archived 1 appointments (1 events, 2 messages)" in out.getvalue()
+
+    closed.refresh_from_db()
+    assert closed.archived_at is not None
+    assert not AppointmentEvent.objects.filter(appointment=closed).exists()
+    assert not Message.objects.filter(appointment=closed).exists()
+    assert ArchivedMessage.objects.filter(appointment=closed).count() == 2
+    assert ArchivedAppointmentEvent.objects.filter(appointment=closed).count() == 1
+    for untouched in (recent, active):
+        untouched.refresh_from_db()
+        assert untouched.archived_at is None
+        assert Message.objects.filter(appointment=untouched).count() == 2
+
+    assert api.get(f"/api/appointments/{closed.id}/events/").data == events_before
+    assert api.get(f"/api/appointments/{closed.id}/messages/").data == messages_before
+    assert api.get(f"/api/appointments/{closed.id}/messages/", HTTP_IF_NONE_MATCH=etag_before).status_code == 200
+
+    response = api.post(f"/api/appointments/{closed.id}/messages/", {"text": "Ещё вопрос"}, format="json")
+    assert response.status_code == 201
+
+    closed.refresh_from_db()
+    assert closed.archived_at is None
+    assert not ArchivedMessage.objects.filter(appointment=closed).exists()
+    restored = list(Message.objects.filter(appointment=closed).order_by("id"))
+    assert [message.id for message in restored[:2]] == [item["id"] for item in messages_before]
+    assert restored[0].created_at < timezone.now() - timedelta(days=100)
+    assert AppointmentEvent.objects.filter(appointment=closed).count() == 1
+
+
+@pytest.mark.django_db
+def test_history_moves_in_bounded_chunks_and_keeps_timestamps(participants, monkeypatch):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from apps.appointments import archive
+
+    client_user, master_user = participants
+    closed = _appointment_with_history(client_user, master_user, AppointmentStatusChoices.COMPLETED, age_days=200)
+    for index in range(3):
+        Message.objects.create(appointment=closed, sender=client_user, text=f"m{index}")
+    old = timezone.now() - timedelta(days=200)
+    Message.objects.filter(appointment=closed).update(created_at=old, updated_at=old)
+    stamps = dict(Message.objects.filter(appointment=closed).values_list("id", "updated_at"))
+    monkeypatch.setattr(archive, "_MOVE_CHUNK_SIZE", 2)
+
+    with CaptureQueriesContext(connection) as archived:
+        assert archive.archive_appointment_batch([closed.id], older_than_days=180)["messages"] == 5
+    inserts = [query["sql"] for query in archived.captured_queries if 'INSERT INTO "chat_archivedmessage"' in query["sql"]]
+    assert len(inserts) == 3
+
+    with CaptureQueriesContext(connection) as restored:
+        assert archive.restore_archived_appointment(Appointment.objects.get(id=closed.id)) is True
+    # No second pass re-stamping auto_now columns.
+    assert not [query["sql"] for query in restored.captured_queries if query["sql"].startswith('UPDATE "chat_message"')]
+    assert dict(Message.objects.filter(appointment=closed).values_list("id", "updated_at")) == stamps
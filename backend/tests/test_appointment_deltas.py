@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.deltas import DELTA_KIND, render_delta, visible_delta
+from apps.appointments.models import Appointment, AppointmentStatusChoices, LockTypeChoices
+from apps.appointments.services import sweep_sla_breaches, take_appointment
+from config.asgi import application
+
+
+def _login_and_get_session_cookie(username: str, password: str) -> str:
+    client = Client()
+    response = client.post(
+        "/api/auth/login/",
+        data=json.dumps({"username": username, "password": password}),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+
+def _cookie_headers(session_cookie: str) -> list[tuple[bytes, bytes]]:
+    return [(b"cookie", f"{settings.SESSION_COOKIE_NAME}={session_cookie}".encode("utf-8"))]
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def delta_users(db):
+    client_user = User.objects.create_user(username="delta-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="delta-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    other_master = User.objects.create_user(
+        username="delta-other-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    admin_user = User.objects.create_user(username="delta-admin", password="x", role=RoleChoices.ADMIN, is_staff=True)
+    return client_user, master_user, other_master, admin_user
+
+
+def _create_appointment(client_user: User, **extra) -> Appointment:
+    return Appointment.objects.create(
+        client=client_user,
+        brand="Samsung",
+        model="A52",
+        lock_type=LockTypeChoices.GOOGLE,
+        has_pc=True,
+        description="delta",
+        **extra,
+    )
+
+
+@pytest.fixture
+def broadcasts():
+    sent: list[tuple[int, dict]] = []
+    with patch(
+        "apps.appointments.deltas.broadcast_appointment_delta",
+        side_effect=lambda appointment_id, payload: sent.append((appointment_id, payload)),
+    ):
+        yield sent
+
+
+@pytest.mark.django_db
+def test_save_bumps_version_and_publishes_only_changed_fields(delta_users, broadcasts, django_capture_on_commit_callbacks):
+    client_user, master_user, _, _ = delta_users
+    appointment = _create_appointment(client_user)
+    assert appointment.version == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        take_appointment(appointment.id, master_user)
+
+    # Taking assigns the master and moves the status in one conditional UPDATE.
+    appointment.refresh_from_db()
+    assert appointment.version == 2
+    assert len(broadcasts) == 1
+    appointment_id, payload = broadcasts[0]
+    assert appointment_id == appointment.id
+    assert payload["kind"] == DELTA_KIND
+    assert payload["version"] == 2
+    assert payload["changes"]["status"] == AppointmentStatusChoices.IN_REVIEW
+    assert payload["changes"]["master_username"] == master_user.username
+    assert payload["changes"]["taken_at"] is not None
+    assert {"brand", "model", "description", "rustdesk_id"}.isdisjoint(payload["changes"])
+    assert payload["stale_fields"] == []
+
+    # A bare save() only moves updated_at, and spends no extra query on the new version.
+    with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as captured:
+        appointment.save()
+    assert appointment.version == 3
+    assert [query["sql"] for query in captured.captured_queries if query["sql"].startswith("SELECT")] == []
+    assert broadcasts[-1][1]["version"] == 3
+    assert set(broadcasts[-1][1]["changes"]) == {"updated_at"}
+
+
+@pytest.mark.django_db
+def test_client_access_changes_are_reported_as_stale_without_values(delta_users, broadcasts, django_capture_on_commit_callbacks):
+    client_user, _, _, _ = delta_users
+    appointment = _create_appointment(client_user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        appointment.rustdesk_id = "987654321"
+        appointment.save(update_fields=["rustdesk_id", "updated_at"])
+
+    _, payload = broadcasts[-1]
+    assert payload["stale_fields"] == ["rustdesk_id"]
+    assert "rustdesk_id" not in payload["changes"]
+    assert "987654321" not in str(payload)
+
+
+@pytest.mark.django_db
+def test_update_writers_bump_version_and_publish(delta_users, broadcasts, django_capture_on_commit_callbacks):
+    client_user, master_user, _, _ = delta_users
+    appointment = _create_appointment(client_user)
+    take_appointment(appointment.id, master_user)
+    broadcasts.clear()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = auth_as(client_user).post(f"/api/appointments/{appointment.id}/messages/", {"text": "Привет"}, format="json")
+    assert response.status_code == 201
+    version = Appointment.objects.values_list("version", flat=True).get(id=appointment.id)
+    assert version == 3
+    payload = [payload for _, payload in broadcasts if payload["changes"].get("latest_message_text")][-1]
+    assert payload["version"] == version
+    assert payload["changes"]["latest_message_text"] == "Привет"
+
+    Appointment.objects.filter(id=appointment.id).update(
+        status=AppointmentStatusChoices.IN_PROGRESS,
+        completion_deadline_at=timezone.now() - timedelta(minutes=1),
+    )
+    broadcasts.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        sweep_sla_breaches()
+    payload = broadcasts[-1][1]
+    assert payload["changes"]["sla_breached"] is True
+    assert payload["version"] == Appointment.objects.values_list("version", flat=True).get(id=appointment.id) == version + 1
+
+
+@pytest.mark.django_db
+def test_visible_delta_filters_per_subscriber(delta_users):
+    client_user, master_user, other_master, admin_user = delta_users
+    appointment = _create_appointment(client_user)
+    appointment.rustdesk_id = "123"
+    payload = render_delta(appointment, ["status"], ["rustdesk_id"])
+
+    for user in (client_user, admin_user):
+        delta = visible_delta(payload, user)
+        assert "audience" not in delta
+        assert delta["changes"] == {"status": AppointmentStatusChoices.NEW}
+        assert delta["stale_fields"] == ["rustdesk_id"]
+
+    # Any master may watch a NEW card, but client access is not theirs to refetch.
+    assert visible_delta(payload, other_master)["stale_fields"] == []
+
+    appointment.assigned_master = master_user
+    appointment.status = AppointmentStatusChoices.IN_REVIEW
+    payload = render_delta(appointment, ["status", "assigned_master"])
+    assert visible_delta(payload, master_user)["changes"]["master_username"] == master_user.username
+    revoked = visible_delta(payload, other_master)
+    assert revoked["access_revoked"] is True
+    assert revoked["changes"] == {}
+    assert revoked["version"] == payload["version"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_appointment_events_consumer_pushes_filtered_delta():
+    client_user = await sync_to_async(User.objects.create_user)(
+        username="ws-delta-client", password="x", role=RoleChoices.CLIENT
+    )
+    appointment = await sync_to_async(_create_appointment)(client_user)
+    session_cookie = await sync_to_async(_login_and_get_session_cookie)(client_user.username, "x")
+    communicator = WebsocketCommunicator(
+        application,
+        f"/ws/appointments/{appointment.id}/events/",
+        headers=_cookie_headers(session_cookie),
+    )
+    connected, _ = await communicator.connect()
+    assert connected is True
+
+    appointment.description = "обновлено"
+    await sync_to_async(appointment.save)(update_fields=["description", "updated_at"])
+
+    payload = await communicator.receive_json_from(timeout=2)
+    assert payload["kind"] == DELTA_KIND
+    assert payload["version"] == 2
+    assert payload["changes"]["description"] == "обновлено"
+    assert "audience" not in payload
+
+    await communicator.disconnect()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import time
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import MasterStats, RoleChoices, User
+from apps.appointments import dispatch
+from apps.appointments.models import Appointment
+from apps.platform.models import Notification, PlatformEvent
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def _master(username: str, *, score: int, workload: int = 0) -> User:
+    master = User.objects.create_user(
+        username=username,
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    MasterStats.objects.create(user=master, master_score=score, active_workload=workload)
+    return master
+
+
+def _expire_lease(appointment_id: int) -> None:
+    state = dispatch.get_dispatch_state(appointment_id)
+    state["lease_until"] = time.time() - 1
+    dispatch._save_state(appointment_id, state)
+
+
+@pytest.fixture
+def dispatch_settings(settings):
+    settings.APPOINTMENT_DISPATCH_ENABLED = True
+    settings.APPOINTMENT_DISPATCH_MAX_OFFERS = 2
+    settings.APPOINTMENT_DISPATCH_MAX_WORKLOAD = 3
+    cache.clear()
+    return settings
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username="dispatch-client", password="x", role=RoleChoices.CLIENT)
+
+
+def _create_appointment(client_user: User) -> int:
+    response = auth_as(client_user).post(
+        "/api/appointments/",
+        {
+            "brand": "Samsung",
+            "model": "A50",
+            "lock_type": "PIN",
+            "has_pc": True,
+            "contact_phone": "+79001112233",
+            "description": "dispatch",
+            "rustdesk_id": "123456789",
+            "rustdesk_password": "pass",
+        },
+        format="json",
+    )
+    assert response.status_code == 201
+    return response.data["id"]
+
+
+@pytest.mark.django_db
+def test_dispatch_offers_best_master_and_blocks_others_during_lease(dispatch_settings, client_user):
+    best = _master("dispatch-best", score=90)
+    other = _master("dispatch-other", score=60)
+    _master("dispatch-busy", score=99, workload=3)
+
+    with patch("apps.accounts.notifications.notify_masters_about_new_appointment") as broadcast_mock:
+        appointment_id = _create_appointment(client_user)
+    broadcast_mock.assert_not_called()
+
+    assert dispatch.active_lease_master_id(appointment_id) == best.id
+    assert Notification.objects.filter(user=best, payload__appointment_id=appointment_id).exists()
+    assert PlatformEvent.objects.filter(event_type="appointment.dispatch_offered", entity_id=str(appointment_id)).exists()
+
+    blocked = auth_as(other).post(f"/api/appointments/{appointment_id}/take/")
+    assert blocked.status_code == 403
+
+    taken = auth_as(best).post(f"/api/appointments/{appointment_id}/take/")
+    assert taken.status_code == 200
+    event = PlatformEvent.objects.get(event_type="appointment.master_taken", entity_id=str(appointment_id))
+    assert event.payload["dispatch_via_offer"] is True
+    assert event.payload["dispatch_attempts"] == 1
+    assert event.payload["dispatch_latency_ms"] >= 0
+    assert dispatch.get_dispatch_state(appointment_id) is None
+
+
+@pytest.mark.django_db
+def test_expired_offer_moves_to_next_master_then_broadcasts(
+    dispatch_settings,
+    client_user,
+    django_capture_on_commit_callbacks,
+):
+    best = _master("dispatch-first", score=90)
+    second = _master("dispatch-second", score=60)
+    _master("dispatch-third", score=30)
+    appointment_id = _create_appointment(client_user)
+    assert dispatch.active_lease_master_id(appointment_id) == best.id
+
+    _expire_lease(appointment_id)
+    call_command("dispatch_new_appointments")
+    assert dispatch.active_lease_master_id(appointment_id) == second.id
+
+    _expire_lease(appointment_id)
+    with (
+        patch("apps.accounts.notifications.notify_masters_about_new_appointment") as broadcast_mock,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        call_command("dispatch_new_appointments")
+    broadcast_mock.assert_called_once()
+    assert dispatch.active_lease_master_id(appointment_id) is None
+    assert dispatch.get_dispatch_state(appointment_id)["broadcast"] is True
+
+    taken = auth_as(best).post(f"/api/appointments/{appointment_id}/take/")
+    assert taken.status_code == 200
+    assert Appointment.objects.get(id=appointment_id).assigned_master_id == best.id
+
+
+@pytest.mark.django_db
+def test_next_candidate_is_ranked_in_sql_one_row_at_a_time(dispatch_settings, client_user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from apps.accounts.models import MasterLevelChoices
+
+    junior = _master("dispatch-junior", score=70, workload=1)
+    senior = _master("dispatch-senior", score=70, workload=1)
+    senior.master_level = MasterLevelChoices.SENIOR
+    senior.save(update_fields=["master_level"])
+    for index in range(5):
+        _master(f"dispatch-weak-{index}", score=10)
+    appointment = Appointment.objects.create(
+        client=client_user, brand="Samsung", model="A50", lock_type="PIN", has_pc=True
+    )
+
+    with CaptureQueriesContext(connection) as captured:
+        assert dispatch._best_candidate(appointment, []) == senior
+    master_queries = [query["sql"] for query in captured.captured_queries if 'FROM "accounts_user"' in query["sql"]]
+    assert len(master_queries) == 1
+    assert "LIMIT 1" in master_queries[0]
+
+    assert dispatch._best_candidate(appointment, [senior.id]) == junior
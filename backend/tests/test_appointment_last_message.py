@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def participants(db):
+    client_user = User.objects.create_user(username="preview-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="preview-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    return client_user, master_user
+
+
+def _appointment(client_user: User, master_user: User) -> Appointment:
+    return Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="PIN",
+        has_pc=True,
+        description="preview",
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+
+
+@pytest.mark.django_db
+def test_last_message_columns_follow_create_and_delete(participants):
+    client_user, master_user = participants
+    appointment = _appointment(client_user, master_user)
+
+    first = auth_as(client_user).post(
+        f"/api/appointments/{appointment.id}/messages/", {"text": "Первое"}, format="json"
+    )
+    second = auth_as(master_user).post(
+        f"/api/appointments/{appointment.id}/messages/", {"text": "  Второе  "}, format="json"
+    )
+    assert first.status_code == 201 and second.status_code == 201
+
+    appointment.refresh_from_db()
+    assert appointment.last_message_id == second.data["id"]
+    assert appointment.last_message_preview == "Второе"
+    assert appointment.last_message_sender_role == RoleChoices.MASTER
+    assert appointment.last_message_at is not None
+
+    # An older message arriving late must not move the preview backwards.
+    from apps.chat.previews import record_latest_messages
+
+    record_latest_messages([Message.objects.get(id=first.data["id"])])
+    appointment.refresh_from_db()
+    assert appointment.last_message_id == second.data["id"]
+
+    assert auth_as(master_user).delete(f"/api/messages/{second.data['id']}/").status_code == 204
+    appointment.refresh_from_db()
+    assert appointment.last_message_id == first.data["id"]
+    assert appointment.last_message_preview == "Первое"
+    assert appointment.last_message_sender_username == client_user.username
+
+    assert auth_as(client_user).delete(f"/api/messages/{first.data['id']}/").status_code == 204
+    appointment.refresh_from_db()
+    assert appointment.last_message_id is None
+    assert appointment.last_message_preview == ""
+
+
+@pytest.mark.django_db
+def test_appointment_lists_render_previews_without_message_queries(participants):
+    client_user, master_user = participants
+    for index in range(5):
+        appointment = _appointment(client_user, master_user)
+        Message.objects.create(appointment=appointment, sender=client_user, text=f"Сообщение {index}")
+
+    for path in ("/api/appointments/my/", "/api/appointments/active/"):
+        user = client_user if path.endswith("my/") else master_user
+        with CaptureQueriesContext(connection) as captured:
+            response = auth_as(user).get(path)
+        assert response.status_code == 200
+        assert {item["latest_message_text"] for item in response.data} == {f"Сообщение {index}" for index in range(5)}
+        # Unread counts may still use one grouped query; previews must not touch message rows.
+        assert not [item for item in captured.captured_queries if '"chat_message"."text"' in item["sql"]]
+
+
+@pytest.mark.django_db
+def test_bulk_message_updates_previews_in_one_statement(participants):
+    from apps.appointments.services import run_master_bulk_action
+
+    client_user, master_user = participants
+    appointments = [_appointment(client_user, master_user) for _ in range(3)]
+
+    with CaptureQueriesContext(connection) as captured:
+        processed, _ = run_master_bulk_action(
+            master=master_user,
+            appointment_ids=[item.id for item in appointments],
+            message_text="Работаю по заявке",
+        )
+    assert len(processed) == 3
+    preview_updates = [
+        item for item in captured.captured_queries if item["sql"].startswith('UPDATE "appointments_appointment"')
+    ]
+    assert len(preview_updates) == 1
+    for appointment in appointments:
+        appointment.refresh_from_db()
+        assert appointment.last_message_preview == "Работаю по заявке"
+        assert appointment.last_message_sender_role == RoleChoices.MASTER
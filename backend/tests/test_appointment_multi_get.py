@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def multi_get_data(db):
+    client_user = User.objects.create_user(username="multi-client", password="x", role=RoleChoices.CLIENT)
+    other_client = User.objects.create_user(username="multi-other-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="multi-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+
+    def create(client, **extra):
+        return Appointment.objects.create(
+            client=client,
+            brand="Samsung",
+            model="A52",
+            lock_type="GOOGLE",
+            has_pc=True,
+            description="multi",
+            rustdesk_id="123456",
+            rustdesk_password="secret",
+            **extra,
+        )
+
+    own_new = create(client_user)
+    own_assigned = create(client_user, assigned_master=master_user, status=AppointmentStatusChoices.IN_PROGRESS)
+    foreign_new = create(other_client)
+    foreign_assigned = create(other_client, assigned_master=master_user, status=AppointmentStatusChoices.IN_REVIEW)
+    Message.objects.create(appointment=own_assigned, sender=master_user, text="Готово")
+    return client_user, master_user, own_new, own_assigned, foreign_new, foreign_assigned
+
+
+@pytest.mark.django_db
+def test_multi_get_returns_rows_in_request_order_with_per_id_errors(multi_get_data):
+    client_user, _, own_new, own_assigned, foreign_new, _ = multi_get_data
+    missing_id = foreign_new.id + 1000
+
+    response = auth_as(client_user).get(
+        "/api/appointments/",
+        {"ids": f"{own_assigned.id},{foreign_new.id},{missing_id},{own_new.id},{own_assigned.id}"},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [item["id"] for item in payload["results"]] == [own_assigned.id, own_new.id]
+    assert payload["results"][0]["unread_count"] == 1
+    assert payload["results"][0]["rustdesk_id"] == ""
+    assert payload["errors"] == [
+        {"id": foreign_new.id, "code": "forbidden", "detail": "Нет доступа к заявке"},
+        {"id": missing_id, "code": "not_found", "detail": "Заявка не найдена"},
+    ]
+
+
+@pytest.mark.django_db
+def test_multi_get_mirrors_master_access_and_projection(multi_get_data):
+    _, master_user, own_new, own_assigned, foreign_new, foreign_assigned = multi_get_data
+    Appointment.objects.filter(id=foreign_assigned.id).update(assigned_master=None)
+    Appointment.objects.filter(id=own_new.id).update(status=AppointmentStatusChoices.CANCELLED)
+
+    response = auth_as(master_user).get(
+        "/api/appointments/",
+        {"ids": f"{own_new.id},{own_assigned.id},{foreign_new.id},{foreign_assigned.id}", "fields": "status"},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["results"] == [
+        {"id": own_assigned.id, "status": AppointmentStatusChoices.IN_PROGRESS},
+        {"id": foreign_new.id, "status": AppointmentStatusChoices.NEW},
+    ]
+    assert [(item["id"], item["code"]) for item in payload["errors"]] == [
+        (own_new.id, "forbidden"),
+        (foreign_assigned.id, "forbidden"),
+    ]
+
+
+@pytest.mark.django_db
+def test_multi_get_checks_access_in_one_query_regardless_of_id_count(multi_get_data, settings):
+    client_user, master_user, *_ = multi_get_data
+    for index in range(6):
+        Appointment.objects.create(
+            client=client_user,
+            assigned_master=master_user,
+            brand="Bulk",
+            model=f"M{index}",
+            lock_type="PIN",
+            has_pc=True,
+            status=AppointmentStatusChoices.IN_PROGRESS,
+        )
+    ids = list(Appointment.objects.filter(client=client_user).order_by("id").values_list("id", flat=True))
+    client = auth_as(client_user)
+
+    for fast in (True, False):
+        settings.FAST_LIST_RENDERING = fast
+        counts = []
+        for chunk in (ids[:2], ids):
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get("/api/appointments/", {"ids": ",".join(map(str, chunk))})
+            assert response.status_code == 200
+            assert response.json()["errors"] == []
+            counts.append(len(captured))
+        assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_multi_get_validates_ids_param(multi_get_data, settings):
+    client_user, *_ = multi_get_data
+    client = auth_as(client_user)
+    settings.APPOINTMENT_MULTI_GET_MAX_IDS = 3
+
+    assert client.get("/api/appointments/").status_code == 400
+    assert client.get("/api/appointments/", {"ids": "1,abc"}).status_code == 400
+    assert client.get("/api/appointments/", {"ids": "0"}).status_code == 400
+    too_many = client.get("/api/appointments/", {"ids": "1,2,3,4"})
+    assert too_many.status_code == 400
+    assert "ids" in too_many.json()
+    # Duplicates collapse before the limit is applied.
+    assert client.get("/api/appointments/", {"ids": "1,1,2,3"}).status_code == 200
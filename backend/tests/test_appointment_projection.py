@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.appointments.serializers import AppointmentSerializer
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def master_with_board(db):
+    client_user = User.objects.create_user(username="projection-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="projection-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    appointments = [
+        Appointment.objects.create(
+            client=client_user,
+            assigned_master=master_user,
+            brand="Samsung",
+            model=f"A{index}",
+            lock_type="PIN",
+            has_pc=True,
+            description="projection",
+            rustdesk_id="111 222 333",
+            rustdesk_password="secret",
+            status=AppointmentStatusChoices.IN_PROGRESS,
+        )
+        for index in range(3)
+    ]
+    return master_user, appointments
+
+
+@pytest.mark.django_db
+def test_fields_projection_skips_unrequested_fields_and_their_queries(master_with_board, monkeypatch):
+    master_user, appointments = master_with_board
+    calls = []
+    monkeypatch.setattr(
+        AppointmentSerializer,
+        "get_client_risk_score",
+        lambda self, obj: calls.append(obj.id),
+    )
+
+    with CaptureQueriesContext(connection) as captured:
+        response = auth_as(master_user).get("/api/appointments/active/", {"fields": "status,model"})
+    assert response.status_code == 200
+    assert all(set(item) == {"id", "status", "model"} for item in response.data)
+    assert calls == []
+
+    sql = " ".join(item["sql"] for item in captured.captured_queries)
+    assert '"chat_readstate"' not in sql and '"chat_message"' not in sql
+    page_query = next(item["sql"] for item in captured.captured_queries if 'FROM "appointments_appointment"' in item["sql"])
+    assert "JOIN" not in page_query
+    assert "rustdesk_password" not in page_query
+
+
+@pytest.mark.django_db
+def test_exclude_projection_and_detail_endpoint(master_with_board):
+    master_user, appointments = master_with_board
+    api = auth_as(master_user)
+
+    listed = api.get("/api/appointments/active/", {"exclude": "rustdesk_id,rustdesk_password,unread_count"})
+    assert listed.status_code == 200
+    assert "unread_count" not in listed.data[0]
+    assert "master_username" in listed.data[0]
+
+    detail = api.get(f"/api/appointments/{appointments[0].id}/", {"fields": "status,client_username"})
+    assert detail.data == {
+        "id": appointments[0].id,
+        "status": AppointmentStatusChoices.IN_PROGRESS,
+        "client_username": "projection-client",
+    }
+
+    invalid = api.get("/api/appointments/active/", {"fields": "status,photo_lock_screen,nope"})
+    assert invalid.status_code == 400
+    assert "fields" in invalid.data
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message, ModerationTerm, ModerationTermCategory
+from apps.chat.moderation_lexicon import (
+    LexiconMatcher,
+    _compiled,
+    _lexicon_version,
+    fold_text,
+    get_lexicon_matcher,
+    invalidate_lexicon,
+)
+from apps.chat.text_moderation import ChatMessageRejected, validate_client_chat_text
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def fresh_lexicon(db):
+    # Test transactions roll back without post_delete, so drop the compiled matcher around each test.
+    invalidate_lexicon()
+    yield
+    invalidate_lexicon()
+
+
+def _rejection(text: str) -> str | None:
+    try:
+        validate_client_chat_text(text)
+    except ChatMessageRejected as exc:
+        return str(exc)
+    return None
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["хуууй", "пuздец", "х​уй", "ЁБАНЫЙ", "nидор", "Б.Л.Я.Д.Ь ну и блядство"],
+)
+@pytest.mark.django_db
+def test_profanity_survives_homoglyphs_and_padding(fresh_lexicon, text):
+    assert "лексику" in _rejection(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Здравствуйте, Samsung A52 после сброса просит аккаунт",
+        "Потребуется ребут? Оплатил 2500, скинул чек",
+        "СПАСИБО",
+    ],
+)
+@pytest.mark.django_db
+def test_ordinary_messages_pass(fresh_lexicon, text):
+    assert _rejection(text) is None
+
+
+@pytest.mark.django_db
+def test_spam_signals_add_up(fresh_lexicon, settings):
+    assert "спам" in _rejection("ааааааааааааааа")
+    assert "спам" in _rejection("казино и ставки на спорт, пишите")
+    assert _rejection("выиграл в казино, теперь телефон заблокирован") is None
+    assert "спам" in _rejection("ЗАХОДИТЕ https://a.ru https://b.ru www.c.ru СРОЧНО СМОТРИТЕ ВСЕ")
+    assert "спам" in _rejection("помогите помогите помогите помогите пожалуйста")
+
+    settings.CHAT_SPAM_SCORE_THRESHOLD = 2.0
+    assert _rejection("казино и ставки на спорт, пишите") is None
+
+
+@pytest.mark.django_db
+def test_admin_lexicon_edits_apply_without_restart(fresh_lexicon, django_capture_on_commit_callbacks):
+    assert _rejection("тестослово запрещено") is None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        term = ModerationTerm.objects.create(term="тестослов", category=ModerationTermCategory.PROFANITY)
+    assert "лексику" in _rejection("Тестослово запрещено")
+
+    term.is_active = False
+    with django_capture_on_commit_callbacks(execute=True):
+        term.save()
+    assert _rejection("тестослово запрещено") is None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        term.delete()
+    assert "лексику" in _rejection("блядь")
+
+
+@pytest.mark.django_db
+def test_lexicon_version_moves_only_after_the_edit_commits(fresh_lexicon, django_capture_on_commit_callbacks):
+    matcher = get_lexicon_matcher()
+    version = _compiled.version
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        ModerationTerm.objects.create(term="тестослов", category=ModerationTermCategory.PROFANITY)
+        assert _lexicon_version() == version
+        assert _compiled.matcher is matcher
+
+    for callback in callbacks:
+        callback()
+    assert _lexicon_version() != version
+    assert "лексику" in _rejection("тестослово")
+
+
+def test_matcher_anchors_terms_at_word_starts():
+    matcher = LexiconMatcher([("еба", "profanity"), ("ставки на спорт", "spam")])
+
+    assert matcher.matches(fold_text("хлебало")) == []
+    assert matcher.matches(fold_text("ЕБАНУТЬ, ставки  на   спорт!")) == [
+        ("profanity", "еба"),
+        ("spam", "ставки на спорт"),
+    ]
+    assert matcher.size == 2
+
+
+@pytest.mark.django_db
+def test_client_chat_rejects_folded_profanity(fresh_lexicon):
+    client_user = User.objects.create_user(username="moderation-client", password="x", role=RoleChoices.CLIENT)
+    appointment = Appointment.objects.create(
+        client=client_user,
+        brand="Samsung",
+        model="A52",
+        lock_type="GOOGLE",
+        has_pc=True,
+        status=AppointmentStatusChoices.NEW,
+    )
+
+    response = auth_as(client_user).post(
+        f"/api/appointments/{appointment.id}/messages/",
+        {"text": "ну ты и пu3да"},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert "лексику" in response.data["detail"]
+    assert not Message.objects.filter(appointment=appointment).exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_reports_messages_per_second(fresh_lexicon):
+    out = StringIO()
+    call_command("benchmark_chat_moderation", "--messages", "50", "--rounds", "1", "--extra-terms", "300", stdout=out)
+
+    output = out.getvalue()
+    assert "msg/s" in output
+    assert "terms" in output
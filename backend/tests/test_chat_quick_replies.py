@@ -103,7 +103,7 @@ def test_master_message_expands_quick_reply_command(master_user, client_user):
 
 
 @pytest.mark.django_db
-def test_master_quick_reply_can_attach_media(master_user, client_user):
+def test_master_quick_reply_can_attach_media(master_user, client_user, django_capture_on_commit_callbacks):
     appointment = Appointment.objects.create(
         client=client_user,
         assigned_master=master_user,
@@ -116,16 +116,17 @@ def test_master_quick_reply_can_attach_media(master_user, client_user):
     )
 
     media = make_test_mp4_upload("guide.mp4")
-    create_response = auth_as(master_user).post(
-        "/api/chat/quick-replies/",
-        {
-            "command": "/video",
-            "title": "Видео-инструкция",
-            "text": "Откройте видео и повторите шаги.",
-            "media_file": media,
-        },
-        format="multipart",
-    )
+    with django_capture_on_commit_callbacks(execute=True):
+        create_response = auth_as(master_user).post(
+            "/api/chat/quick-replies/",
+            {
+                "command": "/video",
+                "title": "Видео-инструкция",
+                "text": "Откройте видео и повторите шаги.",
+                "media_file": media,
+            },
+            format="multipart",
+        )
     assert create_response.status_code == 201
     assert create_response.data["media_url"]
     assert create_response.data["media_kind"] == "video"
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.archive import archive_appointment_batch
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def chat(db):
+    client_user = User.objects.create_user(username="paging-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="paging-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    appointment = Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A52",
+        lock_type="GOOGLE",
+        has_pc=True,
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+    return client_user, master_user, appointment
+
+
+def _add_messages(appointment: Appointment, count: int) -> list[int]:
+    return [
+        Message.objects.create(appointment=appointment, sender=appointment.client, text=f"m{index}").id
+        for index in range(count)
+    ]
+
+
+def _page(client: APIClient, appointment: Appointment, **params) -> dict:
+    response = client.get(f"/api/appointments/{appointment.id}/messages/", params)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_latest_page_then_before_id_walks_the_whole_history(chat):
+    client_user, _, appointment = chat
+    created = _add_messages(appointment, 7)
+    client = auth_as(client_user)
+
+    first = _page(client, appointment, latest=1, limit=3)
+    assert [item["id"] for item in first["results"]] == created[-3:]
+    assert first["has_more"] is True
+    assert first["next_before_id"] == created[-3]
+
+    pages = [first["results"]]
+    before_id = first["next_before_id"]
+    while before_id:
+        page = _page(client, appointment, before_id=before_id, limit=3)
+        pages.append(page["results"])
+        before_id = page["next_before_id"]
+    assert page["has_more"] is False
+    assert [item["id"] for page_items in reversed(pages) for item in page_items] == created
+
+
+@pytest.mark.django_db
+def test_latest_page_costs_the_same_queries_regardless_of_history(chat):
+    client_user, _, appointment = chat
+    client = auth_as(client_user)
+
+    def latest_queries(total: int) -> int:
+        _add_messages(appointment, total - Message.objects.filter(appointment=appointment).count())
+        with CaptureQueriesContext(connection) as captured:
+            _page(client, appointment, latest=1, limit=5)
+        return len(captured)
+
+    assert latest_queries(6) == latest_queries(60)
+
+
+@pytest.mark.django_db
+def test_latest_page_renders_the_same_on_both_paths(chat, settings):
+    client_user, master_user, appointment = chat
+    _add_messages(appointment, 3)
+    Message.objects.create(appointment=appointment, sender=master_user, text="ответ", file="chat_files/photo.jpg")
+    client = auth_as(client_user)
+
+    settings.FAST_LIST_RENDERING = True
+    fast = _page(client, appointment, latest=1, limit=2)
+    settings.FAST_LIST_RENDERING = False
+    slow = _page(client, appointment, latest=1, limit=2)
+    for payload in (fast, slow):
+        for item in payload["results"]:
+            # Signed media URLs embed a timestamp.
+            item.pop("file_url"), item.pop("file_thumb_url"), item.pop("file_preview_url")
+    assert fast == slow
+
+
+@pytest.mark.django_db
+def test_reverse_paging_rejects_after_id_and_reads_archived_chats(chat):
+    client_user, _, appointment = chat
+    created = _add_messages(appointment, 4)
+    client = auth_as(client_user)
+
+    response = client.get(f"/api/appointments/{appointment.id}/messages/", {"after_id": created[0], "latest": 1})
+    assert response.status_code == 400
+    assert "after_id" in response.json()
+
+    old = timezone.now() - timedelta(days=400)
+    Appointment.objects.filter(id=appointment.id).update(status=AppointmentStatusChoices.COMPLETED, updated_at=old)
+    Message.objects.filter(appointment=appointment).update(created_at=old, updated_at=old)
+    archive_appointment_batch([appointment.id], older_than_days=180)
+    assert not Message.objects.filter(appointment=appointment).exists()
+
+    payload = _page(client, appointment, before_id=created[-1], limit=2)
+    assert [item["id"] for item in payload["results"]] == created[1:3]
+    assert payload["next_before_id"] == created[1]
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def sync_data(db):
+    client_user = User.objects.create_user(username="sync-client", password="x", role=RoleChoices.CLIENT)
+    other_client = User.objects.create_user(username="sync-other-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="sync-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    other_master = User.objects.create_user(
+        username="sync-other-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+
+    def create(client, master):
+        return Appointment.objects.create(
+            client=client,
+            assigned_master=master,
+            brand="Samsung",
+            model="A52",
+            lock_type="GOOGLE",
+            has_pc=True,
+            status=AppointmentStatusChoices.IN_PROGRESS,
+        )
+
+    first = create(client_user, master_user)
+    second = create(other_client, master_user)
+    foreign = create(other_client, other_master)
+    Message.objects.create(appointment=first, sender=client_user, text="старое")
+    return client_user, master_user, first, second, foreign
+
+
+def _sync(client: APIClient, cursor: str | None = None) -> dict:
+    response = client.get("/api/chat/sync/", {"cursor": cursor} if cursor else {})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_sync_returns_new_messages_grouped_by_appointment_with_unread_counts(sync_data):
+    client_user, master_user, first, second, foreign = sync_data
+    master = auth_as(master_user)
+
+    bootstrap = _sync(master)
+    assert bootstrap["appointments"] == [] and bootstrap["has_more"] is False
+
+    Message.objects.create(appointment=second, sender=second.client, text="второй-1")
+    Message.objects.create(appointment=first, sender=client_user, text="первый-1")
+    Message.objects.create(appointment=foreign, sender=foreign.client, text="чужое")
+    Message.objects.create(appointment=second, sender=master_user, text="второй-2")
+
+    payload = _sync(master, bootstrap["cursor"])
+
+    assert [group["appointment_id"] for group in payload["appointments"]] == [second.id, first.id]
+    texts = {group["appointment_id"]: [item["text"] for item in group["messages"]] for group in payload["appointments"]}
+    assert texts == {second.id: ["второй-1", "второй-2"], first.id: ["первый-1"]}
+    unread = {group["appointment_id"]: group["unread_count"] for group in payload["appointments"]}
+    assert unread == {second.id: 1, first.id: 2}
+
+    assert _sync(master, payload["cursor"])["appointments"] == []
+
+
+@pytest.mark.django_db
+def test_sync_reports_deletions_of_already_seen_messages_once(sync_data):
+    client_user, master_user, first, _, _ = sync_data
+    client = auth_as(client_user)
+    cursor = _sync(client)["cursor"]
+
+    seen = Message.objects.get(appointment=first)
+    response = client.delete(f"/api/messages/{seen.id}/")
+    assert response.status_code == 204
+
+    payload = _sync(client, cursor)
+    assert payload["appointments"][0]["appointment_id"] == first.id
+    deleted = payload["appointments"][0]["messages"]
+    assert [(item["id"], item["is_deleted"], item["text"]) for item in deleted] == [(seen.id, True, None)]
+
+    assert _sync(client, payload["cursor"])["appointments"] == []
+
+
+@pytest.mark.django_db
+def test_sync_pages_through_large_backlogs(sync_data, settings):
+    client_user, master_user, first, second, _ = sync_data
+    master = auth_as(master_user)
+    cursor = _sync(master)["cursor"]
+    created = [
+        Message.objects.create(appointment=appointment, sender=appointment.client, text=f"m{index}").id
+        for index, appointment in enumerate([first, second, first, second, first])
+    ]
+    settings.CHAT_SYNC_MAX_MESSAGES = 2
+
+    received = []
+    for _ in range(5):
+        payload = _sync(master, cursor)
+        received.extend(item["id"] for group in payload["appointments"] for item in group["messages"])
+        cursor = payload["cursor"]
+        if not payload["has_more"]:
+            break
+    assert sorted(received) == created
+
+
+@pytest.mark.django_db
+def test_sync_pages_through_deletions_sharing_a_timestamp(sync_data, settings):
+    client_user, master_user, first, second, _ = sync_data
+    master = auth_as(master_user)
+    seen_ids = [
+        Message.objects.create(appointment=appointment, sender=appointment.client, text=f"s{index}").id
+        for index, appointment in enumerate([first, second, first])
+    ]
+    cursor = _sync(master)["cursor"]
+    # One bulk moderation UPDATE stamps every row with the same deleted_at.
+    Message.objects.filter(id__in=seen_ids).update(is_deleted=True, deleted_at=timezone.now() + timedelta(seconds=1))
+    settings.CHAT_SYNC_MAX_MESSAGES = 2
+
+    received = []
+    for _ in range(4):
+        payload = _sync(master, cursor)
+        received.extend(item["id"] for group in payload["appointments"] for item in group["messages"])
+        cursor = payload["cursor"]
+        if not payload["has_more"]:
+            break
+    assert sorted(received) == seen_ids
+    assert _sync(master, cursor)["appointments"] == []
+
+
+@pytest.mark.django_db
+def test_sync_query_count_does_not_grow_with_appointments(sync_data):
+    client_user, master_user, first, second, _ = sync_data
+    master = auth_as(master_user)
+    cursor = _sync(master)["cursor"]
+
+    def sync_queries(appointment_count: int) -> int:
+        appointments = [first, second] + [
+            Appointment.objects.create(
+                client=client_user,
+                assigned_master=master_user,
+                brand="Bulk",
+                model="X",
+                lock_type="PIN",
+                has_pc=True,
+                status=AppointmentStatusChoices.IN_PROGRESS,
+            )
+            for _ in range(appointment_count - 2)
+        ]
+        for appointment in appointments:
+            Message.objects.create(appointment=appointment, sender=appointment.client, text="ping")
+        with CaptureQueriesContext(connection) as captured:
+            _sync(master, cursor)
+        return len(captured)
+
+    assert sync_queries(2) == sync_queries(8)
+
+
+@pytest.mark.django_db
+def test_sync_renders_the_same_payload_on_both_paths_and_rejects_bad_cursors(sync_data, settings):
+    client_user, master_user, first, _, _ = sync_data
+    client = auth_as(client_user)
+    cursor = _sync(client)["cursor"]
+    Message.objects.create(appointment=first, sender=master_user, text="ответ", file="chat_files/photo.jpg")
+
+    settings.FAST_LIST_RENDERING = True
+    fast = _sync(client, cursor)
+    settings.FAST_LIST_RENDERING = False
+    slow = _sync(client, cursor)
+    for payload in (fast, slow):
+        for group in payload["appointments"]:
+            for item in group["messages"]:
+                # Signed media URLs embed a timestamp.
+                item.pop("file_url"), item.pop("file_thumb_url"), item.pop("file_preview_url")
+    assert fast["appointments"] == slow["appointments"]
+
+    response = client.get("/api/chat/sync/", {"cursor": "garbage"})
+    assert response.status_code == 400
+    assert "cursor" in response.json()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def setup(db):
+    client_user = User.objects.create_user(username="etag-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="etag-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    appointment = Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="PIN",
+        has_pc=True,
+        description="etag",
+        rustdesk_id="123 456 789",
+        rustdesk_password="secret",
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+    return client_user, master_user, appointment
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("suffix", ["", "events/", "messages/"])
+def test_conditional_get_returns_304_until_state_changes(setup, suffix, django_assert_max_num_queries):
+    client_user, master_user, appointment = setup
+    url = f"/api/appointments/{appointment.id}/{suffix}"
+    api = auth_as(client_user)
+
+    first = api.get(url)
+    assert first.status_code == 200
+    etag = first["ETag"]
+    assert first["Cache-Control"] == "private, no-cache"
+
+    # Auth lookup plus a single version query; no serialization work.
+    with django_assert_max_num_queries(2):
+        cached = api.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == 304
+    assert cached["ETag"] == etag
+    assert not cached.content
+
+    assert auth_as(master_user).get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    assert auth_as(master_user).post(
+        f"/api/appointments/{appointment.id}/messages/", {"text": "Новое сообщение"}, format="json"
+    ).status_code == 201
+    Appointment.objects.filter(id=appointment.id).update(status=AppointmentStatusChoices.COMPLETED)
+    appointment.events.create(actor=master_user, event_type="status_changed")
+
+    changed = api.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_conditional_get_never_skips_access_checks(setup):
+    _, _, appointment = setup
+    stranger = User.objects.create_user(username="etag-stranger", password="x", role=RoleChoices.CLIENT)
+    response = auth_as(stranger).get(f"/api/appointments/{appointment.id}/", HTTP_IF_NONE_MATCH="*")
+    assert response.status_code == 403
+    assert auth_as(stranger).get("/api/appointments/999999/messages/", HTTP_IF_NONE_MATCH="*").status_code == 404
+
+
+@pytest.mark.django_db
+def test_conditional_get_sees_derivatives_built_after_the_first_fetch(setup, settings):
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    from apps.chat.models import Message
+    from upload_helpers import make_test_image_upload
+
+    client_user, _, appointment = setup
+    settings.MEDIA_STORAGE_PROVIDER = "r2"
+    appointment.photo_lock_screen = make_test_image_upload("lock.jpg", size=(600, 400))
+    appointment.save()
+    Message.objects.create(
+        appointment=appointment, sender=client_user, file=make_test_image_upload("chat.jpg", size=(600, 400))
+    )
+    api = auth_as(client_user)
+    detail_url = f"/api/appointments/{appointment.id}/"
+    messages_url = f"/api/appointments/{appointment.id}/messages/"
+
+    detail = api.get(detail_url)
+    messages = api.get(messages_url)
+    assert detail.data["photo_lock_screen_thumb_url"] is None
+    assert api.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"]).status_code == 304
+    assert api.get(messages_url, HTTP_IF_NONE_MATCH=messages["ETag"]).status_code == 304
+
+    # The background job is not run inside the test transaction; the backfill builds the same files.
+    call_command("generate_media_derivatives", stdout=StringIO())
+
+    detail_after = api.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"])
+    assert detail_after.status_code == 200
+    assert detail_after.data["photo_lock_screen_thumb_url"].endswith(".256w.webp")
+    messages_after = api.get(messages_url, HTTP_IF_NONE_MATCH=messages["ETag"])
+    assert messages_after.status_code == 200
+    listed = messages_after.data["results"] if isinstance(messages_after.data, dict) else messages_after.data
+    assert listed[-1]["file_thumb_url"].endswith(".256w.webp")
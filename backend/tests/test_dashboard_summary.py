@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User, WholesaleStatusChoices
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def _create_appointment(client_user: User, **kwargs) -> Appointment:
+    defaults = {
+        "brand": "Samsung",
+        "model": "A50",
+        "lock_type": "PIN",
+        "has_pc": True,
+        "description": "dashboard",
+    }
+    defaults.update(kwargs)
+    return Appointment.objects.create(client=client_user, **defaults)
+
+
+def _appointment_queries(captured: CaptureQueriesContext) -> list[str]:
+    return [
+        item["sql"]
+        for item in captured.captured_queries
+        if 'FROM "appointments_appointment"' in item["sql"] and "chat_message" not in item["sql"]
+    ]
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username="dash-client", password="x", role=RoleChoices.CLIENT)
+
+
+@pytest.fixture
+def master_user(db):
+    return User.objects.create_user(
+        username="dash-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+
+
+@pytest.mark.django_db
+def test_client_dashboard_counts_use_single_aggregate_and_cache(client_user, master_user):
+    _create_appointment(client_user, status=AppointmentStatusChoices.AWAITING_PAYMENT)
+    _create_appointment(client_user, status=AppointmentStatusChoices.COMPLETED)
+    _create_appointment(client_user, status=AppointmentStatusChoices.DECLINED_BY_MASTER, assigned_master=master_user)
+
+    api = auth_as(client_user)
+    with CaptureQueriesContext(connection) as first:
+        response = api.get("/api/dashboard/")
+
+    assert response.status_code == 200
+    assert response.data["counts"]["appointments_total"] == 3
+    assert response.data["counts"]["appointments_active"] == 1
+    assert response.data["counts"]["awaiting_payment"] == 1
+    assert response.data["counts"]["completed"] == 1
+    assert response.data["counts"]["declined"] == 1
+    assert len([sql for sql in _appointment_queries(first) if "COUNT(" in sql.upper()]) == 1
+
+    with CaptureQueriesContext(connection) as second:
+        cached = api.get("/api/dashboard/")
+
+    assert cached.data["counts"] == response.data["counts"]
+    assert _appointment_queries(second) == []
+
+
+@pytest.mark.django_db
+def test_client_dashboard_cache_is_invalidated_by_new_message(
+    client_user, master_user, django_capture_on_commit_callbacks
+):
+    appointment = _create_appointment(
+        client_user,
+        assigned_master=master_user,
+        status=AppointmentStatusChoices.IN_REVIEW,
+    )
+    api = auth_as(client_user)
+
+    assert api.get("/api/dashboard/").data["counts"]["unread_total"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Message.objects.create(appointment=appointment, sender=master_user, text="hello")
+
+    assert api.get("/api/dashboard/").data["counts"]["unread_total"] == 1
+
+
+@pytest.mark.django_db
+def test_master_dashboard_counts_new_queue_and_own_work(client_user, master_user, django_capture_on_commit_callbacks):
+    _create_appointment(client_user, status=AppointmentStatusChoices.NEW)
+    _create_appointment(client_user, status=AppointmentStatusChoices.IN_PROGRESS, assigned_master=master_user)
+    _create_appointment(client_user, status=AppointmentStatusChoices.COMPLETED, assigned_master=master_user)
+
+    api = auth_as(master_user)
+    response = api.get("/api/dashboard/")
+
+    assert response.status_code == 200
+    assert response.data["counts"]["new_available"] == 1
+    assert response.data["counts"]["active_total"] == 1
+    assert response.data["counts"]["in_progress"] == 1
+    assert response.data["counts"]["completed_total"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _create_appointment(client_user, status=AppointmentStatusChoices.NEW)
+
+    assert api.get("/api/dashboard/").data["counts"]["new_available"] == 2
+
+
+@pytest.mark.django_db
+def test_take_invalidates_other_masters_queue_counts_after_commit(
+    client_user, master_user, django_capture_on_commit_callbacks
+):
+    appointment = _create_appointment(client_user, status=AppointmentStatusChoices.NEW)
+    other_master = User.objects.create_user(
+        username="dash-other-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    other_api = auth_as(other_master)
+    assert other_api.get("/api/dashboard/").data["counts"]["new_available"] == 1
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        response = auth_as(master_user).post(f"/api/appointments/{appointment.id}/take/")
+        assert response.status_code == 200
+        # Nothing moves before the commit, so a concurrent reader cannot cache pre-commit counts.
+        assert other_api.get("/api/dashboard/").data["counts"]["new_available"] == 1
+    for callback in callbacks:
+        callback()
+
+    assert other_api.get("/api/dashboard/").data["counts"]["new_available"] == 0
+
+
+@pytest.mark.django_db
+def test_admin_dashboard_counts_are_invalidated_by_user_changes(
+    client_user, master_user, django_capture_on_commit_callbacks
+):
+    admin = User.objects.create_user(username="dash-admin", password="x", role=RoleChoices.ADMIN, is_staff=True)
+    User.objects.create_superuser(username="dash-root", password="x", email="root@example.com")
+    api = auth_as(admin)
+
+    counts = api.get("/api/dashboard/").data["counts"]
+    assert counts["admins_total"] == 2
+    assert counts["masters_total"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        User.objects.create_user(username="dash-client-2", password="x", role=RoleChoices.CLIENT)
+
+    assert api.get("/api/dashboard/").data["counts"]["clients_total"] == counts["clients_total"] + 1
+
+
+@pytest.mark.django_db
+def test_wholesale_portal_counts_use_cached_aggregate(client_user, master_user):
+    client_user.is_service_center = True
+    client_user.wholesale_status = WholesaleStatusChoices.APPROVED
+    client_user.save(update_fields=["is_service_center", "wholesale_status", "updated_at"])
+    _create_appointment(client_user, status=AppointmentStatusChoices.AWAITING_PAYMENT, is_wholesale_request=True)
+    _create_appointment(client_user, status=AppointmentStatusChoices.COMPLETED, is_wholesale_request=True, sla_breached=True)
+
+    api = auth_as(client_user)
+    response = api.get("/api/wholesale/portal/summary/")
+
+    assert response.status_code == 200
+    assert response.data["counts"]["orders_total"] == 2
+    assert response.data["counts"]["orders_active"] == 1
+    assert response.data["counts"]["orders_completed"] == 1
+    assert response.data["counts"]["orders_problematic"] == 1
+    assert response.data["counts"]["awaiting_payment"] == 1
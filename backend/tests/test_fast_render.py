@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core import signing
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import ClientStats, RoleChoices, User, WholesalePriorityChoices, WholesaleStatusChoices
+from apps.appointments.fast_render import appointment_list_renderer
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.appointments.serializers import AppointmentSerializer
+from apps.chat.fast_render import message_list_renderer
+from apps.chat.models import Message
+from apps.chat.serializers import MessageSerializer
+from apps.common.projection import PROJECTION_CONTEXT_KEY
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture(autouse=True)
+def frozen_media_signatures():
+    # Signed media URLs embed a timestamp; freeze it so both renderers sign identically.
+    with patch.object(signing.TimestampSigner, "timestamp", return_value="frozen"):
+        yield
+
+
+@pytest.fixture
+def golden_data(db):
+    client_user = User.objects.create_user(
+        username="golden-client",
+        password="x",
+        role=RoleChoices.CLIENT,
+        is_service_center=True,
+        wholesale_status=WholesaleStatusChoices.APPROVED,
+        wholesale_priority=WholesalePriorityChoices.PRIORITY,
+    )
+    ClientStats.objects.update_or_create(user=client_user, defaults={"risk_score": 42, "risk_level": "medium"})
+    master_user = User.objects.create_user(
+        username="golden-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    admin_user = User.objects.create_user(username="golden-admin", password="x", role=RoleChoices.ADMIN, is_staff=True)
+
+    assigned = Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="GOOGLE",
+        has_pc=True,
+        description="golden",
+        rustdesk_id="123456",
+        rustdesk_password="secret",
+        status=AppointmentStatusChoices.AWAITING_PAYMENT,
+        total_price=1500,
+        is_wholesale_request=True,
+        platform_tags=["vip", "repeat"],
+        taken_at=timezone.now(),
+    )
+    Appointment.objects.filter(id=assigned.id).update(
+        photo_lock_screen="appointments/lock.png",
+        payment_proof="payment_proofs/proof.pdf",
+    )
+    Appointment.objects.create(client=client_user, brand="Xiaomi", model="Redmi", lock_type="MI_ACC", has_pc=False)
+
+    Message.objects.create(appointment=assigned, sender=master_user, text="Привет")
+    deleted = Message.objects.create(appointment=assigned, sender=client_user, text="удалено")
+    Message.objects.filter(id=deleted.id).update(is_deleted=True, deleted_at=timezone.now(), file="chat_files/x.png")
+    Message.objects.create(appointment=assigned, sender=client_user, text="", file="chat_files/photo.jpg")
+    return client_user, master_user, admin_user
+
+
+def _request_for(user: User):
+    request = RequestFactory().get("/api/appointments/")
+    request.user = user
+    return request
+
+
+def _fast(renderer, queryset) -> list[dict]:
+    return renderer.render(list(renderer.values(queryset)))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("projection", [None, frozenset({"id", "status", "unread_count", "client_risk_level", "payment_proof_thumb_url"})])
+def test_fast_appointment_renderer_matches_drf_serializer(golden_data, projection):
+    for user in golden_data:
+        context = {"request": _request_for(user), "include_client_access": False, PROJECTION_CONTEXT_KEY: projection}
+        queryset = Appointment.objects.for_listing(user, projection=projection).order_by("id")
+
+        expected = [dict(item) for item in AppointmentSerializer(queryset, many=True, context=context).data]
+        actual = _fast(appointment_list_renderer(context), queryset)
+
+        assert actual == expected
+        assert [list(item) for item in actual] == [list(item) for item in expected]
+
+
+@pytest.mark.django_db
+def test_fast_appointment_renderer_without_listing_annotation_and_with_client_access(golden_data):
+    client_user, _, _ = golden_data
+    context = {"request": _request_for(client_user), "include_client_access": False}
+    queryset = Appointment.objects.filter(client=client_user).select_related("client", "assigned_master").order_by("id")
+
+    expected = [dict(item) for item in AppointmentSerializer(queryset, many=True, context=context).data]
+    assert _fast(appointment_list_renderer(context), queryset) == expected
+    assert expected[0]["unread_count"] == 1
+    assert appointment_list_renderer({**context, "include_client_access": True}) is None
+
+
+@pytest.mark.django_db
+def test_fast_message_renderer_matches_drf_serializer(golden_data):
+    client_user, _, _ = golden_data
+    context = {"request": _request_for(client_user)}
+    queryset = Message.objects.select_related("sender").order_by("id")
+
+    expected = [dict(item) for item in MessageSerializer(queryset, many=True, context=context).data]
+    actual = _fast(message_list_renderer(context), queryset)
+
+    assert actual == expected
+    assert actual[1]["text"] is None and actual[1]["file_url"] is None
+    assert actual[2]["file_thumb_url"] is not None
+
+
+@pytest.mark.django_db
+def test_list_endpoints_render_the_same_payload_on_both_paths(golden_data, settings):
+    client_user, master_user, admin_user = golden_data
+    appointment_id = Appointment.objects.filter(assigned_master=master_user).values_list("id", flat=True).get()
+    requests = [
+        (client_user, "/api/appointments/my/", {}),
+        (master_user, "/api/appointments/active/", {"cursor": "", "include_meta": 1}),
+        (admin_user, "/api/admin/appointments/", {"fields": "id,status,master_username"}),
+        (client_user, f"/api/appointments/{appointment_id}/messages/", {"cursor": "", "limit": 2}),
+    ]
+    for user, path, params in requests:
+        settings.FAST_LIST_RENDERING = True
+        fast = auth_as(user).get(path, params)
+        settings.FAST_LIST_RENDERING = False
+        slow = auth_as(user).get(path, params)
+        assert fast.status_code == slow.status_code == 200
+        assert fast.json() == slow.json()
+
+    settings.FAST_LIST_RENDERING = True
+    first = auth_as(client_user).get(f"/api/appointments/{appointment_id}/messages/", {"cursor": "", "limit": 2}).json()
+    second = auth_as(client_user).get(
+        f"/api/appointments/{appointment_id}/messages/", {"cursor": first["next_cursor"], "limit": 2}
+    ).json()
+    assert [item["id"] for item in first["results"] + second["results"]] == list(
+        Message.objects.filter(appointment_id=appointment_id).order_by("id").values_list("id", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_benchmark_command_reports_rows_per_second_on_200_row_pages(golden_data):
+    client_user, master_user, _ = golden_data
+    appointments = Appointment.objects.bulk_create(
+        [
+            Appointment(client=client_user, assigned_master=master_user, brand="Bench", model=f"M{index}", lock_type="PIN", has_pc=True)
+            for index in range(200)
+        ]
+    )
+    Message.objects.bulk_create(
+        [Message(appointment=appointment, sender=master_user, text=f"bench {appointment.id}") for appointment in appointments]
+    )
+
+    out = StringIO()
+    call_command("benchmark_list_renderers", "--rows", "200", "--rounds", "1", stdout=out)
+
+    output = out.getvalue()
+    assert "appointments: 200 rows/page" in output
+    assert "messages: 200 rows/page" in output
+    assert output.count("rows/s") == 4
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import pytest
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -174,3 +175,69 @@ def test_quick_replies_support_limit(master_user):
     assert response.data["count"] == 3
     assert response.data["limit"] == 2
     assert len(response.data["results"]) == 2
+
+
+@pytest.mark.django_db
+def test_admin_users_cursor_mode_walks_pages_forward_and_back(admin_user):
+    for index in range(5):
+        User.objects.create_user(username=f"cursor-user-{index}", password="x", role=RoleChoices.CLIENT)
+    expected = list(User.objects.order_by("-id").values_list("id", flat=True))
+    api = auth_as(admin_user)
+
+    seen = []
+    pages = []
+    params = {"limit": 2, "cursor": ""}
+    while True:
+        response = api.get("/api/admin/users/all/", params)
+        assert response.status_code == 200
+        assert "count" not in response.data
+        pages.append(response.data)
+        seen.extend(item["id"] for item in response.data["results"])
+        if not response.data["next_cursor"]:
+            break
+        params = {"limit": 2, "cursor": response.data["next_cursor"]}
+
+    assert seen == expected
+    assert pages[0]["prev_cursor"] is None
+
+    back = api.get("/api/admin/users/all/", {"limit": 2, "cursor": pages[1]["prev_cursor"]})
+    assert [item["id"] for item in back.data["results"]] == [item["id"] for item in pages[0]["results"]]
+
+
+@pytest.mark.django_db
+def test_cursor_mode_handles_nullable_ordering_keys(admin_user, client_user):
+    for index in range(4):
+        Appointment.objects.create(
+            client=client_user,
+            brand="Samsung",
+            model=f"P{index}",
+            lock_type="PIN",
+            has_pc=True,
+            description="registry",
+            status=AppointmentStatusChoices.AWAITING_PAYMENT,
+            payment_marked_at=timezone.now() if index % 2 else None,
+        )
+    api = auth_as(admin_user)
+
+    offset_ids = [
+        item["appointment_id"] for item in api.get("/api/admin/payments/registry/", {"limit": 10}).data["results"]
+    ]
+    cursor_ids = []
+    params = {"limit": 1, "cursor": ""}
+    while True:
+        response = api.get("/api/admin/payments/registry/", params)
+        assert response.status_code == 200
+        cursor_ids.extend(item["appointment_id"] for item in response.data["results"])
+        if not response.data["next_cursor"]:
+            break
+        params = {"limit": 1, "cursor": response.data["next_cursor"]}
+
+    assert cursor_ids == offset_ids
+
+
+@pytest.mark.django_db
+def test_cursor_mode_rejects_tampered_cursor(client_user):
+    response = auth_as(client_user).get("/api/notifications/", {"cursor": "forged"})
+
+    assert response.status_code == 400
+    assert "cursor" in response.data
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User, WholesaleStatusChoices
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def listing_users(db):
+    client_user = User.objects.create_user(
+        username="listing-client",
+        password="x",
+        role=RoleChoices.CLIENT,
+        is_service_center=True,
+        wholesale_status=WholesaleStatusChoices.APPROVED,
+    )
+    master_user = User.objects.create_user(
+        username="listing-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    admin_user = User.objects.create_user(username="listing-admin", password="x", role=RoleChoices.ADMIN, is_staff=True)
+    return client_user, master_user, admin_user
+
+
+def _seed(client_user: User, master_user: User, count: int = 8) -> None:
+    # Distinct clients so a missing client/client_stats join shows up as N+1.
+    for index in range(count):
+        other_client = User.objects.create_user(username=f"listing-other-{index}", password="x", role=RoleChoices.CLIENT)
+        for owner, status, master in (
+            (client_user, AppointmentStatusChoices.IN_PROGRESS, master_user),
+            (other_client, AppointmentStatusChoices.IN_REVIEW, master_user),
+            (other_client, AppointmentStatusChoices.NEW, None),
+        ):
+            appointment = Appointment.objects.create(
+                client=owner,
+                assigned_master=master,
+                brand="Samsung",
+                model=f"L{index}",
+                lock_type="PIN",
+                has_pc=True,
+                description="listing",
+                status=status,
+                is_wholesale_request=owner == client_user,
+            )
+            if master is not None:
+                Message.objects.create(appointment=appointment, sender=master, text=f"Сообщение {index}")
+
+
+def _query_count(user: User, path: str, params: dict) -> tuple[int, list]:
+    api = auth_as(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = api.get(path, params)
+    assert response.status_code == 200, response.data
+    results = response.data["results"] if isinstance(response.data, dict) else response.data
+    return len(queries), results
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("role_index", "path", "params"),
+    [
+        (0, "/api/appointments/my/", {}),
+        (0, "/api/wholesale/portal/orders/", {}),
+        (1, "/api/appointments/active/", {}),
+        (1, "/api/appointments/new/", {"cursor": ""}),
+        (2, "/api/admin/appointments/", {}),
+    ],
+)
+def test_list_endpoints_use_constant_query_count(listing_users, role_index, path, params):
+    client_user, master_user, _ = listing_users
+    _seed(client_user, master_user)
+    user = listing_users[role_index]
+
+    small_count, small = _query_count(user, path, {**params, "limit": 2})
+    large_count, large = _query_count(user, path, {**params, "limit": 8})
+
+    assert len(small) == 2
+    assert len(large) == 8
+    assert small_count == large_count
+
+
+@pytest.mark.django_db
+def test_listing_annotation_matches_unread_counters(listing_users):
+    client_user, master_user, _ = listing_users
+    _seed(client_user, master_user, count=2)
+    appointment = Appointment.objects.filter(client=client_user).first()
+    Message.objects.create(appointment=appointment, sender=master_user, text="Ещё одно")
+
+    results = auth_as(client_user).get("/api/appointments/my/").data
+    unread = {item["id"]: item["unread_count"] for item in results}
+    assert unread[appointment.id] == 2
+    assert set(unread.values()) == {1, 2}
+
+    results = auth_as(master_user).get("/api/appointments/active/").data
+    assert {item["unread_count"] for item in results} == {0}
+    assert all(item["client_risk_level"] is not None for item in results)
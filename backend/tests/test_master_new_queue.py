@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import MasterLevelChoices, RoleChoices, User, WholesalePriorityChoices, WholesaleStatusChoices
+from apps.appointments import new_queue
+from apps.appointments.models import Appointment
+
+
+class InMemorySortedSetRedis:
+    """Just enough of the redis-py surface used by apps.appointments.new_queue."""
+
+    def __init__(self):
+        self.data: dict[str, object] = {}
+
+    def pipeline(self, transaction: bool = False):
+        return _Pipeline(self)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def rename(self, source, target):
+        self.data[target] = self.data.pop(source)
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, *members):
+        zset = self.data.get(key, {})
+        for member in members:
+            zset.pop(member, None)
+
+    def zrange(self, key, start, end):
+        ordered = sorted(self.data.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        return [member for member, _ in ordered[start : end + 1]]
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.data.get(key, {}).pop(field, None)
+
+    def hmget(self, key, fields):
+        values = self.data.get(key, {})
+        return [values.get(field) for field in fields]
+
+
+class _Pipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+        self.calls = []
+        return results
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def fake_redis(monkeypatch, settings):
+    settings.REDIS_URL = "redis://queue-test"
+    client = InMemorySortedSetRedis()
+    monkeypatch.setattr(new_queue, "_get_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username="queue-client", password="x", role=RoleChoices.CLIENT)
+
+
+@pytest.fixture
+def wholesale_client(db):
+    user = User.objects.create_user(username="queue-b2b", password="x", role=RoleChoices.CLIENT)
+    user.is_service_center = True
+    user.wholesale_status = WholesaleStatusChoices.APPROVED
+    user.wholesale_priority = WholesalePriorityChoices.CRITICAL
+    user.save(update_fields=["is_service_center", "wholesale_status", "wholesale_priority", "updated_at"])
+    return user
+
+
+def _master(username: str, **kwargs) -> User:
+    return User.objects.create_user(
+        username=username,
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+        **kwargs,
+    )
+
+
+def _new_appointment(client_user: User, **kwargs) -> Appointment:
+    return Appointment.objects.create(
+        client=client_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="PIN",
+        has_pc=True,
+        description="queue",
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_new_queue_serves_priority_ordered_cards_from_read_model(
+    fake_redis,
+    client_user,
+    wholesale_client,
+    django_capture_on_commit_callbacks,
+):
+    master = _master("queue-master")
+    trainee = _master("queue-trainee", master_level=MasterLevelChoices.TRAINEE)
+    with django_capture_on_commit_callbacks(execute=True):
+        retail = _new_appointment(client_user)
+        wholesale = _new_appointment(wholesale_client, is_wholesale_request=True)
+
+    auth_as(master).get("/api/appointments/new/")  # cold read rebuilds the model once
+    with CaptureQueriesContext(connection) as captured:
+        response = auth_as(master).get("/api/appointments/new/")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.data] == [wholesale.id, retail.id]
+    assert not [item for item in captured.captured_queries if 'FROM "appointments_appointment"' in item["sql"]]
+
+    projected = auth_as(master).get("/api/appointments/new/", {"fields": "brand"})
+    assert projected.data == [{"id": wholesale.id, "brand": "Samsung"}, {"id": retail.id, "brand": "Samsung"}]
+
+    trainee_response = auth_as(trainee).get("/api/appointments/new/")
+    assert [item["id"] for item in trainee_response.data] == [retail.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_as(master).post(f"/api/appointments/{retail.id}/take/")
+
+    assert [item["id"] for item in auth_as(master).get("/api/appointments/new/").data] == [wholesale.id]
+
+
+@pytest.mark.django_db
+def test_new_queue_rebuilds_cold_read_model_and_falls_back_without_redis(fake_redis, client_user, monkeypatch):
+    master = _master("queue-cold-master")
+    appointment = _new_appointment(client_user)
+
+    response = auth_as(master).get("/api/appointments/new/", {"include_meta": 1})
+    assert response.data["count"] == 1
+    assert fake_redis.exists(new_queue.QUEUE_READY_KEY)
+    assert response.data["results"][0]["id"] == appointment.id
+
+    monkeypatch.setattr(new_queue, "_get_client", lambda: None)
+    fallback = auth_as(master).get("/api/appointments/new/")
+    assert [item["id"] for item in fallback.data] == [appointment.id]
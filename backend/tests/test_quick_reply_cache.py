@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import MasterQuickReply
+from apps.chat.quick_replies import _local_maps, _version, get_quick_reply_map
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def quick_reply_chat(db):
+    # Rolled-back test data reuses user ids, so start every test from empty caches.
+    cache.clear()
+    _local_maps.entries.clear()
+    client_user = User.objects.create_user(username="qr-cache-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="qr-cache-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    appointment = Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A52",
+        lock_type="GOOGLE",
+        has_pc=True,
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+    for command, text in (("привет", "Здравствуйте!"), ("прога", "Скачайте программу."), ("оплата", "Реквизиты.")):
+        MasterQuickReply.objects.create(user=master_user, command=command, title=command.title(), text=text)
+    yield client_user, master_user, appointment
+    cache.clear()
+    _local_maps.entries.clear()
+
+
+def _send(client: APIClient, appointment: Appointment, text: str) -> str:
+    response = client.post(f"/api/appointments/{appointment.id}/messages/", {"text": text}, format="json")
+    assert response.status_code == 201
+    return response.data["text"]
+
+
+def _quick_reply_queries(captured) -> list[str]:
+    return [query["sql"] for query in captured.captured_queries if "chat_masterquickreply" in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_command_lookup_hits_the_database_once_per_version(quick_reply_chat):
+    _, master_user, appointment = quick_reply_chat
+    master = auth_as(master_user)
+
+    with CaptureQueriesContext(connection) as first:
+        assert _send(master, appointment, "/привет") == "Здравствуйте!"
+    with CaptureQueriesContext(connection) as second:
+        assert _send(master, appointment, "/прога и напишите мне") == "Скачайте программу.\n\nи напишите мне"
+    assert len(_quick_reply_queries(first)) == 1
+    assert _quick_reply_queries(second) == []
+
+    # Another worker process starts with an empty local LRU and reads the shared copy.
+    _local_maps.entries.clear()
+    with CaptureQueriesContext(connection) as other_process:
+        assert _send(master, appointment, "/оплата") == "Реквизиты."
+    assert _quick_reply_queries(other_process) == []
+
+
+@pytest.mark.django_db
+def test_writes_through_the_api_bump_the_version(quick_reply_chat, django_capture_on_commit_callbacks):
+    _, master_user, appointment = quick_reply_chat
+    master = auth_as(master_user)
+    assert _send(master, appointment, "/привет") == "Здравствуйте!"
+    reply = MasterQuickReply.objects.get(user=master_user, command="привет")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = master.patch(f"/api/chat/quick-replies/{reply.id}/", {"text": "Добрый день!"}, format="json")
+    assert response.status_code == 200
+    assert _send(master, appointment, "/привет") == "Добрый день!"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = master.post("/api/chat/quick-replies/", {"command": "/новый", "text": "Новый шаблон"}, format="json")
+    assert response.status_code == 201
+    assert _send(master, appointment, "/новый") == "Новый шаблон"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert master.delete(f"/api/chat/quick-replies/{reply.id}/").status_code == 204
+    assert _send(master, appointment, "/привет") == "/привет"
+
+
+@pytest.mark.django_db
+def test_version_moves_only_after_the_write_commits(quick_reply_chat, django_capture_on_commit_callbacks):
+    _, master_user, _ = quick_reply_chat
+    get_quick_reply_map(master_user.id)
+    version = _version(master_user.id)
+
+    # A concurrent reader between the write and its commit must keep the old version,
+    # or it would cache the old rows under the new one.
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        MasterQuickReply.objects.filter(user=master_user, command="оплата").first().delete()
+        assert _version(master_user.id) == version
+        assert list(_local_maps.entries) == [master_user.id]
+
+    for callback in callbacks:
+        callback()
+    assert _version(master_user.id) != version
+    assert get_quick_reply_map(master_user.id).get("оплата") is None
+
+
+@pytest.mark.django_db
+def test_autocomplete_serves_prefix_matches_from_the_cached_map(quick_reply_chat):
+    client_user, master_user, _ = quick_reply_chat
+    master = auth_as(master_user)
+    get_quick_reply_map(master_user.id)
+
+    with CaptureQueriesContext(connection) as captured:
+        response = master.get("/api/chat/quick-replies/commands/", {"prefix": "/ПР"})
+    assert response.status_code == 200
+    assert [item["command"] for item in response.data["results"]] == ["привет", "прога"]
+    assert response.data["results"][0]["preview"] == "Здравствуйте!"
+    assert response.data["results"][0]["has_media"] is False
+    assert _quick_reply_queries(captured) == []
+
+    limited = master.get("/api/chat/quick-replies/commands/", {"limit": 1})
+    assert [item["command"] for item in limited.data["results"]] == ["оплата"]
+
+    assert auth_as(client_user).get("/api/chat/quick-replies/commands/").status_code == 403
+
+
+@pytest.mark.django_db
+def test_local_cache_evicts_least_recently_used_masters(quick_reply_chat, settings):
+    _, master_user, _ = quick_reply_chat
+    other_master = User.objects.create_user(username="qr-cache-other", password="x", role=RoleChoices.MASTER)
+    settings.QUICK_REPLY_LOCAL_CACHE_SIZE = 1
+
+    get_quick_reply_map(master_user.id)
+    get_quick_reply_map(other_master.id)
+
+    assert list(_local_maps.entries) == [other_master.id]
+    assert get_quick_reply_map(master_user.id).get("оплата").text == "Реквизиты."
@@ -142,3 +142,142 @@ def test_master_sees_rustdesk_only_after_assignment_and_not_in_lists(client_user
     assert detail_response.status_code == 200
     assert detail_response.data["rustdesk_id"] == "123456789"
     assert detail_response.data["rustdesk_password"] == "7788"
+
+
+@pytest.mark.django_db
+def test_encrypted_fields_decrypt_lazily_and_lists_defer_them(client_user, monkeypatch):
+    from apps.common import crypto_fields
+
+    appointment = Appointment.objects.create(
+        client=client_user,
+        brand="Honor",
+        model="90",
+        lock_type="OTHER",
+        has_pc=True,
+        description="desc",
+        rustdesk_id="123456789",
+        rustdesk_password="7788",
+    )
+    raw_id, raw_password = _raw_rustdesk_columns(appointment.id)
+
+    decrypted = []
+    original = crypto_fields.decrypt_sensitive_value
+    monkeypatch.setattr(crypto_fields, "decrypt_sensitive_value", lambda value: decrypted.append(value) or original(value))
+
+    loaded = Appointment.objects.get(id=appointment.id)
+    assert decrypted == []
+    loaded.brand = "Honor X"
+    loaded.save()
+    assert decrypted == []
+    assert _raw_rustdesk_columns(appointment.id) == (raw_id, raw_password)
+
+    assert loaded.rustdesk_id == "123456789"
+    assert loaded.rustdesk_id == "123456789"
+    assert decrypted == [raw_id]
+
+    row = Appointment.objects.values("rustdesk_password").get(id=appointment.id)
+    assert row["rustdesk_password"] == "7788"
+
+    deferred = Appointment.objects.defer_encrypted().get(id=appointment.id)
+    assert set(deferred.get_deferred_fields()) == {"rustdesk_id", "rustdesk_password"}
+
+    decrypted.clear()
+    assert auth_as(client_user).get("/api/appointments/my/").status_code == 200
+    assert decrypted == []
+
+
+@pytest.mark.django_db
+def test_reencrypt_command_moves_rows_to_primary_key_and_resumes_from_checkpoint(client_user, settings):
+    from io import StringIO
+
+    from cryptography.fernet import Fernet
+    from django.core.management import call_command
+
+    from apps.common.crypto_fields import _normalize_fernet_key
+    from apps.common.key_rotation import get_checkpoint, save_checkpoint
+
+    settings.RUSTDESK_ENCRYPTION_KEYS = "old-rotation-key"
+    appointments = [
+        Appointment.objects.create(
+            client=client_user,
+            brand="Samsung",
+            model=f"A{index}",
+            lock_type="GOOGLE",
+            has_pc=True,
+            description="desc",
+            rustdesk_id=f"10000{index}",
+            rustdesk_password=f"pass-{index}",
+        )
+        for index in range(3)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE appointments_appointment SET rustdesk_password = %s WHERE id = %s",
+            ["legacy-plain", appointments[2].id],
+        )
+
+    settings.RUSTDESK_ENCRYPTION_KEYS = "new-rotation-key,old-rotation-key"
+    save_checkpoint(Appointment, appointments[0].id)
+
+    out = StringIO()
+    call_command("reencrypt_sensitive_fields", "--batch-size", "1", "-v", "2", stdout=out)
+    assert "rows/s" in out.getvalue()
+    assert get_checkpoint(Appointment) == 0
+
+    primary = Fernet(_normalize_fernet_key("new-rotation-key"))
+    old_id, _ = _raw_rustdesk_columns(appointments[0].id)
+    assert old_id.startswith("enc1:")
+    with pytest.raises(Exception):
+        primary.decrypt(old_id[len("enc1:") :].encode())
+
+    for appointment in appointments[1:]:
+        raw_id, raw_password = _raw_rustdesk_columns(appointment.id)
+        assert primary.decrypt(raw_id[len("enc1:") :].encode()).decode() == appointment.rustdesk_id
+        assert raw_password.startswith("enc1:")
+    assert Appointment.objects.get(id=appointments[2].id).rustdesk_password == "legacy-plain"
+
+    call_command("reencrypt_sensitive_fields", "--restart", stdout=out)
+    raw_id, _ = _raw_rustdesk_columns(appointments[0].id)
+    assert primary.decrypt(raw_id[len("enc1:") :].encode()).decode() == "100000"
+    assert "Re-encrypted 1 of 3 rows" in out.getvalue().splitlines()[-1]
+
+
+@pytest.mark.django_db
+def test_reencrypt_keeps_credentials_saved_during_the_batch(client_user, settings):
+    from unittest.mock import patch
+
+    from apps.common import key_rotation
+    from apps.common.key_rotation import encrypted_models, reencrypt_model
+
+    settings.RUSTDESK_ENCRYPTION_KEYS = "old-rotation-key"
+    appointment = Appointment.objects.create(
+        client=client_user,
+        brand="Samsung",
+        model="A52",
+        lock_type="GOOGLE",
+        has_pc=True,
+        description="desc",
+        rustdesk_id="100001",
+        rustdesk_password="old-pass",
+    )
+    settings.RUSTDESK_ENCRYPTION_KEYS = "new-rotation-key,old-rotation-key"
+    real_reencrypt = key_rotation.reencrypt_sensitive_value
+    saved = []
+
+    def user_saves_between_read_and_write(value):
+        if not saved:
+            saved.append(True)
+            fresh = Appointment.objects.get(id=appointment.id)
+            fresh.rustdesk_id = "200002"
+            fresh.rustdesk_password = "new-pass"
+            fresh.save(update_fields=["rustdesk_id", "rustdesk_password"])
+        return real_reencrypt(value)
+
+    field_names = dict(encrypted_models())[Appointment]
+    with patch.object(key_rotation, "reencrypt_sensitive_value", side_effect=user_saves_between_read_and_write):
+        summary = reencrypt_model(Appointment, field_names)
+
+    assert summary["updated"] == 0
+    fresh = Appointment.objects.get(id=appointment.id)
+    assert (fresh.rustdesk_id, fresh.rustdesk_password) == ("200002", "new-pass")
+    assert key_rotation.get_checkpoint(Appointment) == 0
@@ -183,3 +183,117 @@ def test_remote_media_uses_direct_storage_signed_url():
             "expire": 900,
         }
     ]
+
+
+@pytest.mark.django_db
+@override_settings(SECURE_MEDIA_ACCEL_REDIRECT=False)
+def test_uploaded_images_get_webp_derivatives_behind_thumb_urls(django_capture_on_commit_callbacks):
+    from io import BytesIO
+
+    from PIL import Image
+
+    from apps.chat.models import Message
+    from apps.common.media_derivatives import derivative_name
+
+    client_user = User.objects.create_user(username="secure_media_thumb_client", password="x", role=RoleChoices.CLIENT)
+    appointment = Appointment.objects.create(
+        client=client_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="Google",
+        has_pc=True,
+        description="desc",
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        message_response = auth_as(client_user).post(
+            f"/api/appointments/{appointment.id}/messages/",
+            {"file": make_test_image_upload("photo.jpg", size=(2000, 1500))},
+            format="multipart",
+        )
+    assert message_response.status_code == 201
+
+    message = Message.objects.get(id=message_response.data["id"])
+    assert message.file.storage.exists(derivative_name(message.file.name, 256))
+    assert derivative_name("chat_files/photo.jpg", 256) == "chat_files/photo.256w.webp"
+
+    for key, longest_side in (("file_thumb_url", 256), ("file_preview_url", 1024)):
+        download = APIClient().get(request_relative_path(message_response.data[key]))
+        assert download.status_code == 200
+        assert download["Content-Type"] == "image/webp"
+        with Image.open(BytesIO(streamed_bytes(download))) as image:
+            assert image.format == "WEBP"
+            assert max(image.size) == longest_side
+
+    # Uploads stored before derivatives existed fall back to the original file.
+    message.file.storage.delete(derivative_name(message.file.name, 256))
+    fallback = APIClient().get(request_relative_path(message_response.data["file_thumb_url"]))
+    assert fallback.status_code == 200
+    assert streamed_bytes(fallback).startswith(b"\xff\xd8\xff")
+
+    pdf_response = auth_as(client_user).post(
+        f"/api/appointments/{appointment.id}/messages/",
+        {"file": SimpleUploadedFile("log.pdf", b"%PDF-1.4\n%%EOF\n", content_type="application/pdf")},
+        format="multipart",
+    )
+    assert pdf_response.status_code == 201
+    assert pdf_response.data["file_url"]
+    assert pdf_response.data["file_thumb_url"] is None
+
+
+@override_settings(MEDIA_STORAGE_PROVIDER="r2")
+def test_remote_variant_urls_wait_for_stored_derivatives():
+    appointment = Appointment(id=42, photo_lock_screen="locks/screen.jpg")
+
+    assert build_appointment_media_url(None, appointment, "photo_lock_screen", variant=256) is None
+    assert build_appointment_media_url(None, appointment, "photo_lock_screen").endswith("locks/screen.jpg")
+
+    appointment.photo_lock_screen_derivatives_ready = True
+    assert build_appointment_media_url(None, appointment, "photo_lock_screen", variant=256).endswith(
+        "locks/screen.256w.webp"
+    )
+
+
+@pytest.mark.django_db
+def test_derivative_job_marks_rows_ready_for_remote_urls(django_capture_on_commit_callbacks, settings):
+    from apps.chat.models import Message
+
+    client_user = User.objects.create_user(username="secure_media_ready_client", password="x", role=RoleChoices.CLIENT)
+    appointment = Appointment.objects.create(
+        client=client_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="Google",
+        has_pc=True,
+        description="desc",
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+    api = auth_as(client_user)
+    settings.MEDIA_STORAGE_PROVIDER = "r2"
+
+    # The background job has not run yet: both renderers leave the variants empty.
+    response = api.post(
+        f"/api/appointments/{appointment.id}/messages/",
+        {"file": make_test_image_upload("pending.jpg", size=(600, 400))},
+        format="multipart",
+    )
+    assert response.status_code == 201
+    assert response.data["file_url"]
+    assert response.data["file_thumb_url"] is None
+    listed = api.get(f"/api/appointments/{appointment.id}/messages/").data
+    listed = listed["results"] if isinstance(listed, dict) else listed
+    assert [item["file_thumb_url"] for item in listed] == [None]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api.post(
+            f"/api/appointments/{appointment.id}/messages/",
+            {"file": make_test_image_upload("ready.jpg", size=(600, 400))},
+            format="multipart",
+        )
+    assert response.status_code == 201
+    assert Message.objects.get(id=response.data["id"]).file_derivatives_ready is True
+    listed = api.get(f"/api/appointments/{appointment.id}/messages/").data
+    listed = listed["results"] if isinstance(listed, dict) else listed
+    thumbs = {item["id"]: item["file_thumb_url"] for item in listed}
+    assert thumbs[response.data["id"]].endswith(".256w.webp")
@@ -4,12 +4,15 @@ from datetime import timedelta
 
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.accounts.models import RoleChoices, User
 from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.appointments.services import sweep_sla_breaches
+from apps.platform.analytics import compute_daily_metrics_for_date
 from apps.platform.models import Notification, PlatformEvent, Rule
 
 
@@ -116,3 +119,63 @@ def test_sla_breach_emits_event_and_rule_creates_admin_notification():
     ).exists()
     assert Notification.objects.filter(user=admin_user, title="SLA РЅР°СЂСѓС€РµРЅ").exists()
 
+
+@pytest.mark.django_db
+def test_sla_sweeper_flags_untouched_overdue_appointments_in_bulk():
+    admin_user = User.objects.create_user(username="sla-sweep-admin", password="x", role=RoleChoices.ADMIN, is_staff=True)
+    client_user = User.objects.create_user(username="sla-sweep-client", password="x", role=RoleChoices.CLIENT)
+    master_user = User.objects.create_user(
+        username="sla-sweep-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+    Rule.objects.create(
+        name="notify_admin_on_swept_sla_breach",
+        is_active=True,
+        trigger_event_type="sla.breached",
+        condition_json={},
+        action_json={"type": "request_admin_attention", "title": "SLA sweep"},
+    )
+    now = timezone.now()
+    base = {"client": client_user, "brand": "Xiaomi", "model": "13", "lock_type": "PIN", "has_pc": True, "description": "d"}
+    stale_new = [
+        Appointment.objects.create(**base, response_deadline_at=now - timedelta(minutes=5 + index)) for index in range(3)
+    ]
+    stale_work = Appointment.objects.create(
+        **base,
+        assigned_master=master_user,
+        status=AppointmentStatusChoices.IN_PROGRESS,
+        completion_deadline_at=now - timedelta(hours=1),
+    )
+    fresh = Appointment.objects.create(**base, response_deadline_at=now + timedelta(minutes=5))
+    completed = Appointment.objects.create(
+        **base,
+        status=AppointmentStatusChoices.COMPLETED,
+        completion_deadline_at=now - timedelta(hours=1),
+    )
+
+    summary = sweep_sla_breaches(now=now, batch_size=2)
+
+    assert summary["flagged"] == 4
+    assert summary["response_timeout"] == 3
+    assert summary["completion_timeout"] == 1
+    assert summary["max_breach_latency_seconds"] == 3600
+    flagged_ids = set(Appointment.objects.filter(sla_breached=True).values_list("id", flat=True))
+    assert flagged_ids == {item.id for item in stale_new} | {stale_work.id}
+    assert fresh.id not in flagged_ids and completed.id not in flagged_ids
+
+    events = PlatformEvent.objects.filter(event_type="sla.breached")
+    assert events.count() == 4
+    work_event = events.get(entity_id=str(stale_work.id))
+    assert work_event.payload == {"reason": "completion_timeout", "breach_latency_seconds": 3600, "detected_by": "sweeper"}
+    assert Notification.objects.filter(user=admin_user, title="SLA sweep").count() == 4
+
+    assert sweep_sla_breaches(now=now)["flagged"] == 0
+    call_command("sweep_sla_breaches")
+    assert PlatformEvent.objects.filter(event_type="sla.breached").count() == 4
+
+    metrics = compute_daily_metrics_for_date(timezone.localdate())
+    assert metrics.sla_breaches == 4
+    assert metrics.avg_sla_breach_latency > 0
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentEvent, AppointmentStatusChoices
+from apps.appointments.services import run_master_bulk_action, transition_status
+from apps.appointments.transitions import TransitionConflict, bulk_compare_and_set_status, is_allowed_transition
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def transition_users(db):
+    client_user = User.objects.create_user(username="cas-client", password="x", role=RoleChoices.CLIENT)
+    masters = [
+        User.objects.create_user(
+            username=f"cas-master-{index}",
+            password="x",
+            role=RoleChoices.MASTER,
+            is_master_active=True,
+            master_quality_approved=True,
+        )
+        for index in range(2)
+    ]
+    admin_user = User.objects.create_user(username="cas-admin", password="x", role=RoleChoices.ADMIN, is_staff=True)
+    return client_user, masters[0], masters[1], admin_user
+
+
+def _create_appointment(client_user: User, **extra) -> Appointment:
+    return Appointment.objects.create(
+        client=client_user,
+        brand="Samsung",
+        model="A52",
+        lock_type="GOOGLE",
+        has_pc=True,
+        description="cas",
+        **extra,
+    )
+
+
+@pytest.mark.django_db
+def test_stale_transition_loses_without_writing_anything(transition_users, caplog):
+    client_user, master_user, _, _ = transition_users
+    appointment = _create_appointment(client_user, assigned_master=master_user, status=AppointmentStatusChoices.PAID)
+    stale = Appointment.objects.get(id=appointment.id)
+    transition_status(appointment, master_user, AppointmentStatusChoices.IN_PROGRESS)
+
+    caplog.set_level(logging.INFO, logger="apps.appointments.transitions")
+    with pytest.raises(TransitionConflict):
+        transition_status(stale, master_user, AppointmentStatusChoices.CANCELLED)
+
+    row = Appointment.objects.get(id=appointment.id)
+    assert row.status == AppointmentStatusChoices.IN_PROGRESS
+    assert row.version == appointment.version
+    assert list(AppointmentEvent.objects.filter(appointment=row).values_list("to_status", flat=True)) == [
+        AppointmentStatusChoices.IN_PROGRESS
+    ]
+    assert "outcome=conflict" in caplog.text
+    assert "lock_wait_ms=" in caplog.text
+
+
+@pytest.mark.django_db
+def test_racing_take_gets_conflict_response(transition_users):
+    client_user, master_user, rival_master, _ = transition_users
+    appointment = _create_appointment(client_user)
+
+    def rival_wins(*args, **kwargs):
+        Appointment.objects.filter(id=appointment.id).update(
+            assigned_master=rival_master,
+            status=AppointmentStatusChoices.IN_REVIEW,
+        )
+
+    with patch("apps.appointments.services.assert_master_can_take_new_appointment", side_effect=rival_wins):
+        response = auth_as(master_user).post(f"/api/appointments/{appointment.id}/take/")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Заявку уже изменили. Обновите её и повторите действие."
+    # The simulated rival ran inside the same request transaction, so it rolled back with it.
+    assert not AppointmentEvent.objects.filter(appointment_id=appointment.id).exists()
+
+
+@pytest.mark.django_db
+def test_take_writes_assignment_status_and_timestamp_together(transition_users):
+    client_user, master_user, _, _ = transition_users
+    appointment = _create_appointment(client_user)
+
+    response = auth_as(master_user).post(f"/api/appointments/{appointment.id}/take/")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["status"] == AppointmentStatusChoices.IN_REVIEW
+    assert payload["master_username"] == master_user.username
+    assert payload["taken_at"] is not None
+    assert payload["version"] == Appointment.objects.values_list("version", flat=True).get(id=appointment.id) == 2
+
+
+@pytest.mark.django_db
+def test_transition_table_is_enforced_except_for_admin_override(transition_users):
+    client_user, master_user, _, admin_user = transition_users
+    taken_at = timezone.now() - timedelta(days=1)
+    appointment = _create_appointment(
+        client_user,
+        assigned_master=master_user,
+        status=AppointmentStatusChoices.COMPLETED,
+        taken_at=taken_at,
+    )
+
+    assert not is_allowed_transition(AppointmentStatusChoices.COMPLETED, AppointmentStatusChoices.IN_REVIEW)
+    with pytest.raises(ValidationError):
+        transition_status(appointment, master_user, AppointmentStatusChoices.IN_REVIEW)
+
+    response = auth_as(admin_user).post(
+        f"/api/admin/appointments/{appointment.id}/set-status/",
+        {"status": AppointmentStatusChoices.IN_REVIEW, "note": "вернули"},
+        format="json",
+    )
+    assert response.status_code == 200
+    appointment.refresh_from_db()
+    assert appointment.status == AppointmentStatusChoices.IN_REVIEW
+    # First-entry timestamps survive re-entering the status.
+    assert appointment.taken_at == taken_at
+
+
+@pytest.mark.django_db
+def test_bulk_transition_uses_the_table_and_skips_rows_moved_meanwhile(transition_users):
+    client_user, master_user, _, _ = transition_users
+    rows = [
+        _create_appointment(client_user, assigned_master=master_user, status=AppointmentStatusChoices.IN_PROGRESS)
+        for _ in range(3)
+    ]
+    ids = [row.id for row in rows]
+
+    with pytest.raises(ValidationError):
+        bulk_compare_and_set_status(ids, AppointmentStatusChoices.IN_PROGRESS, AppointmentStatusChoices.PAID)
+
+    # Another writer cancels one row after the bulk action loaded it.
+    real_bulk = bulk_compare_and_set_status
+
+    def cancel_first_then_bulk(*args, **kwargs):
+        Appointment.objects.filter(id=ids[0]).update(status=AppointmentStatusChoices.CANCELLED)
+        return real_bulk(*args, **kwargs)
+
+    with patch("apps.appointments.services.bulk_compare_and_set_status", side_effect=cancel_first_then_bulk):
+        processed, skipped = run_master_bulk_action(
+            master=master_user,
+            appointment_ids=ids,
+            from_status=AppointmentStatusChoices.IN_PROGRESS,
+            to_status=AppointmentStatusChoices.COMPLETED,
+            skip_reason="status_must_be_in_progress",
+        )
+
+    assert processed == ids[1:]
+    assert skipped == [{"appointment_id": ids[0], "reason": "status_must_be_in_progress"}]
+    statuses = dict(Appointment.objects.filter(id__in=ids).values_list("id", "status"))
+    assert statuses == {
+        ids[0]: AppointmentStatusChoices.CANCELLED,
+        ids[1]: AppointmentStatusChoices.COMPLETED,
+        ids[2]: AppointmentStatusChoices.COMPLETED,
+    }
+    assert not Appointment.objects.filter(id__in=ids[1:], completed_at__isnull=True).exists()
+    assert AppointmentEvent.objects.filter(appointment_id__in=ids, to_status=AppointmentStatusChoices.COMPLETED).count() == 2
+
+
+@pytest.mark.django_db
+def test_lock_wait_is_recorded_in_events_and_daily_metrics(transition_users):
+    from apps.platform.analytics import compute_daily_metrics_for_date
+    from apps.platform.models import PlatformEvent
+
+    client_user, master_user, _, _ = transition_users
+    single = _create_appointment(client_user, assigned_master=master_user, status=AppointmentStatusChoices.PAID)
+    batch = _create_appointment(client_user, assigned_master=master_user, status=AppointmentStatusChoices.IN_PROGRESS)
+    transition_status(single, master_user, AppointmentStatusChoices.IN_PROGRESS)
+    run_master_bulk_action(
+        master=master_user,
+        appointment_ids=[batch.id],
+        from_status=AppointmentStatusChoices.IN_PROGRESS,
+        to_status=AppointmentStatusChoices.COMPLETED,
+    )
+
+    waits = [
+        event.payload["lock_wait_ms"]
+        for event in PlatformEvent.objects.filter(
+            event_type__in=("appointment.status_changed", "appointment.bulk_status_changed")
+        )
+    ]
+    assert len(waits) == 2 and all(wait >= 0 for wait in waits)
+    metrics = compute_daily_metrics_for_date(timezone.localdate())
+    assert metrics.avg_transition_lock_wait_ms == round(sum(waits) / len(waits), 2)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message, ReadState
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username="counter-client", password="x", role=RoleChoices.CLIENT)
+
+
+@pytest.fixture
+def master_user(db):
+    return User.objects.create_user(
+        username="counter-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+
+
+@pytest.fixture
+def appointment(client_user, master_user):
+    return Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="PIN",
+        has_pc=True,
+        description="counters",
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+
+
+def _state(appointment: Appointment, user: User) -> ReadState:
+    return ReadState.objects.get(appointment=appointment, user=user)
+
+
+@pytest.mark.django_db
+def test_message_creation_increments_recipient_counter_only(appointment, client_user, master_user):
+    Message.objects.create(appointment=appointment, sender=master_user, text="one")
+    Message.objects.create(appointment=appointment, sender=master_user, text="two")
+    reply = Message.objects.create(appointment=appointment, sender=client_user, text="reply")
+
+    client_state = _state(appointment, client_user)
+    master_state = _state(appointment, master_user)
+    assert client_state.unread_count == 2
+    assert client_state.last_message_id == reply.id
+    assert master_state.unread_count == 1
+    assert master_state.last_message_id == reply.id
+
+
+@pytest.mark.django_db
+def test_read_pointer_and_delete_keep_counter_in_sync(appointment, client_user, master_user):
+    first = Message.objects.create(appointment=appointment, sender=master_user, text="one")
+    second = Message.objects.create(appointment=appointment, sender=master_user, text="two")
+    Message.objects.create(appointment=appointment, sender=master_user, text="three")
+
+    client_api = auth_as(client_user)
+    response = client_api.post(
+        f"/api/appointments/{appointment.id}/read/",
+        {"last_read_message_id": first.id},
+        format="json",
+    )
+    assert response.status_code == 200
+    assert response.data["unread_count"] == 2
+    assert _state(appointment, client_user).last_read_message_id == first.id
+
+    master_api = auth_as(master_user)
+    assert master_api.delete(f"/api/messages/{second.id}/").status_code == 204
+    assert _state(appointment, client_user).unread_count == 1
+
+    # Deleting an already deleted or already read message does not decrement.
+    assert master_api.delete(f"/api/messages/{second.id}/").status_code == 204
+    assert master_api.delete(f"/api/messages/{first.id}/").status_code == 204
+    assert _state(appointment, client_user).unread_count == 1
+
+    assert client_api.get("/api/appointments/my/").data[0]["unread_count"] == 1
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.chat.models import Message, ReadState
+from apps.chat.unread import advance_read_pointer, get_unread_counts, get_unread_total
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username="unread-client", password="x", role=RoleChoices.CLIENT)
+
+
+@pytest.fixture
+def master_user(db):
+    return User.objects.create_user(
+        username="unread-master",
+        password="x",
+        role=RoleChoices.MASTER,
+        is_master_active=True,
+        master_quality_approved=True,
+    )
+
+
+def _create_appointment(client_user: User, master_user: User) -> Appointment:
+    return Appointment.objects.create(
+        client=client_user,
+        assigned_master=master_user,
+        brand="Samsung",
+        model="A50",
+        lock_type="PIN",
+        has_pc=True,
+        description="unread",
+        status=AppointmentStatusChoices.IN_PROGRESS,
+    )
+
+
+@pytest.mark.django_db
+def test_grouped_unread_counts_respect_read_state_deleted_and_own_messages(client_user, master_user):
+    first = _create_appointment(client_user, master_user)
+    second = _create_appointment(client_user, master_user)
+    untouched = _create_appointment(client_user, master_user)
+
+    read = Message.objects.create(appointment=first, sender=master_user, text="read")
+    Message.objects.create(appointment=first, sender=master_user, text="unread")
+    Message.objects.create(appointment=first, sender=client_user, text="own")
+    Message.objects.create(appointment=second, sender=master_user, text="one")
+    Message.objects.create(appointment=second, sender=master_user, text="gone", is_deleted=True)
+    advance_read_pointer(first, client_user, read.id)
+
+    with CaptureQueriesContext(connection) as captured:
+        counts = get_unread_counts(client_user, [first.id, second.id, untouched.id])
+
+    assert counts == {first.id: 1, second.id: 1, untouched.id: 0}
+    assert len(captured.captured_queries) == 2
+    assert get_unread_total(client_user, Appointment.objects.filter(client=client_user)) == 2
+
+
+@pytest.mark.django_db
+def test_unread_counts_fall_back_to_messages_without_read_state(client_user, master_user):
+    appointment = _create_appointment(client_user, master_user)
+    Message.objects.create(appointment=appointment, sender=master_user, text="one")
+    Message.objects.create(appointment=appointment, sender=master_user, text="two")
+    ReadState.objects.filter(appointment=appointment).delete()
+
+    assert get_unread_counts(client_user, [appointment.id]) == {appointment.id: 2}
+    assert get_unread_total(client_user, Appointment.objects.filter(client=client_user)) == 2
+
+
+@pytest.mark.django_db
+def test_appointment_list_unread_counts_use_constant_queries(client_user, master_user):
+    api = auth_as(client_user)
+
+    def unread_queries() -> int:
+        with CaptureQueriesContext(connection) as captured:
+            response = api.get("/api/appointments/my/")
+        assert response.status_code == 200
+        return len([item for item in captured.captured_queries if "chat_readstate" in item["sql"]])
+
+    for _ in range(2):
+        appointment = _create_appointment(client_user, master_user)
+        Message.objects.create(appointment=appointment, sender=master_user, text="hi")
+    small_page = unread_queries()
+
+    for _ in range(5):
+        appointment = _create_appointment(client_user, master_user)
+        Message.objects.create(appointment=appointment, sender=master_user, text="hi")
+    large_page = unread_queries()
+
+    assert small_page == large_page == 1
+    response = api.get("/api/appointments/my/")
+    assert [item["unread_count"] for item in response.data] == [1] * 7
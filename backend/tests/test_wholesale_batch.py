@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import RoleChoices, User, WholesaleStatusChoices
+from apps.appointments.models import Appointment, AppointmentStatusChoices
+from apps.platform.models import PlatformEvent
+
+
+def auth_as(user: User) -> APIClient:
+    client = APIClient()
+    token = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def service_center(db):
+    return User.objects.create_user(
+        username="batch-service-center",
+        password="x",
+        role=RoleChoices.CLIENT,
+        is_service_center=True,
+        wholesale_status=WholesaleStatusChoices.APPROVED,
+    )
+
+
+@pytest.fixture
+def masters(db):
+    return [
+        User.objects.create_user(
+            username=f"batch-master-{index}",
+            password="x",
+            role=RoleChoices.MASTER,
+            is_master_active=True,
+            master_quality_approved=True,
+            telegram_id=1000 + index,
+        )
+        for index in range(2)
+    ]
+
+
+def _item(index: int, **overrides) -> dict:
+    return {
+        "brand": "Samsung",
+        "model": f"A{index}",
+        "lock_type": "GOOGLE",
+        "has_pc": True,
+        "description": f"device {index}",
+        "rustdesk_id": f"12345{index}",
+        "rustdesk_password": "secret",
+        **overrides,
+    }
+
+
+@pytest.mark.django_db
+def test_batch_creates_appointments_in_one_insert_with_one_event_and_notification(
+    service_center, masters, django_capture_on_commit_callbacks
+):
+    with patch("apps.accounts.notifications.send_telegram_message", return_value=True) as telegram_mock:
+        with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = auth_as(service_center).post(
+                "/api/appointments/batch/",
+                {"items": [_item(index) for index in range(3)]},
+                format="json",
+            )
+
+    assert response.status_code == 201
+    assert response.data["created_count"] == 3
+    inserts = [query["sql"] for query in queries if query["sql"].startswith('INSERT INTO "appointments_appointment"')]
+    assert len(inserts) == 1
+
+    appointments = list(Appointment.objects.filter(client=service_center).order_by("id"))
+    assert [item["id"] for item in response.data["appointments"]] == [appointment.id for appointment in appointments]
+    assert all(appointment.is_wholesale_request for appointment in appointments)
+    assert all(appointment.status == AppointmentStatusChoices.NEW for appointment in appointments)
+    assert all(appointment.response_deadline_at is not None for appointment in appointments)
+    assert appointments[0].rustdesk_id == "123450"
+
+    batch_event = PlatformEvent.objects.get(event_type="appointment.batch_created")
+    assert batch_event.payload["appointment_ids"] == [appointment.id for appointment in appointments]
+    created_events = PlatformEvent.objects.filter(event_type="appointment.created").order_by("id")
+    assert [event.entity_id for event in created_events] == [str(appointment.id) for appointment in appointments]
+    event_inserts = [query["sql"] for query in queries if query["sql"].startswith('INSERT INTO "platform_platformevent"')]
+    assert len(event_inserts) == 2
+
+    assert telegram_mock.call_count == len(masters)
+    text = telegram_mock.call_args.args[1]
+    assert "Новые заявки для мастеров: 3 шт." in text
+    assert f"#{appointments[2].id}" in text
+
+
+@pytest.mark.django_db
+def test_batch_accepts_csv_and_rejects_the_whole_batch_on_any_invalid_item(service_center):
+    csv_body = (
+        "brand;model;lock_type;has_pc;description;rustdesk_id\n"
+        "Xiaomi;Redmi 9;MI_ACC;да;csv device;555\n"
+        "Honor;X8;GOOGLE;нет;csv device 2;\n"
+    ).encode("utf-8")
+    response = auth_as(service_center).post(
+        "/api/appointments/batch/",
+        {"file": SimpleUploadedFile("devices.csv", csv_body, content_type="text/csv")},
+        format="multipart",
+    )
+    assert response.status_code == 201
+    created = {appointment.model: appointment for appointment in Appointment.objects.filter(client=service_center)}
+    assert created["Redmi 9"].has_pc is True
+    assert created["X8"].has_pc is False
+
+    response = auth_as(service_center).post(
+        "/api/appointments/batch/",
+        {"items": [_item(10), _item(11, rustdesk_id="not-digits")]},
+        format="json",
+    )
+    assert response.status_code == 400
+    assert list(response.data["items"]) == [1]
+    assert "rustdesk_id" in response.data["items"][1]
+    assert Appointment.objects.filter(client=service_center).count() == 2
+
+
+@pytest.mark.django_db
+def test_batch_is_only_for_approved_service_centres_and_capped(service_center, settings):
+    retail_client = User.objects.create_user(username="batch-retail", password="x", role=RoleChoices.CLIENT)
+    response = auth_as(retail_client).post("/api/appointments/batch/", {"items": [_item(1)]}, format="json")
+    assert response.status_code == 403
+
+    settings.WHOLESALE_BATCH_MAX_ITEMS = 2
+    response = auth_as(service_center).post(
+        "/api/appointments/batch/",
+        {"items": [_item(index) for index in range(3)]},
+        format="json",
+    )
+    assert response.status_code == 400
+    assert not Appointment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_batch_goes_through_the_dispatcher_when_enabled(
+    service_center, masters, settings, django_capture_on_commit_callbacks
+):
+    from django.core.cache import cache
+
+    from apps.appointments.dispatch import get_dispatch_state
+
+    settings.APPOINTMENT_DISPATCH_ENABLED = True
+    cache.clear()
+    with patch("apps.accounts.notifications.send_telegram_message", return_value=True) as telegram_mock:
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auth_as(service_center).post(
+                "/api/appointments/batch/",
+                {"items": [_item(index) for index in range(2)]},
+                format="json",
+            )
+
+    assert response.status_code == 201
+    appointment_ids = [item["id"] for item in response.data["appointments"]]
+    # Every appointment gets its own lease instead of the aggregated broadcast.
+    for appointment_id in appointment_ids:
+        state = get_dispatch_state(appointment_id)
+        assert state["master_id"] == masters[0].id
+        assert state["broadcast"] is False
+    offers = PlatformEvent.objects.filter(event_type="appointment.dispatch_offered")
+    assert sorted(offers.values_list("entity_id", flat=True)) == sorted(str(value) for value in appointment_ids)
+    assert all("Вам предложена заявка" in call.args[1] for call in telegram_mock.call_args_list)
+    assert telegram_mock.call_count == 2
+
+
+@pytest.mark.django_db
+def test_appointment_created_rules_fire_for_every_batch_row(service_center):
+    from apps.platform.models import Rule
+
+    Rule.objects.create(
+        name="tag_new_appointments",
+        is_active=True,
+        trigger_event_type="appointment.created",
+        condition_json={"all": [{"field": "appointment.status", "op": "==", "value": "NEW"}]},
+        action_json={"type": "assign_tag", "tag": "new-request"},
+    )
+
+    response = auth_as(service_center).post(
+        "/api/appointments/batch/",
+        {"items": [_item(index) for index in range(2)]},
+        format="json",
+    )
+
+    assert response.status_code == 201
+    tags = Appointment.objects.filter(client=service_center).values_list("platform_tags", flat=True)
+    assert all("new-request" in (item or []) for item in tags)
+    assert len(tags) == 2
@@ -15,6 +15,9 @@ export const appointmentsApi = {
   detail(id) {
     return api.get(`/appointments/${id}/`, withBypassCache());
   },
+  byIds(ids, params = {}) {
+    return api.get("/appointments/", withBypassCache({ params: { ...params, ids: ids.join(",") } }));
+  },
   updateClientAccess(id, payload) {
     return api.post(`/appointments/${id}/client-access/`, payload);
   },
@@ -73,6 +76,11 @@ export const chatApi = {
       withBypassCache({ params: { after_id: afterId } })
     );
   },
+  listLatestMessages(appointmentId, { beforeId = 0, limit } = {}) {
+    const params = beforeId ? { before_id: beforeId } : { latest: 1 };
+    if (limit) params.limit = limit;
+    return api.get(`/appointments/${appointmentId}/messages/`, withBypassCache({ params }));
+  },
   sendMessage(appointmentId, formData) {
     return api.post(`/appointments/${appointmentId}/messages/`, formData, {
       headers: { "Content-Type": "multipart/form-data" },
@@ -84,6 +92,9 @@ export const chatApi = {
   read(appointmentId, last_read_message_id) {
     return api.post(`/appointments/${appointmentId}/read/`, { last_read_message_id });
   },
+  sync(cursor = "") {
+    return api.get("/chat/sync/", withBypassCache({ params: cursor ? { cursor } : {} }));
+  },
   listQuickReplies() {
     return api.get("/chat/quick-replies/", withBypassCache());
   },
@@ -106,6 +117,9 @@ export const chatApi = {
   deleteQuickReply(replyId) {
     return api.delete(`/chat/quick-replies/${replyId}/`);
   },
+  quickReplyCommands(prefix = "") {
+    return api.get("/chat/quick-replies/commands/", withBypassCache({ params: { prefix } }));
+  },
 };
 
 export const reviewsApi = {
@@ -271,6 +271,27 @@ export function getAppointmentSnapshot(appointment) {
   }
 }
 
+// Applies a websocket `appointment_delta` on top of the loaded detail.
+// Returns `refetch: true` when the delta cannot be applied in place
+// (a missed version, revoked access or fields that are never pushed).
+export function applyAppointmentDelta(appointment, delta) {
+  if (!appointment || !delta || delta.appointment_id !== appointment.id) {
+    return { next: appointment, refetch: false };
+  }
+  const currentVersion = Number(appointment.version || 0);
+  const incomingVersion = Number(delta.version || 0);
+  if (incomingVersion <= currentVersion) {
+    return { next: appointment, refetch: false };
+  }
+  if (delta.access_revoked || incomingVersion !== currentVersion + 1 || delta.stale_fields?.length) {
+    return { next: appointment, refetch: true };
+  }
+  return {
+    next: { ...appointment, ...(delta.changes || {}), version: incomingVersion },
+    refetch: false,
+  };
+}
+
 export function formatEtaMinutes(minutes) {
   if (minutes == null) {
     return "—";
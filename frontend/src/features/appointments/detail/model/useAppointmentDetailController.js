@@ -7,6 +7,7 @@ import { getStatusLabel } from "../../../../constants/labels";
 import { normalizeRuText } from "../../../../utils/text";
 import {
   CLIENT_SIGNAL_OPTIONS,
+  applyAppointmentDelta,
   areEventListsEqual,
   buildFallbackEvents,
   dedupeEvents,
@@ -87,6 +88,7 @@ export function useAppointmentDetailController({ id, isMobile, navigate, searchP
   const paymentFileInputRef = useRef(null);
   const lastKnownStatusRef = useRef(null);
   const lastDetailSnapshotRef = useRef("");
+  const appointmentRef = useRef(null);
   const { refetch: refetchAppointmentDetail } = useAppointmentDetailQuery(id, { enabled: false });
   const { refetch: refetchAppointmentEvents } = useAppointmentEventsQuery(
     id,
@@ -94,31 +96,35 @@ export function useAppointmentDetailController({ id, isMobile, navigate, searchP
     { enabled: false }
   );
 
+  const commitDetail = useCallback((nextDetail) => {
+    const nextStatus = nextDetail?.status || null;
+    const previousStatus = lastKnownStatusRef.current;
+
+    if (previousStatus && nextStatus && previousStatus !== nextStatus) {
+      setToast({
+        open: true,
+        severity: "info",
+        message: `Статус обновился: ${getStatusLabel(nextStatus)}`,
+        actionKey: resolveClientActionByStatus(nextStatus),
+      });
+    }
+
+    lastKnownStatusRef.current = nextStatus;
+    appointmentRef.current = nextDetail;
+
+    const nextSnapshot = getAppointmentSnapshot(nextDetail);
+    if (nextSnapshot !== lastDetailSnapshotRef.current) {
+      lastDetailSnapshotRef.current = nextSnapshot;
+      setAppointment(nextDetail);
+    }
+  }, []);
+
   const loadDetail = useCallback(
     async ({ preserveDrafts = false, silent = false } = {}) => {
       try {
         const appointmentResponse = await refetchAppointmentDetail();
         const nextDetail = appointmentResponse.data || null;
-        const nextStatus = nextDetail?.status || null;
-        const previousStatus = lastKnownStatusRef.current;
-
-        if (previousStatus && nextStatus && previousStatus !== nextStatus) {
-          setToast({
-            open: true,
-            severity: "info",
-            message: `Статус обновился: ${getStatusLabel(nextStatus)}`,
-            actionKey: resolveClientActionByStatus(nextStatus),
-          });
-        }
-
-        lastKnownStatusRef.current = nextStatus;
-
-        const nextSnapshot = getAppointmentSnapshot(nextDetail);
-        const changed = nextSnapshot !== lastDetailSnapshotRef.current;
-        if (changed) {
-          lastDetailSnapshotRef.current = nextSnapshot;
-          setAppointment(nextDetail);
-        }
+        commitDetail(nextDetail);
 
         if (!preserveDrafts && nextDetail) {
           setPrice(nextDetail.total_price || "");
@@ -134,7 +140,7 @@ export function useAppointmentDetailController({ id, isMobile, navigate, searchP
         }
       }
     },
-    [refetchAppointmentDetail]
+    [commitDetail, refetchAppointmentDetail]
   );
 
   const loadEvents = useCallback(
@@ -168,23 +174,32 @@ export function useAppointmentDetailController({ id, isMobile, navigate, searchP
 
   const handleRealtimeEvent = useCallback(
     (payload) => {
+      if (payload?.kind === "appointment_delta") {
+        const { next, refetch } = applyAppointmentDelta(appointmentRef.current, payload);
+        if (refetch) {
+          loadDetail({ preserveDrafts: true, silent: true }).catch(() => undefined);
+        } else if (next !== appointmentRef.current) {
+          commitDetail(next);
+        }
+        return;
+      }
+
       if (payload?.kind !== "platform_event") {
         return;
       }
 
+      // The detail itself follows appointment_delta; events only refresh the timeline.
       const eventType = String(payload?.event?.event_type || "");
-      const shouldRefreshDetail =
-        eventType.startsWith("appointment.") || eventType.startsWith("sla.");
       const shouldRefreshEvents =
         eventType.startsWith("appointment.") || eventType === "chat.message_deleted";
 
-      if (!shouldRefreshDetail && !shouldRefreshEvents) {
+      if (!shouldRefreshEvents) {
         return;
       }
 
-      loadData({ preserveDrafts: true, silent: true }).catch(() => undefined);
+      loadEvents({ silent: true }).catch(() => undefined);
     },
-    [loadData]
+    [commitDetail, loadDetail, loadEvents]
   );
 
   useAppointmentLiveSync({
@@ -7,8 +7,11 @@ export function useAppointmentMessagesQuery(appointmentId, params = {}, options
   return useQuery({
     queryKey: queryKeys.chat.messages(appointmentId, params),
     queryFn: async () => {
-      const response = await chatApi.listMessages(appointmentId, params.after_id || 0);
-      return response.data || [];
+      // Newest page only: opening a long chat stays one small request, older pages load on scroll.
+      const response = await chatApi.listLatestMessages(appointmentId, {
+        beforeId: params.before_id || 0,
+      });
+      return response.data || { results: [], has_more: false, next_before_id: null };
     },
     enabled: Boolean(appointmentId),
     ...options,
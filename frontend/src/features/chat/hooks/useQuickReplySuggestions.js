@@ -0,0 +1,23 @@
+import { useQuery } from "@tanstack/react-query";
+
+import { chatApi } from "../../../api/client";
+import { queryKeys } from "../../../shared/api/queryKeys";
+
+// "/пр" -> "пр" while the master is still typing the command; null otherwise.
+export function quickReplyPrefix(text) {
+  const match = /^\/([^\s/]*)$/.exec(String(text || ""));
+  return match ? match[1].toLowerCase() : null;
+}
+
+export function useQuickReplySuggestions(text, enabled) {
+  const prefix = quickReplyPrefix(text);
+  const query = useQuery({
+    queryKey: queryKeys.chat.quickReplyCommands(prefix || ""),
+    queryFn: async () => {
+      const response = await chatApi.quickReplyCommands(prefix || "");
+      return response.data?.results || [];
+    },
+    enabled: Boolean(enabled) && prefix !== null,
+  });
+  return enabled && prefix !== null ? query.data || [] : [];
+}
@@ -49,6 +49,9 @@ export function ChatProvider({
   const threadRef = useRef(null);
   const sendAudioContextRef = useRef(null);
   const hasLoadedInitialBatchRef = useRef(false);
+  // undefined until the first page arrives, null once there is nothing older.
+  const olderCursorRef = useRef(undefined);
+  const isLoadingOlderRef = useRef(false);
 
   const currentRole = String(currentUser?.role || "").toLowerCase();
   const isClientRole = currentRole === "client";
@@ -181,10 +184,17 @@ export function ChatProvider({
     async (afterId = 0) => {
       try {
         const result = await refetchMessages();
-        const incomingMessages = Array.isArray(result.data) ? result.data : [];
+        const page = result.data || {};
+        const incomingMessages = Array.isArray(page.results) ? page.results : [];
         if (!incomingMessages.length) {
           return;
         }
+        const oldestIncomingId = incomingMessages[0].id;
+        // The latest page does not reach back to what we already have: drop the stale window.
+        const hasGap = afterId > 0 && page.has_more && oldestIncomingId > afterId;
+        if (hasGap || olderCursorRef.current === undefined) {
+          olderCursorRef.current = page.next_before_id;
+        }
 
         const shouldStickToBottom = isNearBottom();
         const newMessages =
@@ -197,7 +207,17 @@ export function ChatProvider({
         );
 
         setMessages((prev) => {
-          const merged = [...prev.filter((item) => item.is_pending), ...incomingMessages];
+          // Keep pages loaded by scrolling back; the latest page replaces everything it covers.
+          const olderLoaded = hasGap
+            ? []
+            : prev.filter(
+                (item) => !item.is_pending && typeof item.id === "number" && item.id < oldestIncomingId
+              );
+          const merged = [
+            ...olderLoaded,
+            ...prev.filter((item) => item.is_pending),
+            ...incomingMessages,
+          ];
           const dedup = new Map();
           merged.forEach((message) => dedup.set(String(message.id), message));
           return Array.from(dedup.values()).sort(
@@ -263,6 +283,7 @@ export function ChatProvider({
 
   useEffect(() => {
     hasLoadedInitialBatchRef.current = false;
+    olderCursorRef.current = undefined;
     setMessages([]);
     setNewIncomingCount(0);
     setChatView(initialView === "links" ? "links" : "messages");
@@ -317,11 +338,43 @@ export function ChatProvider({
     []
   );
 
+  const loadOlderMessages = useCallback(async () => {
+    const beforeId = olderCursorRef.current;
+    const el = threadRef.current;
+    if (!beforeId || isLoadingOlderRef.current || !el) return;
+    isLoadingOlderRef.current = true;
+    try {
+      const response = await chatApi.listLatestMessages(appointmentId, { beforeId });
+      const page = response.data || {};
+      const olderMessages = Array.isArray(page.results) ? page.results : [];
+      olderCursorRef.current = page.next_before_id || null;
+      const previousHeight = el.scrollHeight;
+      setMessages((prev) => {
+        const dedup = new Map();
+        [...olderMessages, ...prev].forEach((message) => dedup.set(String(message.id), message));
+        return Array.from(dedup.values()).sort(
+          (a, b) => dayjs(a.created_at).valueOf() - dayjs(b.created_at).valueOf()
+        );
+      });
+      // Keep the message under the reader's eyes in place while history grows above it.
+      window.requestAnimationFrame(() => {
+        el.scrollTop += el.scrollHeight - previousHeight;
+      });
+    } catch {
+      setError("Не удалось загрузить сообщения");
+    } finally {
+      isLoadingOlderRef.current = false;
+    }
+  }, [appointmentId]);
+
   const onThreadScroll = useCallback(() => {
     if (isNearBottom()) {
       setNewIncomingCount(0);
     }
-  }, [isNearBottom]);
+    if (threadRef.current && threadRef.current.scrollTop < 64) {
+      loadOlderMessages();
+    }
+  }, [isNearBottom, loadOlderMessages]);
 
   const onSend = async () => {
     const rawText = text.trim();
@@ -1,6 +1,6 @@
 import AttachFileIcon from "@mui/icons-material/AttachFile";
 import SendIcon from "@mui/icons-material/Send";
-import { Button, Paper, Stack, TextField, Typography } from "@mui/material";
+import { Button, Chip, Paper, Stack, TextField, Typography } from "@mui/material";
 
 export default function ChatComposer({
   isDark,
@@ -12,6 +12,7 @@ export default function ChatComposer({
   setText,
   onFileChange,
   onSend,
+  quickReplySuggestions = [],
 }) {
   return (
     <Paper
@@ -59,6 +60,20 @@ export default function ChatComposer({
           }
           slotProps={{ htmlInput: { "data-testid": "chat-composer-text" } }}
         />
+        {quickReplySuggestions.length > 0 && (
+          <Stack direction="row" spacing={0.5} useFlexGap flexWrap="wrap">
+            {quickReplySuggestions.map((item) => (
+              <Chip
+                key={item.id}
+                size="small"
+                variant="outlined"
+                label={item.title ? `/${item.command} — ${item.title}` : `/${item.command}`}
+                title={item.preview}
+                onClick={() => setText(`/${item.command} `)}
+              />
+            ))}
+          </Stack>
+        )}
         <Stack
           direction={{ xs: "column", sm: "row" }}
           spacing={1}
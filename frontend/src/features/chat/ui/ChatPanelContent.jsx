@@ -4,6 +4,7 @@ import { alpha } from "@mui/material/styles";
 
 import ChatThread from "../../../components/ui/ChatThread";
 import { useChat } from "../hooks/useChat";
+import { useQuickReplySuggestions } from "../hooks/useQuickReplySuggestions";
 import ChatComposer from "./ChatComposer";
 import ChatLinksPanel from "./ChatLinksPanel";
 import { RuDesktopEditorPanel, RuDesktopStatusPanel } from "./RuDesktopPanels";
@@ -45,6 +46,10 @@ export default function ChatPanelContent() {
     scrollToBottom,
     saveRuDesktopInline,
   } = useChat();
+  const quickReplySuggestions = useQuickReplySuggestions(
+    text,
+    String(currentUser?.role || "").toLowerCase() === "master"
+  );
 
   const linksPanel = (
     <ChatLinksPanel linkItems={linkItems} copyLink={copyLink} isDark={isDark} isMobile={isMobile} />
@@ -243,6 +248,7 @@ export default function ChatPanelContent() {
           setText={setText}
           onFileChange={onFileChange}
           onSend={onSend}
+          quickReplySuggestions={quickReplySuggestions}
         />
         {!isSplitClientLayout && ruDesktopInputPanel}
       </Stack>
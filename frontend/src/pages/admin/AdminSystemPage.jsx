@@ -67,6 +67,8 @@ const JOB_LABELS = {
   certbot_dry_run: "Certbot dry-run",
   django_housekeeping: "Django housekeeping",
   platform_metrics_refresh: "Metrics refresh",
+  sla_sweep: "SLA sweep",
+  appointment_archive: "Appointment archive",
 };
 
 function BoolChip({ value, trueLabel = "Готово", falseLabel = "Не настроено" }) {
@@ -36,6 +36,7 @@ export const queryKeys = {
       ["chat", "messages", Number(appointmentId)] as const,
     messages: (appointmentId: string | number, params: QueryParams = {}) =>
       ["chat", "messages", Number(appointmentId), sanitizeParams(params)] as const,
+    quickReplyCommands: (prefix: string) => ["chat", "quick-reply-commands", prefix] as const,
   },
   admin: {
     all: ["admin"] as const,